@@ -1,4 +1,14 @@
+from concurrent.futures import Future, TimeoutError
 from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Iterator,
+    Optional,
+    Protocol,
+    TypeVar,
+)
 
 from app.core.auth.interactor import (
     IUserRepository,
@@ -10,11 +20,14 @@ from app.core.statistics.interactor import (
     AddProfitRequest,
     AddProfitResponse,
     IProfitsRepository,
+    IStatisticsRollupsRepository,
     StatisticsInteractor,
     StatisticsRequest,
     StatisticsResponse,
 )
+from app.core.transaction.fees import DEFAULT_FEE_POLICY, FeePolicy
 from app.core.transaction.interactor import (
+    ExportTransactionsRequest,
     IWalletRepository,
     MakeTransactionRequest,
     MakeTransactionResponse,
@@ -24,14 +37,32 @@ from app.core.transaction.interactor import (
     WalletTransactionsRequest,
     WalletTransactionsResponse,
 )
-from app.core.transaction.transaction import ITransactionRepository
+from app.core.transaction.transaction import (
+    ITransaction,
+    ITransactionRepository,
+    ITransferRepository,
+)
+from app.core.wallet.Converter import APIConverter, IConverter
 from app.core.wallet.interactor import (
     CreateWalletRequest,
     GetWalletRequest,
     GetWalletResponse,
+    GetWalletsRequest,
+    GetWalletsResponse,
     WalletInteractor,
 )
-from app.utils.result import Result
+from app.utils.result import Result, ResultStatus
+
+T = TypeVar("T")
+
+# seconds a request waits for the writer to take up its unit
+WRITE_TIMEOUT = 30.0
+
+
+# runs write units elsewhere, e.g. batched on a single writer thread
+class IWritePipeline(Protocol):
+    def submit(self, unit: Callable[[], Result[T]]) -> "Future[Result[T]]":
+        pass
 
 
 @dataclass
@@ -40,37 +71,72 @@ class WalletService:
     transactions_interactor: TransactionInteractor
     wallet_interactor: WalletInteractor
     statistics_interactor: StatisticsInteractor
+    write_pipeline: Optional[IWritePipeline] = None
+    write_timeout: float = WRITE_TIMEOUT
 
     def register_user(self, user: RegisterUserRequest) -> Result[RegisterUserResponse]:
-        return self.user_interactor.register_user(user)
+        return self._write(lambda: self.user_interactor.register_user(user))
 
     def make_transaction(
         self, request: MakeTransactionRequest
     ) -> Result[MakeTransactionResponse]:
-        return self.transactions_interactor.fire_transaction(request)
+        interactor = self.transactions_interactor
+        if self.write_pipeline is None:
+            return interactor.fire_transaction(request)
+        # a batched unit is committed only after it returns, so observers
+        # are notified here once the future resolves
+        result = self._write(lambda: interactor.transfer(request))
+        if result.status != ResultStatus.SUCCESS or result.data is None:
+            return Result(result.status, exception=result.exception)
+        interactor.notify_transaction_succeeded(result.data)
+        return Result(ResultStatus.SUCCESS, result.data.get_transaction_id())
 
     def get_wallet_transactions(
         self, request: WalletTransactionsRequest
     ) -> Result[WalletTransactionsResponse]:
         return self.transactions_interactor.get_wallet_transactions(request)
 
+    def export_wallet_transactions(
+        self, request: ExportTransactionsRequest
+    ) -> Result[Iterator[ITransaction]]:
+        return self.transactions_interactor.export_wallet_transactions(request)
+
     def get_user_transactions(
         self, request: UserTransactionsRequest
     ) -> Result[UserTransactionsResponse]:
         return self.transactions_interactor.get_user_transactions(request)
 
     def create_wallet(self, request: CreateWalletRequest) -> Result[GetWalletResponse]:
-        return self.wallet_interactor.create_new_wallet(request=request)
+        return self._write(lambda: self.wallet_interactor.create_new_wallet(request=request))
 
     def get_wallet(self, request: GetWalletRequest) -> Result[GetWalletResponse]:
         return self.wallet_interactor.get_wallet(request=request)
 
+    def get_wallets(self, request: GetWalletsRequest) -> Result[GetWalletsResponse]:
+        return self.wallet_interactor.get_wallets(request=request)
+
     def add_profit(self, request: AddProfitRequest) -> Result[AddProfitResponse]:
         return self.statistics_interactor.add_profit(request)
 
     def get_statistics(self, request: StatisticsRequest) -> Result[StatisticsResponse]:
         return self.statistics_interactor.get_statistics(request)
 
+    def _write(self, unit: Callable[[], Result[T]]) -> Result[T]:
+        if self.write_pipeline is None:
+            return unit()
+        try:
+            future = self.write_pipeline.submit(unit)
+        except RuntimeError as e:
+            return Result(ResultStatus.INTERNAL_ERROR, exception=e)
+        try:
+            return future.result(self.write_timeout)
+        except TimeoutError as e:
+            # a unit the writer has started may still commit, so its outcome
+            # is awaited instead of being reported as a failure
+            if not future.cancel():
+                return future.result()
+            return Result(ResultStatus.INTERNAL_ERROR, exception=e)
+
     @classmethod
     def create(
         cls,
@@ -78,6 +144,12 @@ class WalletService:
         transaction_repository: ITransactionRepository,
         wallet_repository: IWalletRepository,
         profits_repository: IProfitsRepository,
+        converter: Optional[IConverter] = None,
+        transfer_repository: Optional[ITransferRepository] = None,
+        write_pipeline: Optional[IWritePipeline] = None,
+        rollups_repository: Optional[IStatisticsRollupsRepository] = None,
+        fee_policy: FeePolicy = DEFAULT_FEE_POLICY,
+        transfer_lock: Optional[ContextManager[Any]] = None,
     ) -> "WalletService":
         return cls(
             user_interactor=UserInteractor(user_repository=user_repository),
@@ -87,11 +159,19 @@ class WalletService:
                 wallets_repository=wallet_repository,
                 user_repository=user_repository,
                 profits_repository=profits_repository,
+                transfer_repository=transfer_repository,
+                fees=fee_policy.compile(),
+                transfer_lock=transfer_lock,
+            ),
+            wallet_interactor=WalletInteractor(
+                wallet_repository=wallet_repository,
+                converter=converter if converter is not None else APIConverter(),
             ),
-            wallet_interactor=WalletInteractor(wallet_repository=wallet_repository),
             statistics_interactor=StatisticsInteractor(
                 profits_repository=profits_repository,
                 transactions_repository=transaction_repository,
                 admin_keys=["admin_1", "admin_2", "admin_3"],
+                rollups_repository=rollups_repository,
             ),
+            write_pipeline=write_pipeline,
         )
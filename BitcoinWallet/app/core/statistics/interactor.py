@@ -1,11 +1,14 @@
-from dataclasses import dataclass
-from typing import List
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from app.core.transaction.transaction import ITransactionRepository
 from app.utils.result import Result, ResultStatus
+from app.utils.slots import slotted
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class IProfit:
     id: int
     transaction_id: int
@@ -23,15 +26,35 @@ class AddProfitResponse:
     id: int
 
 
+# rollup bucket widths in seconds
+GRANULARITIES: Dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+
+
 @dataclass
 class StatisticsRequest:
     user_key: str
+    # unix seconds, from_time inclusive and to_time exclusive; the window
+    # is widened to whole buckets, so a bucket it touches counts in full
+    from_time: Optional[float] = None
+    to_time: Optional[float] = None
+    granularity: Optional[str] = None
+
+
+@slotted
+@dataclass
+class StatisticsBucket:
+    # unix seconds at which the bucket starts
+    start: int
+    transaction_count: int
+    volume: float
+    profit: float
 
 
 @dataclass
 class StatisticsResponse:
     transaction_count: int
     total_profit: float
+    buckets: List[StatisticsBucket] = field(default_factory=list)
 
 
 class IProfitsRepository:
@@ -50,11 +73,20 @@ class IProfitsRepository:
         pass
 
 
+class IStatisticsRollupsRepository:
+    # buckets of the given width starting in [start, end), oldest first
+    def get_rollups(
+        self, granularity: int, start: Optional[float], end: Optional[float]
+    ) -> Result[List[StatisticsBucket]]:
+        pass
+
+
 @dataclass
 class StatisticsInteractor:
     profits_repository: IProfitsRepository
     transactions_repository: ITransactionRepository
     admin_keys: List[str]
+    rollups_repository: Optional[IStatisticsRollupsRepository] = None
 
     def add_profit(self, profit: AddProfitRequest) -> Result[AddProfitResponse]:
 
@@ -69,18 +101,55 @@ class StatisticsInteractor:
     def get_statistics(self, user: StatisticsRequest) -> Result[StatisticsResponse]:
         if user.user_key not in self.admin_keys:
             return Result(ResultStatus.FAIL)
+        if (
+            user.from_time is not None
+            or user.to_time is not None
+            or user.granularity is not None
+        ):
+            return self._get_windowed_statistics(user)
 
+        # transfer fees are kept with the transactions, profits repository
+        # only holds the profits added on their own
         profits = self.profits_repository.get_total_profit()
+        fees = self.transactions_repository.get_total_fees()
         transactions = self.transactions_repository.get_transaction_count()
         if (
             profits.status == ResultStatus.SUCCESS
             and profits.data is not None
+            and fees.status == ResultStatus.SUCCESS
+            and fees.data is not None
             and transactions.status == ResultStatus.SUCCESS
             and transactions.data is not None
         ):
             return Result(
                 ResultStatus.SUCCESS,
-                StatisticsResponse(transactions.data, profits.data),
+                StatisticsResponse(transactions.data, fees.data + profits.data),
             )
         else:
             return Result(ResultStatus.FAIL)
+
+    def _get_windowed_statistics(
+        self, user: StatisticsRequest
+    ) -> Result[StatisticsResponse]:
+        # the window is answered from the rollups alone, never from raw rows
+        width = GRANULARITIES.get(user.granularity or "day")
+        if width is None or self.rollups_repository is None:
+            return Result(ResultStatus.FAIL)
+        start = user.from_time
+        if start is not None:
+            start = math.floor(start / width) * width
+        end = user.to_time
+        if end is not None:
+            end = math.ceil(end / width) * width
+        rollups = self.rollups_repository.get_rollups(width, start, end)
+        if rollups.status != ResultStatus.SUCCESS or rollups.data is None:
+            return Result(ResultStatus.FAIL, exception=rollups.exception)
+        buckets = rollups.data
+        return Result(
+            ResultStatus.SUCCESS,
+            StatisticsResponse(
+                transaction_count=sum(b.transaction_count for b in buckets),
+                total_profit=sum(b.profit for b in buckets),
+                buckets=buckets,
+            ),
+        )
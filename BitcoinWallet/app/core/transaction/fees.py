@@ -0,0 +1,91 @@
+import bisect
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from app.core.transaction.transaction import (
+    KINDS,
+    SYSTEM_FEE_RATES,
+    TransactionKind,
+)
+
+# fee for a balance, the transfer's kind and the sender's user id
+FeeEvaluator = Callable[[float, TransactionKind, Optional[int]], float]
+
+
+@dataclass(frozen=True)
+class FeeTier:
+    # balances at or above the threshold pay this rate on the whole balance
+    threshold: float
+    rate: float
+
+
+@dataclass(frozen=True)
+class FeeRule:
+    rate: float = 0.0
+    tiers: Tuple[FeeTier, ...] = ()
+    # charged when the rate comes to less, but never more than the balance
+    minimum: float = 0.0
+
+    def __post_init__(self) -> None:
+        if list(self.thresholds()) != sorted(self.thresholds()):
+            raise ValueError("fee tiers must be ordered by threshold")
+
+    def thresholds(self) -> Tuple[float, ...]:
+        return tuple(tier.threshold for tier in self.tiers)
+
+    # rates()[i] applies to balances with i thresholds at or below them
+    def rates(self) -> Tuple[float, ...]:
+        return (self.rate, *(tier.rate for tier in self.tiers))
+
+    def compile(self) -> Callable[[float], float]:
+        rate, minimum = self.rate, self.minimum
+        if not self.tiers:
+            return lambda balance: min(max(balance * rate, minimum), balance)
+        thresholds, rates = self.thresholds(), self.rates()
+
+        def fee(balance: float) -> float:
+            charged = balance * rates[bisect.bisect_right(thresholds, balance)]
+            return min(max(charged, minimum), balance)
+
+        return fee
+
+
+def default_rules() -> Dict[TransactionKind, FeeRule]:
+    return {kind: FeeRule(rate) for kind, rate in SYSTEM_FEE_RATES.items()}
+
+
+@dataclass(frozen=True)
+class FeePolicy:
+    """
+    A fee rule per transaction kind, i.e. for transfers between one user's
+    wallets and between different users, and per-user overrides of any of
+    them keyed by the sender's user id. compile() resolves all of it up
+    front into a single function called once per transfer.
+    """
+
+    rules: Mapping[TransactionKind, FeeRule] = field(default_factory=default_rules)
+    overrides: Mapping[int, Mapping[TransactionKind, FeeRule]] = field(
+        default_factory=dict
+    )
+
+    def rule(self, kind: TransactionKind, user_id: Optional[int] = None) -> FeeRule:
+        override = self.overrides.get(user_id, {}) if user_id is not None else {}
+        return override.get(kind, self.rules.get(kind, FeeRule()))
+
+    def compile(self) -> FeeEvaluator:
+        # compiled rules indexed by kind, one tuple per overridden user
+        base = tuple(self.rule(kind).compile() for kind in KINDS)
+        overridden = {
+            user_id: tuple(self.rule(kind, user_id).compile() for kind in KINDS)
+            for user_id in self.overrides
+        }
+        if not overridden:
+            return lambda balance, kind, user_id: base[kind](balance)
+
+        def fee(balance: float, kind: TransactionKind, user_id: Optional[int]) -> float:
+            return overridden.get(user_id, base)[kind](balance)  # type: ignore
+
+        return fee
+
+
+DEFAULT_FEE_POLICY = FeePolicy()
@@ -1,5 +1,6 @@
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import List, Protocol, Set
+from typing import Any, ContextManager, Iterator, List, Optional, Protocol, Set, Tuple
 
 from app.core.auth.interactor import IUserRepository
 from app.core.exceptions import (
@@ -8,11 +9,13 @@ from app.core.exceptions import (
     WalletNotAccessibleError,
 )
 from app.core.statistics.interactor import IProfitsRepository
+from app.core.transaction.fees import DEFAULT_FEE_POLICY, FeeEvaluator
 from app.core.transaction.transaction import (
     ITransaction,
     ITransactionRepository,
+    ITransferRepository,
     SimpleTransaction,
-    TransactionBetweenUsers,
+    TransactionKind,
 )
 from app.core.wallet.wallet import IWalletRepository
 from app.utils.result import Result, ResultStatus
@@ -31,25 +34,61 @@ class MakeTransactionResponse:
     transaction_id: int
 
 
+# listings are ordered by transaction id; pass a response's next_cursor as
+# after_id to get the following page. limit=None returns everything
 @dataclass
 class WalletTransactionsRequest:
     api_key: str
     wallet_address: int
+    after_id: Optional[int] = None
+    limit: Optional[int] = None
+    descending: bool = False
 
 
 @dataclass
 class UserTransactionsRequest:
     api_key: str
+    after_id: Optional[int] = None
+    limit: Optional[int] = None
+    descending: bool = False
+
+
+# ids within [from_id, to_id], streamed in id order
+@dataclass
+class ExportTransactionsRequest:
+    api_key: str
+    wallet_address: int
+    from_id: Optional[int] = None
+    to_id: Optional[int] = None
 
 
 @dataclass
 class UserTransactionsResponse:
     user_transactions: List[ITransaction]
+    next_cursor: Optional[int] = None
 
 
 @dataclass
 class WalletTransactionsResponse:
     transactions: List[ITransaction]
+    next_cursor: Optional[int] = None
+
+
+def one_more(limit: Optional[int]) -> Optional[int]:
+    return limit + 1 if limit is not None else None
+
+
+def paginate(
+    transactions: List[ITransaction], limit: Optional[int]
+) -> Tuple[List[ITransaction], Optional[int]]:
+    """
+    Cuts a listing fetched with one_more(limit) down to a page. The cursor is
+    only set when another page exists.
+    """
+    if limit is None or len(transactions) <= limit:
+        return transactions, None
+    page = transactions[:limit]
+    return page, page[-1].get_transaction_id()
 
 
 # could be used to send SMS or E-mail to clients
@@ -79,35 +118,109 @@ class TransactionInteractor(Observable):
     wallets_repository: IWalletRepository
     user_repository: IUserRepository
     profits_repository: IProfitsRepository
+    transfer_repository: Optional[ITransferRepository] = None
+    # a compiled FeePolicy
+    fees: FeeEvaluator = DEFAULT_FEE_POLICY.compile()
+    # held for each whole transfer when the repositories share one connection
+    # between threads, or one transfer's commit would also commit another's
+    # unfinished writes and its rollback undo them
+    transfer_lock: Optional[ContextManager[Any]] = None
 
-    # tried to implement transaction logic but didn't work out well
+    # observers hear about the transfer only after it has been committed
     def fire_transaction(
         self, request: MakeTransactionRequest
     ) -> Result[MakeTransactionResponse]:
+        result = self.transfer(request)
+        if result.status != ResultStatus.SUCCESS or result.data is None:
+            return Result(result.status, exception=result.exception)
+        self.notify_transaction_succeeded(result.data)
+        return Result(ResultStatus.SUCCESS, result.data.get_transaction_id())
+
+    # withdraw, deposit and the insert form one unit of work: nothing is
+    # committed until all of them succeeded. When the repositories share a
+    # connection the first commit is the only one that does any work.
+    # Observers are not notified, that is left to the caller.
+    def transfer(self, request: MakeTransactionRequest) -> Result[ITransaction]:
+        with self.transfer_lock or nullcontext():
+            return self._unit_of_work(request)
+
+    def _unit_of_work(self, request: MakeTransactionRequest) -> Result[ITransaction]:
         try:
+            if self.transfer_repository is not None:
+                transaction = self._transfer(request, self.transfer_repository)
+                return Result(ResultStatus.SUCCESS, transaction)
             user_id = self.user_repository.get_user_id(request.api_key)
             if user_id is None:
                 raise UserNotFoundError()
             user_wallets = self.wallets_repository.get_user_wallets(user_id)
             for wallet in user_wallets:
                 if wallet.get_address() == request.from_wallet_address:
-                    result = self._make_transaction(request)
+                    result = self._make_transaction(request, user_id)
                     if result.status != ResultStatus.SUCCESS:
                         raise result.exception
-                    # self.wallets_repository.commit()
-                    # self.transactions_repository.commit()
-                    # self.profits_repository.commit()
+                    self.wallets_repository.commit()
+                    self.transactions_repository.commit()
+                    self.profits_repository.commit()
                     return Result(ResultStatus.SUCCESS, result.data)
             raise WalletNotAccessibleError()
         except TransactionError as t:
-            # self.wallets_repository.rollback()
-            # self.transactions_repository.rollback()
-            # self.profits_repository.rollback()
+            self._rollback()
             return Result(ResultStatus.FAIL, exception=t)
         except Exception as e:
+            self._rollback()
             return Result(ResultStatus.FAIL, exception=e)
 
-    def _make_transaction(self, request: MakeTransactionRequest) -> Result[int]:
+    def _rollback(self) -> None:
+        self.wallets_repository.rollback()
+        self.transactions_repository.rollback()
+        self.profits_repository.rollback()
+        if self.transfer_repository is not None:
+            self.transfer_repository.rollback()
+
+    # same checks and outcome as _make_transaction, decided from a single
+    # read of both wallets instead of one query per step
+    def _transfer(
+        self, request: MakeTransactionRequest, repository: ITransferRepository
+    ) -> ITransaction:
+        sender, receiver, balance = (
+            request.from_wallet_address,
+            request.to_wallet_address,
+            request.balance,
+        )
+        user_id = self.user_repository.get_user_id(request.api_key)
+        if user_id is None:
+            raise UserNotFoundError()
+        context = repository.load_transfer_context(sender, receiver)
+        if context.sender_owner != user_id:
+            raise WalletNotAccessibleError()
+        if balance <= 0:
+            raise TransactionError("Can't withdraw non-positive amount")
+        if context.sender_amount is None or balance > context.sender_amount:
+            raise TransactionError("Not enough money in account")
+        if context.receiver_owner is None:
+            raise TransactionError("Wrong wallet address")
+        kind = TransactionKind.SIMPLE
+        if context.receiver_owner != context.sender_owner:
+            kind = TransactionKind.BETWEEN_USERS
+        transaction = SimpleTransaction(
+            sender,
+            receiver,
+            balance,
+            kind=kind,
+            system_fee=self.fees(balance, kind, user_id),
+        )
+        result = repository.apply_transfer(
+            transaction, transaction.calculate_system_profit()
+        )
+        if result.status != ResultStatus.SUCCESS:
+            raise result.exception
+        repository.commit()
+        transaction.transaction_id = result.data
+        return transaction
+
+    def _make_transaction(
+        self, request: MakeTransactionRequest, user_id: int
+    ) -> Result[ITransaction]:
         sender, receiver, balance = (
             request.from_wallet_address,
             request.to_wallet_address,
@@ -119,12 +232,18 @@ class TransactionInteractor(Observable):
         success, message = self.wallets_repository.deposit(receiver, balance)
         if not success:
             return Result(ResultStatus.FAIL, exception=TransactionError(message))
-        curr_transaction = SimpleTransaction(sender, receiver, balance)
+        kind = TransactionKind.SIMPLE
         if not self.wallets_repository.wallets_belong_to_the_same_user(
             sender, receiver
         ):
-            curr_transaction = TransactionBetweenUsers(curr_transaction)
-        self.wallets_repository.commit()
+            kind = TransactionKind.BETWEEN_USERS
+        curr_transaction = SimpleTransaction(
+            sender,
+            receiver,
+            balance,
+            kind=kind,
+            system_fee=self.fees(balance, kind, user_id),
+        )
         result = self.transactions_repository.create(curr_transaction)
         if result.status != ResultStatus.SUCCESS:
             return Result(
@@ -133,21 +252,8 @@ class TransactionInteractor(Observable):
                     "error while inserting row in transactions table"
                 ),
             )
-        self.transactions_repository.commit()
         curr_transaction.transaction_id = result.data
-        system_profit = curr_transaction.calculate_system_profit()
-        result = self.profits_repository.add_system_profit(
-            curr_transaction.transaction_id, system_profit
-        )
-        if result.status != ResultStatus.SUCCESS:
-            return Result(
-                ResultStatus.FAIL,
-                exception=TransactionError(
-                    "error while inserting row in profits table"
-                ),
-            )
-        self.profits_repository.commit()
-        return Result(ResultStatus.SUCCESS, curr_transaction.transaction_id)
+        return Result(ResultStatus.SUCCESS, curr_transaction)
 
     def get_wallet_transactions(
         self, request: WalletTransactionsRequest
@@ -157,15 +263,39 @@ class TransactionInteractor(Observable):
             if user_id is None:
                 raise UserNotFoundError()
             result = self.transactions_repository.get_wallet_transactions(
-                request.wallet_address
+                request.wallet_address,
+                after_id=request.after_id,
+                limit=one_more(request.limit),
+                descending=request.descending,
             )
             if result.status == ResultStatus.FAIL:
                 raise result.exception
-            response = WalletTransactionsResponse(result.data)
+            response = WalletTransactionsResponse(*paginate(result.data, request.limit))
             return Result(ResultStatus.SUCCESS, response)
         except Exception as e:
             return Result(ResultStatus.FAIL, exception=e)
 
+    def export_wallet_transactions(
+        self, request: ExportTransactionsRequest
+    ) -> Result[Iterator[ITransaction]]:
+        try:
+            user_id = self.user_repository.get_user_id(request.api_key)
+            if user_id is None:
+                raise UserNotFoundError()
+            # a whole history at once, so only for the wallet's owner
+            user_wallets = self.wallets_repository.get_user_wallets(user_id)
+            if all(
+                wallet.get_address() != request.wallet_address
+                for wallet in user_wallets
+            ):
+                raise WalletNotAccessibleError()
+            transactions = self.transactions_repository.iter_wallet_transactions(
+                request.wallet_address, request.from_id, request.to_id
+            )
+            return Result(ResultStatus.SUCCESS, transactions)
+        except Exception as e:
+            return Result(ResultStatus.FAIL, exception=e)
+
     def get_user_transactions(
         self, requset: UserTransactionsRequest
     ) -> Result[UserTransactionsResponse]:
@@ -174,17 +304,15 @@ class TransactionInteractor(Observable):
             if user_id is None:
                 raise UserNotFoundError()
             user_wallets = self.wallets_repository.get_user_wallets(user_id)
-            user_transactions = []
-            for wallet in user_wallets:
-                wallet_transactions = (
-                    self.transactions_repository.get_wallet_transactions(
-                        wallet.get_address()
-                    ).data
-                )
-                for transaction in wallet_transactions:
-                    if transaction not in user_transactions:
-                        user_transactions.append(transaction)
-            response = UserTransactionsResponse(user_transactions)
+            result = self.transactions_repository.get_transactions_for_wallets(
+                [wallet.get_address() for wallet in user_wallets],
+                after_id=requset.after_id,
+                limit=one_more(requset.limit),
+                descending=requset.descending,
+            )
+            if result.status == ResultStatus.FAIL:
+                raise result.exception
+            response = UserTransactionsResponse(*paginate(result.data, requset.limit))
             return Result(ResultStatus.SUCCESS, response)
         except Exception as e:
             return Result(ResultStatus.FAIL, exception=e)
@@ -1,7 +1,25 @@
-from dataclasses import dataclass
-from typing import List, Protocol
+import enum
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Protocol
 
 from app.utils.result import Result
+from app.utils.slots import slotted
+
+
+class TransactionKind(enum.IntEnum):
+    SIMPLE = 0
+    # between wallets of different users
+    BETWEEN_USERS = 1
+
+
+# TransactionKind by its stored value
+KINDS = tuple(TransactionKind)
+
+# share of the balance the system keeps
+SYSTEM_FEE_RATES: Dict[TransactionKind, float] = {
+    TransactionKind.SIMPLE: 0.0,
+    TransactionKind.BETWEEN_USERS: 0.15,
+}
 
 
 class ITransaction(Protocol):
@@ -17,16 +35,30 @@ class ITransaction(Protocol):
     def get_receiver_address(self) -> int:
         pass
 
+    def get_transaction_id(self) -> int:
+        pass
+
+    def get_kind(self) -> TransactionKind:
+        pass
+
 
+# the kind decides the fee, so rows read back need no decorator. A fee
+# priced by a FeePolicy is kept as system_fee and takes precedence; it is
+# not part of equality
+@slotted
 @dataclass
 class SimpleTransaction:
     sender_address: int
     receiver_address: int
     balance: float
     transaction_id: int = 0
+    kind: TransactionKind = TransactionKind.SIMPLE
+    system_fee: Optional[float] = field(default=None, compare=False)
 
     def calculate_system_profit(self) -> float:
-        return 0
+        if self.system_fee is not None:
+            return self.system_fee
+        return self.balance * SYSTEM_FEE_RATES[self.kind]
 
     def get_balance(self) -> float:
         return self.balance
@@ -37,11 +69,27 @@ class SimpleTransaction:
     def get_receiver_address(self) -> int:
         return self.receiver_address
 
+    def get_transaction_id(self) -> int:
+        return self.transaction_id
 
+    def get_kind(self) -> TransactionKind:
+        return self.kind
+
+
+@slotted
 @dataclass
 class BaseTransactionDecorator:
     inner: ITransaction
 
+    # repositories assign ids to whatever they are given
+    @property
+    def transaction_id(self) -> int:
+        return self.inner.get_transaction_id()
+
+    @transaction_id.setter
+    def transaction_id(self, transaction_id: int) -> None:
+        self.inner.transaction_id = transaction_id  # type: ignore
+
     def calculate_system_profit(self) -> float:
         return self.inner.calculate_system_profit()
 
@@ -54,22 +102,61 @@ class BaseTransactionDecorator:
     def get_receiver_address(self) -> int:
         return self.inner.get_receiver_address()
 
+    def get_transaction_id(self) -> int:
+        return self.inner.get_transaction_id()
+
+    def get_kind(self) -> TransactionKind:
+        return self.inner.get_kind()
 
+
+@slotted
 @dataclass
 class TransactionBetweenUsers(BaseTransactionDecorator):
     def calculate_system_profit(self) -> float:
-        return self.inner.get_balance() * 0.15
+        return (
+            self.inner.get_balance()
+            * SYSTEM_FEE_RATES[TransactionKind.BETWEEN_USERS]
+        )
+
+    def get_kind(self) -> TransactionKind:
+        return TransactionKind.BETWEEN_USERS
 
 
 class ITransactionRepository(Protocol):
     def create(self, transaction: ITransaction) -> Result[int]:
         pass
 
+    # ordered by transaction id; after_id is exclusive and, when descending,
+    # an upper bound. limit=None returns everything past the cursor
     def get_wallet_transactions(
-        self, wallet_address: int
+        self,
+        wallet_address: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        pass
+
+    # every transaction touching any of the wallets, once, in the same order
+    def get_transactions_for_wallets(
+        self,
+        wallet_addresses: List[int],
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
     ) -> Result[List[ITransaction]]:
         pass
 
+    # lazily, in id order, ids within [from_id, to_id]; nothing is read
+    # before iteration starts
+    def iter_wallet_transactions(
+        self,
+        wallet_address: int,
+        from_id: Optional[int] = None,
+        to_id: Optional[int] = None,
+    ) -> Iterator[ITransaction]:
+        pass
+
     def commit(self) -> None:
         pass
 
@@ -78,3 +165,33 @@ class ITransactionRepository(Protocol):
 
     def get_transaction_count(self) -> Result[int]:
         pass
+
+    # sum of the system fees of all stored transactions
+    def get_total_fees(self) -> Result[float]:
+        pass
+
+
+@slotted
+@dataclass(frozen=True)
+class TransferContext:
+    sender_owner: Optional[int] = None
+    sender_amount: Optional[float] = None
+    receiver_owner: Optional[int] = None
+
+
+# everything a transfer needs, in a fixed number of statements:
+# one read for both wallets and one write per changed row
+class ITransferRepository(Protocol):
+    def load_transfer_context(self, sender: int, receiver: int) -> TransferContext:
+        pass
+
+    def apply_transfer(
+        self, transaction: ITransaction, system_profit: float
+    ) -> Result[int]:
+        pass
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
@@ -1,13 +1,33 @@
-import ast
-from typing import Protocol
+import json
+from typing import Any, Dict, Mapping, Optional, Protocol, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+
+USD = "USD"
 
 
 class IConverter(Protocol):
     def get_BTC_to_USD_conversion_rate(self) -> float:
         pass
 
+    # every currency of the ticker, so callers can value in several at once
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        pass
+
+
+# the full ticker payload, symbol -> {"last": ..., ...}
+class ITickerRetriever(Protocol):
+    def fetch_data(self) -> dict:
+        pass
+
+
+def usd_rate(rates: Optional[Mapping[str, float]]) -> Optional[float]:
+    if rates is None:
+        return None
+    return rates.get(USD)
+
 
 class WrongConverter:
     def __init__(self) -> None:
@@ -16,23 +36,82 @@ class WrongConverter:
     def get_BTC_to_USD_conversion_rate(self) -> float:
         return self.conversion
 
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        return {USD: self.conversion}
+
+
+_decoder = json.JSONDecoder()
+
+
+def parse_ticker_symbol(payload: str, symbol: str) -> Dict[str, Any]:
+    """
+    Decodes only the object stored under the symbol key instead of the whole
+    ticker. Falls back to parsing the full payload if the key can't be found.
+    """
+    key = f'"{symbol}"'
+    start = payload.find(key)
+    while start != -1:
+        position = start + len(key)
+        while payload[position : position + 1].isspace():
+            position += 1
+        if payload[position : position + 1] == ":":
+            position += 1
+            while payload[position : position + 1].isspace():
+                position += 1
+            value, _ = _decoder.raw_decode(payload, position)
+            if isinstance(value, dict):
+                return value
+        start = payload.find(key, start + 1)
+    result: Dict[str, Any] = json.loads(payload)[symbol]
+    return result
+
+
+def ticker_rates(ticker: Mapping[str, Mapping[str, Any]]) -> Dict[str, float]:
+    return {symbol: values["last"] for symbol, values in ticker.items()}
+
+
+def create_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class GeneralBTCConversionDataRetriever:
-    def __init__(self, url: str = "https://blockchain.info/ticker") -> None:
+    def __init__(
+        self,
+        url: str = "https://blockchain.info/ticker",
+        connect_timeout: float = 3.05,
+        read_timeout: float = 5,
+        pool_size: int = 10,
+        session: Optional[requests.Session] = None,
+    ) -> None:
         self.url = url
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.session = session if session is not None else create_session(pool_size)
 
     def fetch_data(self) -> dict:
-        response = requests.get(self.url)
-        bytes_str = response.content
-        dict_str = bytes_str.decode("UTF-8")
-        data_dict = ast.literal_eval(dict_str)
-        return data_dict
+        result: dict = json.loads(self._fetch_payload())
+        return result
+
+    def fetch_symbol(self, symbol: str) -> Dict[str, Any]:
+        return parse_ticker_symbol(self._fetch_payload(), symbol)
+
+    def _fetch_payload(self) -> str:
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content.decode("UTF-8")
 
 
 class APIConverter(GeneralBTCConversionDataRetriever):
-    def __init__(self, url: str = "https://blockchain.info/ticker") -> None:
-        super().__init__(url)
-        self.symbol = "USD"
+    def __init__(self, url: str = "https://blockchain.info/ticker", **kwargs: Any) -> None:
+        super().__init__(url, **kwargs)
+        self.symbol = USD
 
     def get_BTC_to_USD_conversion_rate(self) -> float:
-        return self.fetch_data()[self.symbol]["last"]
+        rate: float = self.fetch_symbol(self.symbol)["last"]
+        return rate
+
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        return ticker_rates(self.fetch_data())
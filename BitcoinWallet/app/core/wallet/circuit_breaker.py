@@ -0,0 +1,212 @@
+import enum
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Protocol, TypeVar, cast
+
+from app.core.wallet.Converter import (
+    IConverter,
+    ITickerRetriever,
+    ticker_rates,
+    usd_rate,
+)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+# a converter that can also hand out the raw ticker, e.g. APIConverter
+class ITickerConverter(IConverter, ITickerRetriever, Protocol):
+    pass
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreakerMetrics:
+    state: CircuitState
+    transitions: Dict[str, int]
+    successes: int
+    failures: int
+    fallbacks: int
+    hedged_calls: int
+    hedge_wins: int
+
+
+class CircuitBreakerConverter:
+    """
+    Stops calling the primary converter after failure_threshold consecutive
+    failures and answers with the last known good rates instead. After
+    reset_timeout a single probe is let through; its outcome closes or
+    re-opens the circuit. If a secondary converter is given, it is called when
+    the primary hasn't answered within hedge_after seconds, or as soon as the
+    primary fails, and the first successful answer wins.
+
+    fetch_data() makes the breaker a ticker retriever for RatePublisher when
+    both converters provide fetch_data too. It shares the circuit but has no
+    fallback: it raises, and the publisher keeps its previous snapshot and
+    applies its own staleness limit.
+    """
+
+    def __init__(
+        self,
+        primary: IConverter,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30,
+        call_timeout: float = 5,
+        secondary: Optional[IConverter] = None,
+        hedge_after: float = 0.5,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.primary = primary
+        self.secondary = secondary
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.call_timeout = call_timeout
+        self.hedge_after = hedge_after
+        self.clock = clock
+        self.last_known_good: Optional[Mapping[str, float]] = None
+        self.state = CircuitState.CLOSED
+        self.transitions: Dict[str, int] = {}
+        self.successes = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.hedged_calls = 0
+        self.hedge_wins = 0
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def get_BTC_to_USD_conversion_rate(self) -> Optional[float]:
+        return usd_rate(self.get_BTC_conversion_rates())
+
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        if not self._allow_request():
+            with self._lock:
+                self.fallbacks += 1
+            return self.last_known_good
+
+        try:
+            rates = self._call(lambda source: source.get_BTC_conversion_rates())
+        except Exception:
+            rates = None
+
+        if rates is None:
+            self._on_failure()
+            with self._lock:
+                self.fallbacks += 1
+            return self.last_known_good
+
+        self._on_success(rates)
+        return rates
+
+    def fetch_data(self) -> dict:
+        if not self._allow_request():
+            raise CircuitOpenError("ticker circuit is open")
+        try:
+            data = self._call(
+                lambda source: cast(ITickerConverter, source).fetch_data()
+            )
+            rates = ticker_rates(data) if data is not None else None
+        except Exception:
+            data = rates = None
+        if data is None or rates is None:
+            self._on_failure()
+            raise ConnectionError("no ticker source answered")
+        self._on_success(rates)
+        return data
+
+    def metrics(self) -> CircuitBreakerMetrics:
+        with self._lock:
+            return CircuitBreakerMetrics(
+                state=self.state,
+                transitions=dict(self.transitions),
+                successes=self.successes,
+                failures=self.failures,
+                fallbacks=self.fallbacks,
+                hedged_calls=self.hedged_calls,
+                hedge_wins=self.hedge_wins,
+            )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def _on_success(self, rates: Mapping[str, float]) -> None:
+        with self._lock:
+            self.successes += 1
+            self.last_known_good = rates
+            self._consecutive_failures = 0
+            self._probing = False
+            if self.state != CircuitState.CLOSED:
+                self._transition(CircuitState.CLOSED)
+
+    def _on_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            self._probing = False
+            if self.state == CircuitState.HALF_OPEN or (
+                self.state == CircuitState.CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._opened_at = self.clock()
+                self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        # called with self._lock held
+        key = f"{self.state.value}->{state.value}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self.state = state
+
+    def _call(self, fetch: Callable[[IConverter], Optional[T]]) -> Optional[T]:
+        now = time.monotonic()
+        deadline, hedge_at = now + self.call_timeout, now + self.hedge_after
+        primary = self._executor.submit(fetch, self.primary)
+        pending: List["Future[Optional[T]]"] = [primary]
+        secondary = self.secondary
+
+        while pending or secondary is not None:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            # hedge once the primary is slow, or right away once it failed
+            if secondary is not None and (now >= hedge_at or not pending):
+                with self._lock:
+                    self.hedged_calls += 1
+                pending.append(self._executor.submit(fetch, secondary))
+                secondary = None
+                continue
+            until = deadline if secondary is None else min(deadline, hedge_at)
+            done, _ = wait(pending, timeout=until - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None and future.result() is not None:
+                    if future is not primary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        return None
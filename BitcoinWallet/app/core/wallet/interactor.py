@@ -1,8 +1,8 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Dict, List, Mapping, Optional
 
 from app.core.exceptions import WalletRequestError
-from app.core.wallet.Converter import APIConverter, IConverter
+from app.core.wallet.Converter import USD, APIConverter, IConverter
 from app.core.wallet.wallet import IWallet, IWalletRepository
 from app.utils.result import Result, ResultStatus
 
@@ -11,6 +11,14 @@ from app.utils.result import Result, ResultStatus
 class GetWalletRequest:
     api_key: str
     wallet_address: int
+    currencies: List[str] = field(default_factory=list)
+
+
+@dataclass
+class GetWalletsRequest:
+    api_key: str
+    wallet_addresses: List[int] = field(default_factory=list)
+    currencies: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -23,6 +31,12 @@ class GetWalletResponse:
     wallet_address: int
     amount_BTC: float
     amount_USD: float
+    amounts: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class GetWalletsResponse:
+    wallets: List[GetWalletResponse]
 
 
 @dataclass
@@ -34,16 +48,38 @@ class WalletInteractor:
         self, request: CreateWalletRequest
     ) -> Result[GetWalletResponse]:
         wallet, error_str = self.wallet_repository.create_wallet(request.api_key)
-        return self._create_response(wallet, error_str)
+        return self._create_response(wallet, error_str, [])
 
     def get_wallet(self, request: GetWalletRequest) -> Result[GetWalletResponse]:
         wallet, error_str = self.wallet_repository.get_wallet(
             api_key=request.api_key, address=request.wallet_address
         )
-        return self._create_response(wallet, error_str)
+        return self._create_response(wallet, error_str, request.currencies)
+
+    def get_wallets(self, request: GetWalletsRequest) -> Result[GetWalletsResponse]:
+        wallets, error_str = self.wallet_repository.get_wallets(
+            api_key=request.api_key, addresses=request.wallet_addresses
+        )
+        if error_str is not None:
+            return Result(
+                status=ResultStatus.FAIL,
+                data=None,
+                exception=WalletRequestError(message=error_str),
+            )
+
+        rates = self._get_rates(request.currencies)
+        if rates.status != ResultStatus.SUCCESS or rates.data is None:
+            return Result(status=rates.status, data=None, exception=rates.exception)
+
+        return Result(
+            status=ResultStatus.SUCCESS,
+            data=GetWalletsResponse(
+                wallets=[self._value_wallet(wallet, rates.data) for wallet in wallets]
+            ),
+        )
 
     def _create_response(
-        self, wallet: Optional[IWallet], error_str: Optional[str]
+        self, wallet: Optional[IWallet], error_str: Optional[str], currencies: List[str]
     ) -> Result[GetWalletResponse]:
         if wallet is None and error_str is not None:
             return Result(
@@ -52,21 +88,43 @@ class WalletInteractor:
                 exception=WalletRequestError(message=error_str),
             )
         else:
-            conversion_rate = self.converter.get_BTC_to_USD_conversion_rate()
-            if conversion_rate is None:
-                return Result(
-                    status=ResultStatus.INTERNAL_ERROR,
-                    data=None,
-                    exception=WalletRequestError(message="Internal Server Error"),
-                )
+            rates = self._get_rates(currencies)
+            if rates.status != ResultStatus.SUCCESS or rates.data is None:
+                return Result(status=rates.status, data=None, exception=rates.exception)
 
-            amount_in_btc = wallet.get_amount()
-            amount_in_usd = amount_in_btc * conversion_rate
             return Result(
                 status=ResultStatus.SUCCESS,
-                data=GetWalletResponse(
-                    wallet_address=wallet.get_address(),
-                    amount_BTC=amount_in_btc,
-                    amount_USD=amount_in_usd,
-                ),
+                data=self._value_wallet(wallet, rates.data),
             )
+
+    # reads the ticker once and keeps only the requested currencies (and USD)
+    def _get_rates(self, currencies: List[str]) -> Result[Dict[str, float]]:
+        ticker: Optional[Mapping[str, float]] = self.converter.get_BTC_conversion_rates()
+        if ticker is None or ticker.get(USD) is None:
+            return Result(
+                status=ResultStatus.INTERNAL_ERROR,
+                data=None,
+                exception=WalletRequestError(message="Internal Server Error"),
+            )
+
+        rates = {USD: ticker[USD]}
+        for currency in currencies:
+            symbol = currency.upper()
+            if symbol not in ticker:
+                return Result(
+                    status=ResultStatus.FAIL,
+                    data=None,
+                    exception=WalletRequestError(message=f"Unknown currency {currency}"),
+                )
+            rates[symbol] = ticker[symbol]
+        return Result(status=ResultStatus.SUCCESS, data=rates)
+
+    @staticmethod
+    def _value_wallet(wallet: IWallet, rates: Dict[str, float]) -> GetWalletResponse:
+        amount_in_btc = wallet.get_amount()
+        return GetWalletResponse(
+            wallet_address=wallet.get_address(),
+            amount_BTC=amount_in_btc,
+            amount_USD=amount_in_btc * rates[USD],
+            amounts={symbol: amount_in_btc * rate for symbol, rate in rates.items()},
+        )
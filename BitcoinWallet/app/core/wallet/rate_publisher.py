@@ -0,0 +1,106 @@
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+
+from app.core.wallet.Converter import USD, ITickerRetriever, ticker_rates
+
+
+@dataclass(frozen=True)
+class TickerSnapshot:
+    ticker: Mapping[str, Mapping[str, Any]]
+    rates: Mapping[str, float]
+    fetched_at: float
+
+    def rate(self, symbol: str) -> Optional[float]:
+        return self.rates.get(symbol)
+
+    def age(self, now: float) -> float:
+        return now - self.fetched_at
+
+
+class RatePublisher:
+    """
+    Polls the ticker on its own thread and publishes it as an immutable
+    snapshot. Readers only load the current snapshot reference, so they never
+    wait on the network; a snapshot older than max_staleness is not served.
+    """
+
+    def __init__(
+        self,
+        retriever: ITickerRetriever,
+        interval: float = 15,
+        max_staleness: float = 120,
+        symbol: str = USD,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.retriever = retriever
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.symbol = symbol
+        self.clock = clock
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._snapshot: Optional[TickerSnapshot] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get_snapshot(self) -> Optional[TickerSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age(self.clock()) > self.max_staleness:
+            return None
+        return snapshot
+
+    def get_BTC_to_USD_conversion_rate(self) -> Optional[float]:
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.rate(self.symbol)
+
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.rates
+
+    # a payload that can't be made into a snapshot fails like a fetch, the
+    # previous snapshot stays and the polling thread keeps going
+    def refresh(self) -> bool:
+        try:
+            data = self.retriever.fetch_data()
+            ticker = MappingProxyType(
+                {
+                    symbol: MappingProxyType(dict(values))
+                    for symbol, values in data.items()
+                }
+            )
+            snapshot = TickerSnapshot(
+                ticker=ticker,
+                rates=MappingProxyType(ticker_rates(ticker)),
+                fetched_at=self.clock(),
+            )
+        except Exception:
+            self.refresh_failures += 1
+            return False
+        self._snapshot = snapshot
+        self.refreshes += 1
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.interval)
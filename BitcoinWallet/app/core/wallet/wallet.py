@@ -2,6 +2,8 @@ from abc import abstractmethod
 from dataclasses import dataclass
 from typing import List, Optional, Protocol, Tuple
 
+from app.utils.slots import slotted
+
 
 class IWallet(Protocol):
     def get_user(self) -> int:
@@ -32,6 +34,12 @@ class IWalletRepository(Protocol):
     ) -> Tuple[Optional[IWallet], Optional[str]]:
         pass
 
+    # all wallets of the user when addresses is empty
+    def get_wallets(
+        self, api_key: str, addresses: List[int]
+    ) -> Tuple[List[IWallet], Optional[str]]:
+        pass
+
     def num_wallets(self, user_id: int) -> int:
         pass
 
@@ -62,6 +70,21 @@ class IWalletRepository(Protocol):
         pass
 
 
+def select_wallets(
+    wallets: List[IWallet], addresses: List[int]
+) -> Tuple[List[IWallet], Optional[str]]:
+    if not addresses:
+        return list(wallets), None
+    by_address = {wallet.get_address(): wallet for wallet in wallets}
+    selected = []
+    for address in addresses:
+        if address not in by_address:
+            return [], f"Couldn't find wallet with address {address}"
+        selected.append(by_address[address])
+    return selected, None
+
+
+@slotted
 @dataclass
 class BitcoinWallet:
     wallet_address: int
@@ -0,0 +1,361 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from app.core.statistics.interactor import (
+    IProfitsRepository,
+    IStatisticsRollupsRepository,
+    StatisticsBucket,
+)
+from app.core.transaction.transaction import ITransaction, ITransactionRepository
+from app.core.wallet.wallet import IWallet, IWalletRepository
+from app.utils.result import Result, ResultStatus
+
+V = TypeVar("V")
+
+# carried by everything derived from all transactions, e.g. the statistics
+STATISTICS: Hashable = ("statistics",)
+
+
+def wallet_tag(address: int) -> Hashable:
+    return ("wallet", address)
+
+
+class ReadCache:
+    """
+    LRU cache whose entries are tagged with what they were read from;
+    invalidate() drops every entry carrying one of the given tags. A value
+    loaded while anything was invalidated is returned but not stored, so a
+    read racing a commit cannot put the state before the commit back.
+    Writers that commit later than they invalidate, such as a batch on the
+    write pipeline, run inside deferred() so their invalidations are
+    repeated once the commit is done.
+
+    Invalidation only sees writes made by this process, which must therefore
+    be the only writer of the database.
+    """
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, FrozenSet[Hashable]]]" = (
+            OrderedDict()
+        )
+        self._tagged: Dict[Hashable, Set[Hashable]] = {}
+        self._invalidations = 0
+        self._lock = threading.Lock()
+        self._deferred: ContextVar[Optional[Set[Hashable]]] = ContextVar(
+            "read_cache_deferred", default=None
+        )
+
+    # tags returns None for values that must not be cached, e.g. failures
+    def load(
+        self,
+        key: Hashable,
+        loader: Callable[[], V],
+        tags: Callable[[V], Optional[Iterable[Hashable]]],
+    ) -> V:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            stamp = self._invalidations
+
+        value = loader()
+        entry_tags = tags(value)
+        if entry_tags is None:
+            return value
+        with self._lock:
+            if stamp == self._invalidations:
+                self._store(key, value, frozenset(entry_tags))
+        return value
+
+    def invalidate(self, *tags: Hashable) -> None:
+        deferred = self._deferred.get()
+        if deferred is not None:
+            deferred.update(tags)
+        with self._lock:
+            self._invalidations += 1
+            for tag in tags:
+                for key in self._tagged.pop(tag, set()):
+                    self._drop(key)
+
+    # a read between the write and its commit may store the old state again,
+    # so what the block invalidated is dropped once more when it exits
+    @contextmanager
+    def deferred(self) -> Iterator[None]:
+        tags: Set[Hashable] = set()
+        token = self._deferred.set(tags)
+        try:
+            yield
+        finally:
+            self._deferred.reset(token)
+            if tags:
+                self.invalidate(*tags)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Hashable, value: Any, tags: FrozenSet[Hashable]) -> None:
+        self._drop(key)
+        self._entries[key] = (value, tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.capacity:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+
+def _succeeded(result: Result[Any], tags: Iterable[Hashable]) -> Optional[List[Hashable]]:
+    if result.status != ResultStatus.SUCCESS:
+        return None
+    return list(tags)
+
+
+class ReadCacheInvalidator:
+    """
+    Transaction observer dropping what a succeeded transfer changed: both
+    wallets, every listing that contains either of them and the statistics.
+    """
+
+    def __init__(self, cache: ReadCache) -> None:
+        self.cache = cache
+
+    def on_transaction_succeeded(self, transaction: ITransaction) -> None:
+        self.cache.invalidate(
+            wallet_tag(transaction.get_sender_address()),
+            wallet_tag(transaction.get_receiver_address()),
+            STATISTICS,
+        )
+
+
+class CachedWalletRepository:
+    def __init__(self, inner: IWalletRepository, cache: ReadCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def create_wallet(self, api_key: str) -> Tuple[Optional[IWallet], Optional[str]]:
+        wallet, error = self.inner.create_wallet(api_key)
+        if wallet is not None:
+            self.cache.invalidate(("owner", api_key), ("user", wallet.get_user()))
+        return wallet, error
+
+    def get_wallet(
+        self, api_key: str, address: int
+    ) -> Tuple[Optional[IWallet], Optional[str]]:
+        return self.cache.load(
+            ("wallet", api_key, address),
+            lambda: self.inner.get_wallet(api_key, address),
+            lambda found: [wallet_tag(address)] if found[0] is not None else None,
+        )
+
+    def get_wallets(
+        self, api_key: str, addresses: List[int]
+    ) -> Tuple[List[IWallet], Optional[str]]:
+        def tags(found: Tuple[List[IWallet], Optional[str]]) -> Optional[List[Hashable]]:
+            wallets, error = found
+            if error is not None:
+                return None
+            return [("owner", api_key)] + [wallet_tag(w.get_address()) for w in wallets]
+
+        return self.cache.load(
+            ("wallets", api_key, tuple(addresses)),
+            lambda: self.inner.get_wallets(api_key, addresses),
+            tags,
+        )
+
+    def get_user_wallets(self, user_id: int) -> List[IWallet]:
+        return self.cache.load(
+            ("user_wallets", user_id),
+            lambda: self.inner.get_user_wallets(user_id),
+            lambda wallets: [("user", user_id)]
+            + [wallet_tag(wallet.get_address()) for wallet in wallets],
+        )
+
+    def num_wallets(self, user_id: int) -> int:
+        return self.inner.num_wallets(user_id)
+
+    def deposit(self, wallet_address: int, amount: float) -> Tuple[bool, Optional[str]]:
+        success, message = self.inner.deposit(wallet_address, amount)
+        if success:
+            self.cache.invalidate(wallet_tag(wallet_address))
+        return success, message
+
+    def withdraw(
+        self, wallet_address: int, amount: float
+    ) -> Tuple[bool, Optional[str]]:
+        success, message = self.inner.withdraw(wallet_address, amount)
+        if success:
+            self.cache.invalidate(wallet_tag(wallet_address))
+        return success, message
+
+    def wallets_belong_to_the_same_user(
+        self, first_wallet_address: int, second_wallet_address: int
+    ) -> bool:
+        return self.inner.wallets_belong_to_the_same_user(
+            first_wallet_address, second_wallet_address
+        )
+
+    def default_wallet(self, uid: int) -> IWallet:
+        return self.inner.default_wallet(uid)
+
+    def commit(self) -> None:
+        self.inner.commit()
+
+    def rollback(self) -> None:
+        self.inner.rollback()
+
+
+class CachedTransactionRepository:
+    def __init__(self, inner: ITransactionRepository, cache: ReadCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def create(self, transaction: ITransaction) -> Result[int]:
+        result = self.inner.create(transaction)
+        if result.status == ResultStatus.SUCCESS:
+            self.cache.invalidate(
+                wallet_tag(transaction.get_sender_address()),
+                wallet_tag(transaction.get_receiver_address()),
+                STATISTICS,
+            )
+        return result
+
+    def get_wallet_transactions(
+        self,
+        wallet_address: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        return self.cache.load(
+            ("transactions", (wallet_address,), after_id, limit, descending),
+            lambda: self.inner.get_wallet_transactions(
+                wallet_address, after_id, limit, descending
+            ),
+            lambda result: _succeeded(result, [wallet_tag(wallet_address)]),
+        )
+
+    def get_transactions_for_wallets(
+        self,
+        wallet_addresses: List[int],
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        addresses = tuple(sorted(set(wallet_addresses)))
+        return self.cache.load(
+            ("transactions", addresses, after_id, limit, descending),
+            lambda: self.inner.get_transactions_for_wallets(
+                wallet_addresses, after_id, limit, descending
+            ),
+            lambda result: _succeeded(result, map(wallet_tag, addresses)),
+        )
+
+    # streamed exports bypass the cache
+    def iter_wallet_transactions(
+        self,
+        wallet_address: int,
+        from_id: Optional[int] = None,
+        to_id: Optional[int] = None,
+    ) -> Iterator[ITransaction]:
+        return self.inner.iter_wallet_transactions(wallet_address, from_id, to_id)
+
+    def get_transaction_count(self) -> Result[int]:
+        return self.cache.load(
+            ("transaction_count",),
+            self.inner.get_transaction_count,
+            lambda result: _succeeded(result, [STATISTICS]),
+        )
+
+    def get_total_fees(self) -> Result[float]:
+        return self.cache.load(
+            ("total_fees",),
+            self.inner.get_total_fees,
+            lambda result: _succeeded(result, [STATISTICS]),
+        )
+
+    def commit(self) -> None:
+        self.inner.commit()
+
+    def rollback(self) -> None:
+        self.inner.rollback()
+
+
+class CachedProfitsRepository(IProfitsRepository):
+    def __init__(self, inner: IProfitsRepository, cache: ReadCache) -> None:
+        super().__init__()
+        self.inner = inner
+        self.cache = cache
+
+    def add_system_profit(
+        self, transaction_id: int, system_profit: float
+    ) -> Result[int]:
+        result = self.inner.add_system_profit(transaction_id, system_profit)
+        if result.status == ResultStatus.SUCCESS:
+            self.cache.invalidate(STATISTICS)
+        return result
+
+    def get_total_profit(self) -> Result[float]:
+        return self.cache.load(
+            ("total_profit",),
+            self.inner.get_total_profit,
+            lambda result: _succeeded(result, [STATISTICS]),
+        )
+
+    def commit(self) -> None:
+        self.inner.commit()
+
+    def rollback(self) -> None:
+        self.inner.rollback()
+
+
+class CachedStatisticsRollupsRepository(IStatisticsRollupsRepository):
+    def __init__(self, inner: IStatisticsRollupsRepository, cache: ReadCache) -> None:
+        super().__init__()
+        self.inner = inner
+        self.cache = cache
+
+    def get_rollups(
+        self, granularity: int, start: Optional[float], end: Optional[float]
+    ) -> Result[List[StatisticsBucket]]:
+        return self.cache.load(
+            ("rollups", granularity, start, end),
+            lambda: self.inner.get_rollups(granularity, start, end),
+            lambda result: _succeeded(result, [STATISTICS]),
+        )
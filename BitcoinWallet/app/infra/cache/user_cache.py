@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+from app.core.auth.interactor import IUserRepository
+from app.utils.result import Result, ResultStatus
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedUserRepository:
+    """
+    Caches api_key -> user_id lookups of the wrapped repository. Unknown keys
+    are cached for negative_ttl seconds. Inside request_scope() every key is
+    resolved at most once, no matter how many interactors and repositories
+    ask for it.
+    """
+
+    def __init__(
+        self,
+        inner: IUserRepository,
+        capacity: int = 10_000,
+        negative_ttl: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.inner = inner
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        # entries are (user_id, expires_at); known keys never expire
+        self.cache: LRUCache[str, Tuple[Optional[int], float]] = LRUCache(capacity)
+        self._identities: ContextVar[Optional[Dict[str, Optional[int]]]] = ContextVar(
+            "request_identities", default=None
+        )
+
+    def register_user(self, username: str) -> Result[str]:
+        result = self.inner.register_user(username)
+        if result.status == ResultStatus.SUCCESS and result.data is not None:
+            self.invalidate(result.data)
+        return result
+
+    def get_user_id(self, api_key: str) -> Optional[int]:
+        identities = self._identities.get()
+        if identities is not None and api_key in identities:
+            return identities[api_key]
+
+        user_id = self._lookup(api_key)
+        if identities is not None:
+            identities[api_key] = user_id
+        return user_id
+
+    def invalidate(self, api_key: str) -> None:
+        self.cache.invalidate(api_key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        token = self._identities.set({})
+        try:
+            yield
+        finally:
+            self._identities.reset(token)
+
+    def _lookup(self, api_key: str) -> Optional[int]:
+        cached = self.cache.get(api_key)
+        if cached is not None:
+            user_id, expires_at = cached
+            if user_id is not None or self.clock() < expires_at:
+                return user_id
+
+        user_id = self.inner.get_user_id(api_key)
+        if user_id is None:
+            self.cache.put(api_key, (None, self.clock() + self.negative_ttl))
+        else:
+            self.cache.put(api_key, (user_id, float("inf")))
+        return user_id
@@ -1,3 +1,6 @@
+from contextlib import ExitStack
+from typing import AsyncIterator
+
 from starlette.requests import Request
 
 from app.core.facade import WalletService
@@ -5,3 +8,12 @@ from app.core.facade import WalletService
 
 def get_core(request: Request) -> WalletService:
     return request.app.state.core
+
+
+# async so the scopes are entered in the request's own context, which the
+# threadpool running the endpoint inherits
+async def request_scope(request: Request) -> AsyncIterator[None]:
+    with ExitStack() as stack:
+        for scope in getattr(request.app.state, "request_scopes", []):
+            stack.enter_context(scope())
+        yield
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 
 from app.core.facade import WalletService
 from app.core.statistics.interactor import StatisticsRequest, StatisticsResponse
@@ -10,6 +12,19 @@ statistics_api = APIRouter()
 
 @statistics_api.get("/statistics")
 def get_statistics(
-    user_key: str, core: WalletService = Depends(get_core)
+    user_key: str,
+    from_time: Optional[float] = Query(default=None, alias="from"),
+    to_time: Optional[float] = Query(default=None, alias="to"),
+    granularity: Optional[str] = None,
+    core: WalletService = Depends(get_core),
 ) -> Result[StatisticsResponse]:
-    return core.get_statistics(request=StatisticsRequest(user_key=user_key))
+    # from and to are unix seconds, widened to whole buckets; granularity is
+    # minute, hour or day
+    return core.get_statistics(
+        request=StatisticsRequest(
+            user_key=user_key,
+            from_time=from_time,
+            to_time=to_time,
+            granularity=granularity,
+        )
+    )
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends
+import json
+from typing import Iterable, Iterator, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.responses import Response
 
 from app.core.facade import WalletService
 from app.core.transaction.interactor import (
+    ExportTransactionsRequest,
     MakeTransactionRequest,
     MakeTransactionResponse,
     UserTransactionsRequest,
@@ -9,8 +16,9 @@ from app.core.transaction.interactor import (
     WalletTransactionsRequest,
     WalletTransactionsResponse,
 )
+from app.core.transaction.transaction import ITransaction
 from app.infra.fastapi.dependables import get_core
-from app.utils.result import Result
+from app.utils.result import Result, ResultStatus
 
 transactions_api = APIRouter()
 
@@ -28,15 +36,65 @@ def make_transaction(
     )
 
 
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
 @transactions_api.get("/transactions")
 def get_transactions(
-    api_key: str, core: WalletService = Depends(get_core)
+    api_key: str,
+    after_id: Optional[int] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    descending: bool = False,
+    core: WalletService = Depends(get_core),
 ) -> Result[UserTransactionsResponse]:
-    return core.get_user_transactions(UserTransactionsRequest(api_key))
+    return core.get_user_transactions(
+        UserTransactionsRequest(api_key, after_id, limit, descending)
+    )
 
 
 @transactions_api.get("/wallets/{address}/transactions")
 def get_wallet_transactions(
-    api_key: str, address: int, core: WalletService = Depends(get_core)
+    api_key: str,
+    address: int,
+    after_id: Optional[int] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    descending: bool = False,
+    core: WalletService = Depends(get_core),
 ) -> Result[WalletTransactionsResponse]:
-    return core.get_wallet_transactions(WalletTransactionsRequest(api_key, address))
+    return core.get_wallet_transactions(
+        WalletTransactionsRequest(api_key, address, after_id, limit, descending)
+    )
+
+
+def ndjson_lines(transactions: Iterable[ITransaction]) -> Iterator[bytes]:
+    for transaction in transactions:
+        row = {
+            "transaction_id": transaction.get_transaction_id(),
+            "sender_address": transaction.get_sender_address(),
+            "receiver_address": transaction.get_receiver_address(),
+            "balance": transaction.get_balance(),
+            "kind": int(transaction.get_kind()),
+            "system_fee": transaction.calculate_system_profit(),
+        }
+        yield (json.dumps(row) + "\n").encode()
+
+
+# the history is read lazily while the response is sent, from a connection
+# of its own, so memory use does not grow with its size
+@transactions_api.get("/wallets/{address}/transactions/export")
+def export_wallet_transactions(
+    api_key: str,
+    address: int,
+    from_id: Optional[int] = None,
+    to_id: Optional[int] = None,
+    core: WalletService = Depends(get_core),
+) -> Response:
+    result = core.export_wallet_transactions(
+        ExportTransactionsRequest(api_key, address, from_id, to_id)
+    )
+    if result.status != ResultStatus.SUCCESS or result.data is None:
+        return JSONResponse(jsonable_encoder(result))
+    return StreamingResponse(
+        ndjson_lines(result.data), media_type="application/x-ndjson"
+    )
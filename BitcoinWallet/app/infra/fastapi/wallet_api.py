@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
 
 from app.core.facade import WalletService
 from app.core.wallet.interactor import (
     CreateWalletRequest,
     GetWalletRequest,
     GetWalletResponse,
+    GetWalletsRequest,
+    GetWalletsResponse,
 )
 from app.infra.fastapi.dependables import get_core
 from app.utils.result import Result
@@ -19,10 +23,29 @@ def create_new_wallet(
     return core.create_wallet(request=CreateWalletRequest(api_key=api_key))
 
 
+@wallet_api.get("/wallets")
+def get_wallets(
+    api_key: str,
+    addresses: List[int] = Query(default=[]),
+    currencies: List[str] = Query(default=[]),
+    core: WalletService = Depends(get_core),
+) -> Result[GetWalletsResponse]:
+    return core.get_wallets(
+        request=GetWalletsRequest(
+            api_key=api_key, wallet_addresses=addresses, currencies=currencies
+        )
+    )
+
+
 @wallet_api.get("/wallets/{address}")
 def get_wallet(
-    address: int, api_key: str, core: WalletService = Depends(get_core)
+    address: int,
+    api_key: str,
+    currencies: List[str] = Query(default=[]),
+    core: WalletService = Depends(get_core),
 ) -> Result[GetWalletResponse]:
     return core.get_wallet(
-        request=GetWalletRequest(api_key=api_key, wallet_address=address)
+        request=GetWalletRequest(
+            api_key=api_key, wallet_address=address, currencies=currencies
+        )
     )
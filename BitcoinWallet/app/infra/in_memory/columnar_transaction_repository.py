@@ -0,0 +1,139 @@
+import heapq
+import itertools
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.core.transaction.transaction import KINDS, ITransaction, SimpleTransaction
+from app.infra.in_memory.in_memory_transaction_repository import id_range, past_cursor
+from app.utils.result import Result, ResultStatus
+
+EXPORT_BATCH_SIZE = 500
+
+
+class ColumnarTransactionRepository:
+    """
+    In-memory transactions stored column by column in typed arrays: about
+    55 bytes per transaction with the postings at 10M rows, against about
+    335 for a list of objects. A transaction's id is its row number. Every
+    address has a postings array with the rows it appears in, ascending, so
+    a wallet query touches only that wallet's rows. Transactions are rebuilt
+    from their row when read, with their kind rather than a decorator.
+    """
+
+    def __init__(self) -> None:
+        self.senders = array("q")
+        self.receivers = array("q")
+        self.amounts = array("d")
+        self.kinds = array("b")
+        self.fees = array("d")
+        self.total_fees = 0.0
+        self.postings: Dict[int, "array[int]"] = {}
+
+    # return newly created transaction's id
+    def create(self, transaction: ITransaction) -> Result[int]:
+        try:
+            row = len(self.senders)
+            sender = transaction.get_sender_address()
+            receiver = transaction.get_receiver_address()
+            kind = transaction.get_kind()
+            self.senders.append(sender)
+            self.receivers.append(receiver)
+            self.amounts.append(transaction.get_balance())
+            self.kinds.append(kind)
+            self.fees.append(transaction.calculate_system_profit())
+        except Exception as e:
+            # a column that took the value is cut back to the others
+            del self.senders[row:]
+            del self.receivers[row:]
+            del self.amounts[row:]
+            del self.kinds[row:]
+            del self.fees[row:]
+            return Result(ResultStatus.FAIL, exception=e)
+        self.total_fees += self.fees[row]
+        self._post(sender, row)
+        if receiver != sender:
+            self._post(receiver, row)
+        return Result(ResultStatus.SUCCESS, row)
+
+    def _post(self, address: int, row: int) -> None:
+        rows = self.postings.get(address)
+        if rows is None:
+            rows = self.postings[address] = array("q")
+        rows.append(row)
+
+    def transactions(self, rows: Iterable[int]) -> List[ITransaction]:
+        senders, receivers, amounts, kinds, fees = (
+            self.senders,
+            self.receivers,
+            self.amounts,
+            self.kinds,
+            self.fees,
+        )
+        return [
+            SimpleTransaction(
+                senders[row],
+                receivers[row],
+                amounts[row],
+                row,
+                KINDS[kinds[row]],
+                fees[row],
+            )
+            for row in rows
+        ]
+
+    def get_wallet_transactions(
+        self,
+        wallet_address: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        return self.get_transactions_for_wallets(
+            [wallet_address], after_id, limit, descending
+        )
+
+    def get_transactions_for_wallets(
+        self,
+        wallet_addresses: List[int],
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        postings = [
+            past_cursor(self.postings.get(address, array("q")), after_id, descending)
+            for address in set(wallet_addresses)
+        ]
+        rows: Iterator[int]
+        if len(postings) == 1:
+            rows = postings[0]
+        else:
+            # a row in two of the postings comes out of the merge twice in a row
+            merged = heapq.merge(*postings, reverse=descending)
+            rows = (row for row, _ in itertools.groupby(merged))
+        return Result(
+            ResultStatus.SUCCESS, self.transactions(itertools.islice(rows, limit))
+        )
+
+    def iter_wallet_transactions(
+        self,
+        wallet_address: int,
+        from_id: Optional[int] = None,
+        to_id: Optional[int] = None,
+    ) -> Iterator[ITransaction]:
+        rows = self.postings.get(wallet_address, array("q"))
+        span = id_range(rows, from_id, to_id)
+        for start in range(span.start, span.stop, EXPORT_BATCH_SIZE):
+            end = min(start + EXPORT_BATCH_SIZE, span.stop)
+            yield from self.transactions(rows[start:end])
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def get_transaction_count(self) -> Result[int]:
+        return Result(ResultStatus.SUCCESS, len(self.senders))
+
+    def get_total_fees(self) -> Result[float]:
+        return Result(ResultStatus.SUCCESS, self.total_fees)
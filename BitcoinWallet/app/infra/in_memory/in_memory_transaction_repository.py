@@ -1,15 +1,58 @@
+import bisect
+import heapq
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence
 
 from app.core.transaction.transaction import ITransaction
 from app.utils.result import Result, ResultStatus
 
 
+def past_cursor(
+    positions: Sequence[int], after_id: Optional[int], descending: bool
+) -> Iterator[int]:
+    """
+    The ascending positions after after_id, or before it when descending,
+    in listing order.
+    """
+    if descending:
+        end = len(positions)
+        if after_id is not None:
+            end = bisect.bisect_left(positions, after_id)
+        return (positions[i] for i in range(end - 1, -1, -1))
+    start = 0 if after_id is None else bisect.bisect_right(positions, after_id)
+    return (positions[i] for i in range(start, len(positions)))
+
+
+def id_range(
+    positions: Sequence[int], from_id: Optional[int], to_id: Optional[int]
+) -> range:
+    # indexes into positions of the ids within [from_id, to_id]
+    start = 0 if from_id is None else bisect.bisect_left(positions, from_id)
+    end = len(positions) if to_id is None else bisect.bisect_right(positions, to_id)
+    return range(start, end)
+
+
 @dataclass
 class InMemoryTransactionRepository:
     # bad idea but works as long as concurency is out of scope
     transactions_db: List[ITransaction] = field(default_factory=list)
     id_counter: int = field(default=0)
+    # wallet address -> ascending positions in transactions_db
+    address_index: Dict[int, List[int]] = field(default_factory=dict, init=False)
+    total_fees: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        for position, transaction in enumerate(self.transactions_db):
+            self._index(position, transaction)
+            self.total_fees += transaction.calculate_system_profit()
+
+    def _index(self, position: int, transaction: ITransaction) -> None:
+        addresses = {
+            transaction.get_sender_address(),
+            transaction.get_receiver_address(),
+        }
+        for address in addresses:
+            self.address_index.setdefault(address, []).append(position)
 
     # return newly created transaction's id
     def create(self, transaction: ITransaction) -> Result[int]:
@@ -17,22 +60,56 @@ class InMemoryTransactionRepository:
             transaction.transaction_id = self.id_counter
             self.id_counter += 1
             self.transactions_db.append(transaction)
+            self._index(len(self.transactions_db) - 1, transaction)
+            self.total_fees += transaction.calculate_system_profit()
             return Result(ResultStatus.SUCCESS, transaction.transaction_id)
         except Exception as e:
             return Result(ResultStatus.FAIL, exception=e)
 
     def get_wallet_transactions(
-        self, wallet_address: int
+        self,
+        wallet_address: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        return self.get_transactions_for_wallets(
+            [wallet_address], after_id, limit, descending
+        )
+
+    def get_transactions_for_wallets(
+        self,
+        wallet_addresses: List[int],
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
     ) -> Result[List[ITransaction]]:
-        result = list()
-        for transaction in self.transactions_db:
-            if (
-                transaction.get_sender_address() == wallet_address
-                or transaction.get_receiver_address() == wallet_address
-            ):
-                result.append(transaction)
+        # ids are list positions, so the cursor cuts every postings list
+        # with one bisect; merging the cut lists yields the page in order
+        postings = [
+            past_cursor(self.address_index.get(address, []), after_id, descending)
+            for address in set(wallet_addresses)
+        ]
+        result: List[ITransaction] = list()
+        previous = None
+        for position in heapq.merge(*postings, reverse=descending):
+            if limit is not None and len(result) >= limit:
+                break
+            if position != previous:
+                result.append(self.transactions_db[position])
+                previous = position
         return Result(ResultStatus.SUCCESS, result)
 
+    def iter_wallet_transactions(
+        self,
+        wallet_address: int,
+        from_id: Optional[int] = None,
+        to_id: Optional[int] = None,
+    ) -> Iterator[ITransaction]:
+        positions = self.address_index.get(wallet_address, [])
+        for index in id_range(positions, from_id, to_id):
+            yield self.transactions_db[positions[index]]
+
     def commit(self) -> None:
         pass
 
@@ -41,3 +118,6 @@ class InMemoryTransactionRepository:
 
     def get_transaction_count(self) -> Result[int]:
         return Result(ResultStatus.SUCCESS, len(self.transactions_db))
+
+    def get_total_fees(self) -> Result[float]:
+        return Result(ResultStatus.SUCCESS, self.total_fees)
@@ -8,6 +8,7 @@ class ProfitsInMemoryRepository(IProfitsRepository):
     def __init__(self) -> None:
         self.profits_db: List[IProfit] = []
         self.id_counter: int = 1
+        self.total_profit: float = 0
 
     def add_system_profit(
         self, transaction_id: int, system_profit: float
@@ -16,18 +17,13 @@ class ProfitsInMemoryRepository(IProfitsRepository):
             profit: IProfit = IProfit(self.id_counter, transaction_id, system_profit)
             self.id_counter += 1
             self.profits_db.append(profit)
+            self.total_profit += system_profit
             return Result(status=ResultStatus.SUCCESS, data=profit.id)
         except Exception as e:
             return Result(status=ResultStatus.FAIL, exception=e)
 
     def get_total_profit(self) -> Result[float]:
-        try:
-            total_profit: float = sum(
-                [profit.system_profit for profit in self.profits_db]
-            )
-            return Result(status=ResultStatus.SUCCESS, data=total_profit)
-        except Exception as e:
-            return Result(status=ResultStatus.FAIL, exception=e)
+        return Result(status=ResultStatus.SUCCESS, data=self.total_profit)
 
     def commit(self) -> None:
         pass
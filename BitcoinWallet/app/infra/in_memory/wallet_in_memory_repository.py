@@ -3,7 +3,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
 from app.core.auth.interactor import IUserRepository
-from app.core.wallet.wallet import BitcoinWallet, IWallet
+from app.core.wallet.wallet import BitcoinWallet, IWallet, select_wallets
 
 
 @dataclass
@@ -11,6 +11,13 @@ class AbstractInMemoryWalletRepository:
     user_repository: IUserRepository
     max_number_of_wallets: int = field(default=3)
     wallet_dict: Dict[int, List[IWallet]] = field(default_factory=dict)
+    # address -> (uid, wallet), kept in sync with wallet_dict
+    wallet_index: Dict[int, Tuple[int, IWallet]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for uid, wallets in self.wallet_dict.items():
+            for wallet in wallets:
+                self.wallet_index[wallet.get_address()] = (uid, wallet)
 
     def create_wallet(self, api_key: str) -> Tuple[Optional[IWallet], Optional[str]]:
         uid = self.user_repository.get_user_id(api_key)
@@ -21,11 +28,15 @@ class AbstractInMemoryWalletRepository:
             return None, f"Can't create more than {self.max_number_of_wallets} wallets"
 
         new_wallet = self.default_wallet(uid)
+        self._add_wallet(uid, new_wallet)
+        return new_wallet, None
+
+    def _add_wallet(self, uid: int, wallet: IWallet) -> None:
         if uid in self.wallet_dict:
-            self.wallet_dict[uid].append(new_wallet)
+            self.wallet_dict[uid].append(wallet)
         else:
-            self.wallet_dict[uid] = [new_wallet]
-        return new_wallet, None
+            self.wallet_dict[uid] = [wallet]
+        self.wallet_index[wallet.get_address()] = (uid, wallet)
 
     def get_wallet(
         self, api_key: str, address: int
@@ -34,14 +45,20 @@ class AbstractInMemoryWalletRepository:
 
         if uid is None:
             return None, "Couldn't verify user"
-        if uid not in self.wallet_dict:
+
+        owner, wallet = self._find_wallet(address)
+        if wallet is None or owner != uid:
             return None, "Couldn't find wallet with that address"
+        return wallet, None
 
-        for wallet in self.wallet_dict[uid]:
-            if wallet.get_address() == address:
-                return wallet, None
+    def get_wallets(
+        self, api_key: str, addresses: List[int]
+    ) -> Tuple[List[IWallet], Optional[str]]:
+        uid = self.user_repository.get_user_id(api_key)
+        if uid is None:
+            return [], "Couldn't verify user"
 
-        return None, "Couldn't find wallet with that address"
+        return select_wallets(self.get_user_wallets(uid), addresses)
 
     def num_wallets(self, user_id: int) -> int:
         return len(self.get_user_wallets(user_id=user_id))
@@ -50,76 +67,47 @@ class AbstractInMemoryWalletRepository:
         if amount <= 0:
             return False, "Can't deposit non-positive amount"
 
-        uid, wallet = self._find_wallet_and_remove(wallet_address)
-
+        _, wallet = self._find_wallet(wallet_address)
         if wallet is None:
-            print("wallet is none")
             return False, "Can't find wallet with that address"
 
         wallet.deposit(amount)
-
-        self.wallet_dict[uid].append(wallet)
         return True, None
 
     def withdraw(self, wallet_address: int, amount: float) -> (bool, Optional[str]):
         if amount <= 0:
             return False, "Can't withdraw non-positive amount"
 
-        uid, wallet = self._find_wallet_and_remove(wallet_address)
+        _, wallet = self._find_wallet(wallet_address)
         if wallet is None:
             return False, "Can't find wallet with that address"
 
         if wallet.get_amount() < amount:
-            self.wallet_dict[uid].append(wallet)
             return False, "Not enough money"
 
         wallet.withdraw(amount)
-
-        self.wallet_dict[uid].append(wallet)
         return True, None
 
-    def _find_wallet_and_remove(self, wallet_address: int) -> (int, Optional[IWallet]):
-        for uid in self.wallet_dict:
-            for wallet in self.wallet_dict[uid]:
-                if wallet.get_address() == wallet_address:
-                    self.wallet_dict[uid].remove(wallet)
-                    return uid, wallet
-
-        return -1, None
+    def _find_wallet(self, wallet_address: int) -> (int, Optional[IWallet]):
+        return self.wallet_index.get(wallet_address, (-1, None))
 
     def wallets_belong_to_the_same_user(
         self, first_wallet_address: int, second_wallet_address: int
     ) -> bool:
-        first_wallet_user = None
-        second_wallet_user = None
-
-        for uid in self.wallet_dict:
-            for wallet in self.wallet_dict[uid]:
-                if wallet.get_address() == first_wallet_address:
-                    first_wallet_user = uid
-                if wallet.get_address() == second_wallet_address:
-                    second_wallet_user = uid
-            if first_wallet_user is not None or second_wallet_user is not None:
-                break
-
-        if first_wallet_user is None or second_wallet_user is None:
+        first_wallet_user, first_wallet = self._find_wallet(first_wallet_address)
+        second_wallet_user, second_wallet = self._find_wallet(second_wallet_address)
+
+        if first_wallet is None or second_wallet is None:
             return False
 
         return first_wallet_user == second_wallet_user
 
     def get_user_wallets(self, user_id: int) -> List[IWallet]:
         if user_id not in self.wallet_dict:
-            print(f"Current wallet: {self.wallet_dict}")
             return []
 
         return self.wallet_dict[user_id]
 
-    def commit(self) -> None:
-        print(f"Committed: {self.wallet_dict}")
-
-    def rollback(self) -> None:
-        print(f"Can't roll back: {self.wallet_dict}")
-
     @abstractmethod
     def default_wallet(self, uid: int) -> IWallet:
         pass
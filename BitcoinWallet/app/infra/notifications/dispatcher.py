@@ -0,0 +1,260 @@
+import enum
+import json
+import os
+import queue
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, List, Optional, Protocol, Union
+
+from app.core.transaction.interactor import IObserver
+from app.core.transaction.transaction import ITransaction, TransactionKind
+from app.utils.slots import slotted
+
+
+@slotted
+@dataclass(frozen=True)
+class TransactionEvent:
+    """
+    What observers receive: a snapshot of a succeeded transaction that can
+    be handed to other threads and written to disk.
+    """
+
+    transaction_id: int
+    sender_address: int
+    receiver_address: int
+    balance: float
+    system_profit: float
+    kind: TransactionKind = TransactionKind.SIMPLE
+
+    @classmethod
+    def of(cls, transaction: ITransaction) -> "TransactionEvent":
+        return cls(
+            transaction_id=transaction.get_transaction_id(),
+            sender_address=transaction.get_sender_address(),
+            receiver_address=transaction.get_receiver_address(),
+            balance=transaction.get_balance(),
+            system_profit=transaction.calculate_system_profit(),
+            kind=transaction.get_kind(),
+        )
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def loads(cls, line: str) -> "TransactionEvent":
+        record = json.loads(line)
+        record["kind"] = TransactionKind(record.get("kind", TransactionKind.SIMPLE))
+        return cls(**record)
+
+    def calculate_system_profit(self) -> float:
+        return self.system_profit
+
+    def get_balance(self) -> float:
+        return self.balance
+
+    def get_sender_address(self) -> int:
+        return self.sender_address
+
+    def get_receiver_address(self) -> int:
+        return self.receiver_address
+
+    def get_transaction_id(self) -> int:
+        return self.transaction_id
+
+    def get_kind(self) -> TransactionKind:
+        return self.kind
+
+
+# receives up to max_batch_size events per call
+class IBatchObserver(Protocol):
+    def on_transactions_succeeded(self, transactions: List[TransactionEvent]) -> None:
+        pass
+
+
+class Backpressure(enum.Enum):
+    # what notify does when the queue is full
+    DROP = "drop"
+    BLOCK = "block"
+    SPILL = "spill"
+
+
+# delivery counters of one observer
+@dataclass
+class Subscription:
+    observer: Union[IObserver, IBatchObserver]
+    delivered: int = 0
+    failures: int = 0
+    last_error: Optional[BaseException] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def deliver(self, batch: List[TransactionEvent]) -> None:
+        try:
+            on_batch = getattr(self.observer, "on_transactions_succeeded", None)
+            if on_batch is not None:
+                on_batch(batch)
+            else:
+                for event in batch:
+                    self.observer.on_transaction_succeeded(event)  # type: ignore
+        except Exception as e:
+            with self.lock:
+                self.failures += 1
+                self.last_error = e
+            return
+        with self.lock:
+            self.delivered += len(batch)
+
+
+_STOP = object()
+
+
+class ObserverDispatcher:
+    """
+    Observer that hands transactions to subscribed observers on a pool of
+    worker threads, so a slow notifier never holds up a transfer. Events go
+    through a queue of at most capacity entries; when it is full, notify
+    drops the event, blocks until there is room, or appends it to
+    spill_path, depending on backpressure. Spilled events are delivered once
+    the workers are idle again, also after a restart, and may arrive out of
+    order. Spilled lines that cannot be parsed, e.g. one cut short by a
+    crash mid-append, are skipped and counted in unreadable.
+
+    Workers take up to max_batch_size queued events at once and deliver them
+    to every observer, as one call for IBatchObserver and event by event
+    otherwise. Workers run concurrently, so observers must be thread-safe.
+    An observer that raises only loses that batch; the others still get it.
+    Delivery is at most once: nothing is retried. Anything else that goes
+    wrong in a worker is counted in worker_errors and the worker carries on.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        workers: int = 2,
+        max_batch_size: int = 100,
+        backpressure: Backpressure = Backpressure.DROP,
+        spill_path: Optional[str] = None,
+        idle_interval: float = 1.0,
+    ) -> None:
+        if backpressure == Backpressure.SPILL and spill_path is None:
+            raise ValueError("spilling needs a spill_path")
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.backpressure = backpressure
+        self.spill_path = spill_path
+        self.idle_interval = idle_interval
+        self.dropped = 0
+        self.spilled = 0
+        self.unreadable = 0
+        self.worker_errors = 0
+        self.last_error: Optional[BaseException] = None
+        self._subscriptions: List[Subscription] = []
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=capacity)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+
+    def subscribe(self, observer: Union[IObserver, IBatchObserver]) -> Subscription:
+        subscription = Subscription(observer)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def on_transaction_succeeded(self, transaction: ITransaction) -> None:
+        event = TransactionEvent.of(transaction)
+        if self.backpressure == Backpressure.BLOCK:
+            self._queue.put(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            if self.backpressure == Backpressure.SPILL:
+                self._spill(event)
+            else:
+                with self._lock:
+                    self.dropped += 1
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"observer-dispatch-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    # queued events are delivered before the workers exit
+    def stop(self) -> None:
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_interval)
+            except queue.Empty:
+                self._guarded(self._deliver_spilled)
+                continue
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            self._guarded(self._deliver, batch)
+            if stopping:
+                return
+            if self._queue.empty():
+                self._guarded(self._deliver_spilled)
+
+    # keeps the worker alive whatever a delivery raises
+    def _guarded(self, deliver: Callable[..., None], *args: Any) -> None:
+        try:
+            deliver(*args)
+        except Exception as e:
+            with self._lock:
+                self.worker_errors += 1
+                self.last_error = e
+
+    def _deliver(self, batch: List[TransactionEvent]) -> None:
+        for subscription in self._subscriptions:
+            subscription.deliver(batch)
+
+    def _spill(self, event: TransactionEvent) -> None:
+        assert self.spill_path is not None
+        line = event.dumps()
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as spill:
+                spill.write(line + "\n")
+            self.spilled += 1
+
+    def _deliver_spilled(self) -> None:
+        if self.spill_path is None:
+            return
+        # take the whole file so notify can start a new one meanwhile
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return
+            with open(self.spill_path, encoding="utf-8") as spill:
+                lines = spill.read().splitlines()
+            os.remove(self.spill_path)
+        events = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                events.append(TransactionEvent.loads(line))
+            except (ValueError, TypeError, KeyError):
+                with self._lock:
+                    self.unreadable += 1
+        for start in range(0, len(events), self.max_batch_size):
+            self._deliver(events[start : start + self.max_batch_size])
@@ -0,0 +1,32 @@
+import json
+import urllib.request
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from app.infra.notifications.dispatcher import TransactionEvent
+
+
+class WebhookObserver:
+    """
+    Posts each batch of succeeded transactions as one JSON document,
+    {"transactions": [...]}, to url. A non-2xx answer or a network error
+    raises, which the dispatcher counts as a failed delivery.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 5,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def on_transactions_succeeded(self, transactions: List[TransactionEvent]) -> None:
+        body = json.dumps({"transactions": [asdict(t) for t in transactions]})
+        request = urllib.request.Request(
+            self.url, data=body.encode(), headers=self.headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
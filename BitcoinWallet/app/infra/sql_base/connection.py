@@ -0,0 +1,213 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import ContextManager, Iterator, List, Optional, Protocol, Type
+
+from app.infra.sql_base.migrations import migrate
+from app.infra.sql_base.storage_profile import StorageProfile
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    pass
+
+
+class IConnectionProvider(Protocol):
+    def connection(self) -> sqlite3.Connection:
+        pass
+
+    # for reads that outlive the current request or transaction
+    def reader(self) -> ContextManager[sqlite3.Connection]:
+        pass
+
+
+class SharedConnection:
+    """
+    Hands out the same connection to every caller. Used when a repository is
+    given a plain connection, or nothing but a database name.
+    """
+
+    def __init__(self, con: sqlite3.Connection, owned: bool = False) -> None:
+        self.con = con
+        self.owned = owned
+        migrate(con)
+
+    def connection(self) -> sqlite3.Connection:
+        return self.con
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        yield self.con
+
+    def __del__(self) -> None:
+        if self.owned:
+            self.con.close()
+
+
+class _Lease:
+    def __init__(self) -> None:
+        self.con: Optional[sqlite3.Connection] = None
+
+
+class SQLiteConnectionPool:
+    """
+    At most pool_size connections to one database file. Inside
+    request_scope() the first connection() call checks a connection out,
+    and every later call in that scope returns the same one. That way all
+    repositories of a request share its transaction. The connection goes
+    back to the pool when the scope ends, and any unfinished transaction is
+    rolled back first.
+
+    Outside a scope, every thread gets its own connection, created on first
+    use. A ":memory:" database exists only within one connection, so it is
+    opened once and shared by everyone. The profile, if any, is applied to
+    every connection when it is opened.
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        pool_size: int = 8,
+        checkout_timeout: float = 30,
+        profile: Optional[StorageProfile] = None,
+    ) -> None:
+        self.db_name = db_name
+        self.pool_size = pool_size
+        self.profile = profile
+        self.checkout_timeout = checkout_timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._lease: ContextVar[Optional[_Lease]] = ContextVar(
+            "sqlite_lease", default=None
+        )
+        self._shared = self._connect() if db_name == ":memory:" else None
+
+    # whether every caller gets the same connection, and so its transaction
+    @property
+    def shares_connection(self) -> bool:
+        return self._shared is not None
+
+    def connection(self) -> sqlite3.Connection:
+        if self._shared is not None:
+            return self._shared
+        lease = self._lease.get()
+        if lease is None:
+            return self._thread_connection()
+        if lease.con is None:
+            lease.con = self._checkout()
+        return lease.con
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        # checkout is lazy: entering the scope never blocks
+        lease = _Lease()
+        token = self._lease.set(lease)
+        try:
+            yield
+        finally:
+            self._lease.reset(token)
+            if lease.con is not None:
+                self._release(lease.con)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        A connection of its own, outside the pool and closed afterwards, so
+        a long read neither holds a pooled connection nor sees it reset.
+        """
+        if self._shared is not None:
+            yield self._shared
+            return
+        con = sqlite3.connect(self.db_name, check_same_thread=False)
+        try:
+            if self.profile is not None:
+                self.profile.apply(con)
+            yield con
+        finally:
+            con.close()
+
+    @contextmanager
+    def bind(self, con: sqlite3.Connection) -> Iterator[None]:
+        """
+        Makes connection() return con in the current context, e.g. for a
+        thread that owns a connection outside the pool.
+        """
+        lease = _Lease()
+        lease.con = con
+        token = self._lease.set(lease)
+        try:
+            yield
+        finally:
+            self._lease.reset(token)
+
+    def open_connection(
+        self, factory: Type[sqlite3.Connection] = sqlite3.Connection
+    ) -> sqlite3.Connection:
+        """
+        A new connection outside the pool, configured and migrated like the
+        pooled ones and closed together with them.
+        """
+        return self._connect(factory)
+
+    def close(self) -> None:
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for con in opened:
+            con.close()
+
+    def _checkout(self) -> sqlite3.Connection:
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise PoolTimeoutError(
+                f"no connection to {self.db_name} free after {self.checkout_timeout}s"
+            )
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, con: sqlite3.Connection) -> None:
+        try:
+            if con.in_transaction:
+                con.rollback()
+            self._idle.put(con)
+        finally:
+            self._slots.release()
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        con: Optional[sqlite3.Connection] = getattr(self._local, "con", None)
+        if con is None:
+            con = self._connect()
+            self._local.con = con
+        return con
+
+    def _connect(
+        self, factory: Type[sqlite3.Connection] = sqlite3.Connection
+    ) -> sqlite3.Connection:
+        con = sqlite3.connect(self.db_name, check_same_thread=False, factory=factory)
+        if self.profile is not None:
+            self.profile.apply(con)
+        migrate(con)
+        with self._lock:
+            self._opened.append(con)
+        return con
+
+
+def connection_provider(
+    db_name: str,
+    connection: Optional[sqlite3.Connection] = None,
+    connections: Optional[IConnectionProvider] = None,
+) -> IConnectionProvider:
+    if connections is not None:
+        return connections
+    if connection is not None:
+        return SharedConnection(connection)
+    return SharedConnection(sqlite3.connect(db_name, check_same_thread=False), owned=True)
@@ -0,0 +1,56 @@
+import sqlite3
+
+import numpy as np
+
+from app.core.transaction.fees import FeePolicy
+from app.infra.fees.vectorized import NO_USER, vectorized_fees
+
+REPRICE_BATCH_SIZE = 50_000
+
+
+def reprice_fees(
+    con: sqlite3.Connection,
+    policy: FeePolicy,
+    batch_size: int = REPRICE_BATCH_SIZE,
+) -> int:
+    """
+    Recomputes the system_fee of every stored transaction under the policy,
+    in id order and batch_size rows at a time, within a single transaction.
+    Only rows whose fee changes are written; the triggers carry the change
+    into the statistics and rollups. Returns the number of rows changed.
+    """
+    changed = 0
+    last_id = -1
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        while True:
+            rows = con.execute(
+                f"""SELECT transactions.id, balance, kind, system_fee,
+                    COALESCE(wallet.user_id, {NO_USER})
+                FROM transactions
+                LEFT JOIN wallet ON wallet.wallet_address = transactions.sender
+                WHERE transactions.id > ?
+                ORDER BY transactions.id LIMIT ?""",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            ids, balances, kinds, stored, users = zip(*rows)
+            fees = vectorized_fees(
+                policy,
+                np.array(balances, dtype=np.float64),
+                np.array(kinds, dtype=np.int8),
+                np.array(users, dtype=np.int64),
+            )
+            moved = np.flatnonzero(fees != np.array(stored, dtype=np.float64))
+            con.executemany(
+                "UPDATE transactions SET system_fee = ? WHERE id = ?",
+                ((fees[i], ids[i]) for i in moved.tolist()),
+            )
+            changed += len(moved)
+            last_id = ids[-1]
+        con.commit()
+    except sqlite3.Error:
+        con.rollback()
+        raise
+    return changed
@@ -0,0 +1,367 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: Tuple[str, ...]
+
+
+# rollup bucket widths in seconds
+ROLLUP_GRANULARITIES = (60, 3600, 86400)
+
+
+def _bucket(width: int, row: str) -> str:
+    return f"CAST({row}.created_at / {width} AS INTEGER) * {width}"
+
+
+def _rollup_trigger(name: str, event: str, condition: str, body: str) -> str:
+    statements = "\n".join(
+        body.format(width=width, bucket=_bucket(width, "NEW" if "NEW" in condition else "OLD"))
+        for width in ROLLUP_GRANULARITIES
+    )
+    return f"""CREATE TRIGGER IF NOT EXISTS {name} {event} WHEN {condition} BEGIN
+{statements}
+END"""
+
+
+def _rebuild_rollups(width: int) -> str:
+    return f"""INSERT INTO statistics_rollups
+        (granularity, bucket, transaction_count, volume, profit)
+    SELECT {width}, bucket, SUM(transaction_count), SUM(volume), SUM(profit) FROM (
+        SELECT {_bucket(width, "transactions")} AS bucket,
+            1 AS transaction_count, balance AS volume, system_fee AS profit
+        FROM transactions WHERE created_at IS NOT NULL
+        UNION ALL
+        SELECT {_bucket(width, "profits")}, 0, 0, system_profit
+        FROM profits WHERE created_at IS NOT NULL
+    ) GROUP BY bucket"""
+
+
+# transfer fees live on their transactions; profits only holds profits
+# recorded on their own
+TOTAL_FEES = "(SELECT COALESCE(SUM(system_fee), 0) FROM transactions)"
+TOTAL_PROFIT = "(SELECT COALESCE(SUM(system_profit), 0) FROM profits)"
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="create base tables",
+        statements=(
+            """CREATE TABLE IF NOT EXISTS users
+            (id integer primary key, username text, api_key text)""",
+            """CREATE TABLE IF NOT EXISTS wallet
+            (wallet_address integer primary key autoincrement unique,
+            amount real,
+            user_id integer)""",
+            """CREATE TABLE IF NOT EXISTS transactions
+            (id integer primary key autoincrement,
+             sender integer,
+             receiver integer,
+             balance real)""",
+            """CREATE TABLE IF NOT EXISTS profits (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                transaction_id INTEGER,
+                system_profit REAL
+            )""",
+        ),
+    ),
+    Migration(
+        version=2,
+        description="index hot query columns",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS users_api_key ON users (api_key)",
+            "CREATE INDEX IF NOT EXISTS wallet_user_id ON wallet (user_id)",
+            "CREATE INDEX IF NOT EXISTS transactions_sender ON transactions (sender)",
+            "CREATE INDEX IF NOT EXISTS transactions_receiver ON transactions (receiver)",
+        ),
+    ),
+    Migration(
+        version=3,
+        description="maintain statistics aggregates",
+        statements=(
+            """CREATE TABLE IF NOT EXISTS statistics (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                transaction_count INTEGER NOT NULL,
+                total_profit REAL NOT NULL
+            )""",
+            """INSERT OR REPLACE INTO statistics (id, transaction_count, total_profit)
+            VALUES (
+                1,
+                (SELECT COUNT(*) FROM transactions),
+                (SELECT COALESCE(SUM(system_profit), 0) FROM profits)
+            )""",
+            # triggers run inside the writing statement's transaction, so
+            # the aggregates commit or roll back with the transfer
+            """CREATE TRIGGER IF NOT EXISTS statistics_transaction_inserted
+            AFTER INSERT ON transactions BEGIN
+                UPDATE statistics SET transaction_count = transaction_count + 1
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS statistics_transaction_deleted
+            AFTER DELETE ON transactions BEGIN
+                UPDATE statistics SET transaction_count = transaction_count - 1
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS statistics_profit_inserted
+            AFTER INSERT ON profits BEGIN
+                UPDATE statistics SET total_profit = total_profit + NEW.system_profit
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS statistics_profit_updated
+            AFTER UPDATE OF system_profit ON profits BEGIN
+                UPDATE statistics
+                SET total_profit = total_profit - OLD.system_profit + NEW.system_profit
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS statistics_profit_deleted
+            AFTER DELETE ON profits BEGIN
+                UPDATE statistics SET total_profit = total_profit - OLD.system_profit
+                WHERE id = 1;
+            END""",
+        ),
+    ),
+    Migration(
+        version=4,
+        description="timestamp rows and roll them up per minute, hour and day",
+        statements=(
+            # rows written before this migration have no timestamp and are
+            # left out of the rollups
+            "ALTER TABLE transactions ADD COLUMN created_at REAL",
+            "ALTER TABLE profits ADD COLUMN created_at REAL",
+            """CREATE TABLE IF NOT EXISTS statistics_rollups (
+                granularity INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                transaction_count INTEGER NOT NULL DEFAULT 0,
+                volume REAL NOT NULL DEFAULT 0,
+                profit REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, bucket)
+            ) WITHOUT ROWID""",
+            _rollup_trigger(
+                "rollups_transaction_inserted",
+                "AFTER INSERT ON transactions",
+                "NEW.created_at IS NOT NULL",
+                """INSERT INTO statistics_rollups
+                    (granularity, bucket, transaction_count, volume)
+                VALUES ({width}, {bucket}, 1, NEW.balance)
+                ON CONFLICT (granularity, bucket) DO UPDATE SET
+                    transaction_count = transaction_count + 1,
+                    volume = volume + excluded.volume;""",
+            ),
+            _rollup_trigger(
+                "rollups_transaction_deleted",
+                "AFTER DELETE ON transactions",
+                "OLD.created_at IS NOT NULL",
+                """UPDATE statistics_rollups SET
+                    transaction_count = transaction_count - 1,
+                    volume = volume - OLD.balance
+                WHERE granularity = {width} AND bucket = {bucket};""",
+            ),
+            _rollup_trigger(
+                "rollups_profit_inserted",
+                "AFTER INSERT ON profits",
+                "NEW.created_at IS NOT NULL",
+                """INSERT INTO statistics_rollups (granularity, bucket, profit)
+                VALUES ({width}, {bucket}, NEW.system_profit)
+                ON CONFLICT (granularity, bucket) DO UPDATE SET
+                    profit = profit + excluded.profit;""",
+            ),
+            _rollup_trigger(
+                "rollups_profit_updated",
+                "AFTER UPDATE OF system_profit ON profits",
+                "NEW.created_at IS NOT NULL",
+                """UPDATE statistics_rollups SET
+                    profit = profit - OLD.system_profit + NEW.system_profit
+                WHERE granularity = {width} AND bucket = {bucket};""",
+            ),
+            _rollup_trigger(
+                "rollups_profit_deleted",
+                "AFTER DELETE ON profits",
+                "OLD.created_at IS NOT NULL",
+                """UPDATE statistics_rollups SET profit = profit - OLD.system_profit
+                WHERE granularity = {width} AND bucket = {bucket};""",
+            ),
+        ),
+    ),
+    Migration(
+        version=5,
+        description="store kind and system fee on transactions",
+        statements=(
+            "ALTER TABLE transactions ADD COLUMN kind INTEGER NOT NULL DEFAULT 0",
+            "ALTER TABLE transactions ADD COLUMN system_fee REAL NOT NULL DEFAULT 0",
+            """CREATE INDEX IF NOT EXISTS profits_transaction_id
+            ON profits (transaction_id)""",
+            # only transfers between users were ever charged a fee
+            """UPDATE transactions SET
+                system_fee = (
+                    SELECT SUM(system_profit) FROM profits
+                    WHERE transaction_id = transactions.id
+                ),
+                kind = (
+                    SELECT SUM(system_profit) > 0 FROM profits
+                    WHERE transaction_id = transactions.id
+                )
+            WHERE id IN (SELECT transaction_id FROM profits)""",
+            "DELETE FROM profits WHERE transaction_id IN (SELECT id FROM transactions)",
+            "DROP TRIGGER IF EXISTS statistics_transaction_inserted",
+            "DROP TRIGGER IF EXISTS statistics_transaction_deleted",
+            "DROP TRIGGER IF EXISTS rollups_transaction_inserted",
+            "DROP TRIGGER IF EXISTS rollups_transaction_deleted",
+            """CREATE TRIGGER statistics_transaction_inserted
+            AFTER INSERT ON transactions BEGIN
+                UPDATE statistics SET
+                    transaction_count = transaction_count + 1,
+                    total_profit = total_profit + NEW.system_fee
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER statistics_transaction_deleted
+            AFTER DELETE ON transactions BEGIN
+                UPDATE statistics SET
+                    transaction_count = transaction_count - 1,
+                    total_profit = total_profit - OLD.system_fee
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER statistics_fee_updated
+            AFTER UPDATE OF system_fee ON transactions BEGIN
+                UPDATE statistics
+                SET total_profit = total_profit - OLD.system_fee + NEW.system_fee
+                WHERE id = 1;
+            END""",
+            _rollup_trigger(
+                "rollups_transaction_inserted",
+                "AFTER INSERT ON transactions",
+                "NEW.created_at IS NOT NULL",
+                """INSERT INTO statistics_rollups
+                    (granularity, bucket, transaction_count, volume, profit)
+                VALUES ({width}, {bucket}, 1, NEW.balance, NEW.system_fee)
+                ON CONFLICT (granularity, bucket) DO UPDATE SET
+                    transaction_count = transaction_count + 1,
+                    volume = volume + excluded.volume,
+                    profit = profit + excluded.profit;""",
+            ),
+            _rollup_trigger(
+                "rollups_transaction_deleted",
+                "AFTER DELETE ON transactions",
+                "OLD.created_at IS NOT NULL",
+                """UPDATE statistics_rollups SET
+                    transaction_count = transaction_count - 1,
+                    volume = volume - OLD.balance,
+                    profit = profit - OLD.system_fee
+                WHERE granularity = {width} AND bucket = {bucket};""",
+            ),
+            _rollup_trigger(
+                "rollups_fee_updated",
+                "AFTER UPDATE OF system_fee ON transactions",
+                "NEW.created_at IS NOT NULL",
+                """UPDATE statistics_rollups SET
+                    profit = profit - OLD.system_fee + NEW.system_fee
+                WHERE granularity = {width} AND bucket = {bucket};""",
+            ),
+            # profits moved onto their transactions may sit in other buckets
+            f"""UPDATE statistics SET total_profit = {TOTAL_FEES} + {TOTAL_PROFIT}
+            WHERE id = 1""",
+            "DELETE FROM statistics_rollups",
+            *(_rebuild_rollups(width) for width in ROLLUP_GRANULARITIES),
+        ),
+    ),
+    Migration(
+        version=6,
+        description="total transfer fees apart from recorded profits",
+        statements=(
+            # read through the transactions repository, as every backend
+            # keeps its transfer fees with its transactions
+            """ALTER TABLE statistics
+            ADD COLUMN total_fees REAL NOT NULL DEFAULT 0""",
+            "DROP TRIGGER IF EXISTS statistics_transaction_inserted",
+            "DROP TRIGGER IF EXISTS statistics_transaction_deleted",
+            "DROP TRIGGER IF EXISTS statistics_fee_updated",
+            """CREATE TRIGGER statistics_transaction_inserted
+            AFTER INSERT ON transactions BEGIN
+                UPDATE statistics SET
+                    transaction_count = transaction_count + 1,
+                    total_fees = total_fees + NEW.system_fee
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER statistics_transaction_deleted
+            AFTER DELETE ON transactions BEGIN
+                UPDATE statistics SET
+                    transaction_count = transaction_count - 1,
+                    total_fees = total_fees - OLD.system_fee
+                WHERE id = 1;
+            END""",
+            """CREATE TRIGGER statistics_fee_updated
+            AFTER UPDATE OF system_fee ON transactions BEGIN
+                UPDATE statistics
+                SET total_fees = total_fees - OLD.system_fee + NEW.system_fee
+                WHERE id = 1;
+            END""",
+            f"""UPDATE statistics SET
+                total_fees = {TOTAL_FEES},
+                total_profit = {TOTAL_PROFIT}
+            WHERE id = 1""",
+        ),
+    ),
+]
+
+
+def schema_version(con: sqlite3.Connection) -> int:
+    version: int = con.execute("PRAGMA user_version").fetchone()[0]
+    return version
+
+
+def migrate(
+    con: sqlite3.Connection, migrations: Sequence[Migration] = MIGRATIONS
+) -> int:
+    """
+    Applies every migration newer than the database's user_version, each in
+    its own transaction. Returns the resulting schema version. Safe to run
+    from several processes at once: each step takes the write lock and skips
+    itself if another process applied it meanwhile.
+    """
+    version = schema_version(con)
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= version:
+            continue
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            version = schema_version(con)
+            if migration.version > version:
+                for statement in migration.statements:
+                    con.execute(statement)
+                con.execute(f"PRAGMA user_version = {migration.version}")
+                version = migration.version
+            con.commit()
+        except sqlite3.Error:
+            con.rollback()
+            raise
+    return version
+
+
+def rebuild_statistics(con: sqlite3.Connection) -> Tuple[int, float]:
+    """
+    Recomputes the statistics row from the raw tables, e.g. after rows were
+    changed with the triggers disabled. Returns the new count and the profit
+    including transfer fees.
+    """
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        con.execute(
+            f"""UPDATE statistics SET
+                transaction_count = (SELECT COUNT(*) FROM transactions),
+                total_fees = {TOTAL_FEES},
+                total_profit = {TOTAL_PROFIT}
+            WHERE id = 1"""
+        )
+        row = con.execute(
+            """SELECT transaction_count, total_fees + total_profit
+            FROM statistics WHERE id = 1"""
+        ).fetchone()
+        con.commit()
+    except sqlite3.Error:
+        con.rollback()
+        raise
+    return row[0], row[1]
@@ -1,23 +1,27 @@
 import sqlite3
+import time
+from typing import Callable, Optional
 
 from app.core.statistics.interactor import IProfitsRepository
+from app.infra.sql_base.connection import IConnectionProvider, connection_provider
 from app.utils.result import Result, ResultStatus
 
 
 class ProfitsRepository(IProfitsRepository):
-    def __init__(self, db_name: str) -> None:
+    def __init__(
+        self,
+        db_name: str,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
         super().__init__()
-        self.con = sqlite3.connect(db_name, check_same_thread=False)
-        self.cur = self.con.cursor()
-        self.cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS profits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                transaction_id INTEGER, 
-                system_profit REAL
-            )
-            """
-        )
+        self.connections = connection_provider(db_name, connection, connections)
+        self.clock = clock
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        return self.connections.connection()
 
     def add_system_profit(
         self, transaction_id: int, system_profit: float
@@ -26,11 +30,12 @@ class ProfitsRepository(IProfitsRepository):
         Adds action to the profits table.
         """
         try:
-            self.cur.execute(
-                """INSERT INTO profits (transaction_id, system_profit) values (?, ?)""",
-                (transaction_id, system_profit),
+            cursor = self.con.execute(
+                """INSERT INTO profits (transaction_id, system_profit, created_at)
+                values (?, ?, ?)""",
+                (transaction_id, system_profit, self.clock()),
             )
-            return Result(ResultStatus.SUCCESS, data=self.cur.lastrowid)
+            return Result(ResultStatus.SUCCESS, data=cursor.lastrowid)
         except Exception as e:
             return Result(ResultStatus.FAIL, exception=e)
 
@@ -39,12 +44,9 @@ class ProfitsRepository(IProfitsRepository):
         Returns total profit. 0 if profits table is empty.
         """
         try:
-            profit: float = self.cur.execute(
-                f"""
-                SELECT SUM(system_profit) FROM profits
-                """
+            profit: float = self.con.execute(
+                """SELECT total_profit FROM statistics WHERE id = 1"""
             ).fetchone()[0]
-            profit = profit if profit is not None else 0
 
             return Result(ResultStatus.SUCCESS, data=profit)
         except Exception as e:
@@ -0,0 +1,54 @@
+import sqlite3
+from types import TracebackType
+from typing import Iterable, List, Optional, Tuple, Type
+
+
+class FullScanError(AssertionError):
+    pass
+
+
+class QueryPlanChecker:
+    """
+    Test mode for the SQL repositories: records every statement run on the
+    connection while active and explains it afterwards. Any plan step that
+    scans a whole table or index is reported, unless the statement contains
+    one of the allowed fragments.
+    """
+
+    def __init__(self, con: sqlite3.Connection, allowed: Iterable[str] = ()) -> None:
+        self.con = con
+        self.allowed = list(allowed)
+        self.statements: List[str] = []
+
+    def __enter__(self) -> "QueryPlanChecker":
+        self.con.set_trace_callback(self.statements.append)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.con.set_trace_callback(None)
+
+    def full_scans(self) -> List[Tuple[str, str]]:
+        scans = []
+        for statement in dict.fromkeys(self.statements):
+            keyword = statement.lstrip().split(" ", 1)[0].upper()
+            if keyword not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH"):
+                continue
+            if any(fragment in statement for fragment in self.allowed):
+                continue
+            for row in self.con.execute("EXPLAIN QUERY PLAN " + statement):
+                detail: str = row[3]
+                if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW":
+                    scans.append((" ".join(statement.split()), detail))
+        return scans
+
+    def check(self) -> None:
+        scans = self.full_scans()
+        if scans:
+            raise FullScanError(
+                "\n".join(f"{detail}: {statement}" for statement, detail in scans)
+            )
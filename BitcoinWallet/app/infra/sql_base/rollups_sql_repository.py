@@ -0,0 +1,51 @@
+import sqlite3
+from typing import List, Optional
+
+from app.core.statistics.interactor import (
+    IStatisticsRollupsRepository,
+    StatisticsBucket,
+)
+from app.infra.sql_base.connection import IConnectionProvider, connection_provider
+from app.utils.result import Result, ResultStatus
+
+
+class StatisticsRollupsRepository(IStatisticsRollupsRepository):
+    """
+    Reads the statistics_rollups table, which triggers keep up to date as
+    transactions and profits are written.
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
+    ) -> None:
+        super().__init__()
+        self.connections = connection_provider(db_name, connection, connections)
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        return self.connections.connection()
+
+    def get_rollups(
+        self, granularity: int, start: Optional[float], end: Optional[float]
+    ) -> Result[List[StatisticsBucket]]:
+        # the primary key covers the range, rows come back in bucket order
+        try:
+            rows = self.con.execute(
+                """SELECT bucket, transaction_count, volume, profit
+                FROM statistics_rollups
+                WHERE granularity = ? AND bucket >= ? AND bucket < ?
+                ORDER BY bucket""",
+                (
+                    granularity,
+                    start if start is not None else float("-inf"),
+                    end if end is not None else float("inf"),
+                ),
+            ).fetchall()
+            return Result(
+                ResultStatus.SUCCESS, [StatisticsBucket(*row) for row in rows]
+            )
+        except sqlite3.Error as e:
+            return Result(ResultStatus.FAIL, exception=e)
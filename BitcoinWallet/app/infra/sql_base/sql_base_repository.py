@@ -3,31 +3,36 @@ from typing import Optional
 
 from app.core.auth.interactor import IUserRepository
 from app.infra.api_key_generator.api_key_generator import IApiKeyGenerator
+from app.infra.sql_base.connection import IConnectionProvider, connection_provider
 from app.utils.result import Result, ResultStatus
 
 
 class SQLBaseRepository(IUserRepository):
     key_generator: IApiKeyGenerator
 
-    def __init__(self, db_name: str, api_generator: IApiKeyGenerator) -> None:
+    def __init__(
+        self,
+        db_name: str,
+        api_generator: IApiKeyGenerator,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
+    ) -> None:
         self.key_generator = api_generator
-        self.con = sqlite3.connect(db_name, check_same_thread=False)
-        self.cur = self.con.cursor()
-        self.cur.execute(
-            """CREATE TABLE IF NOT EXISTS users (id integer primary key, username text, api_key text)"""
-        )
+        self.connections = connection_provider(db_name, connection, connections)
 
-    def __del__(self) -> None:
-        self.con.close()
+    @property
+    def con(self) -> sqlite3.Connection:
+        return self.connections.connection()
 
     def register_user(self, username: str) -> Result[str]:
         try:
             api_key = self.key_generator.generate_key(username)
-            self.cur.execute(
+            con = self.con
+            con.execute(
                 """insert into users (username, api_key) values (?, ?)""",
                 (username, api_key),
             )
-            self.con.commit()
+            con.commit()
             return Result(ResultStatus.SUCCESS, api_key)
         except Exception as e:
             return Result(ResultStatus.FAIL, exception=e)
@@ -35,8 +40,9 @@ class SQLBaseRepository(IUserRepository):
     # need to implement this
     def get_user_id(self, api_key) -> Optional[int]:
         try:
-            self.cur.execute("""select * from users where api_key = ?""", (api_key,))
-            result = self.cur.fetchone()
+            result = self.con.execute(
+                """select * from users where api_key = ?""", (api_key,)
+            ).fetchone()
             if result is None:
                 return None
             return result[0]
@@ -45,6 +51,15 @@ class SQLBaseRepository(IUserRepository):
 
     @classmethod
     def create(
-        cls, db_name: str, api_generator: IApiKeyGenerator
+        cls,
+        db_name: str,
+        api_generator: IApiKeyGenerator,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
     ) -> "SQLBaseRepository":
-        return cls(db_name=db_name, api_generator=api_generator)
+        return cls(
+            db_name=db_name,
+            api_generator=api_generator,
+            connection=connection,
+            connections=connections,
+        )
@@ -1,36 +1,51 @@
 import sqlite3
-from typing import List
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
 
-from app.core.transaction.transaction import ITransaction, SimpleTransaction
+from app.core.transaction.transaction import KINDS, ITransaction, SimpleTransaction
+from app.infra.sql_base.connection import IConnectionProvider, connection_provider
 from app.utils.result import Result, ResultStatus
 
+MAX_ID = 2**63 - 1
+EXPORT_BATCH_SIZE = 500
+# what a SimpleTransaction is rebuilt from, see row_transaction
+COLUMNS = "id, sender, receiver, balance, kind, system_fee"
+
+
+def row_transaction(row: Tuple[int, int, int, float, int, float]) -> ITransaction:
+    return SimpleTransaction(row[1], row[2], row[3], row[0], KINDS[row[4]], row[5])
+
 
 class SQLTransactionRepository:
-    def __init__(self, db_name: str) -> None:
-        self.connection = sqlite3.connect(db_name, check_same_thread=False)
-        cursor = self.connection.cursor()
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS transactions
-            (id integer primary key autoincrement,
-             sender integer,
-             receiver integer,
-             balance real)"""
-        )
-        self.commit()
+    def __init__(
+        self,
+        db_name: str,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.connections = connection_provider(db_name, connection, connections)
+        self.clock = clock
 
-    def __del__(self) -> None:
-        self.connection.close()
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self.connections.connection()
 
+    # the fee is stored with the transaction, there is no profits row
     def create(self, transaction: ITransaction) -> Result[int]:
         try:
             cursor = self.connection.cursor()
             cursor.execute(
-                """INSERT INTO transactions (sender, receiver, balance) 
-                values (?, ?, ?)""",
+                """INSERT INTO transactions
+                (sender, receiver, balance, created_at, kind, system_fee)
+                values (?, ?, ?, ?, ?, ?)""",
                 (
                     transaction.get_sender_address(),
                     transaction.get_receiver_address(),
                     transaction.get_balance(),
+                    self.clock(),
+                    transaction.get_kind(),
+                    transaction.calculate_system_profit(),
                 ),
             )
             return Result(ResultStatus.SUCCESS, cursor.lastrowid)
@@ -39,20 +54,85 @@ class SQLTransactionRepository:
             return Result(ResultStatus.FAIL, exception=e)
 
     def get_wallet_transactions(
-        self, wallet_address: int
+        self,
+        wallet_address: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
     ) -> Result[List[ITransaction]]:
+        return self.get_transactions_for_wallets(
+            [wallet_address], after_id, limit, descending
+        )
+
+    def get_transactions_for_wallets(
+        self,
+        wallet_addresses: List[int],
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Result[List[ITransaction]]:
+        # index ranges on sender and receiver, merged and deduplicated by the
+        # UNION in id order; for a single wallet a page stops reading at limit
+        addresses = list(dict.fromkeys(wallet_addresses))
+        if not addresses:
+            return Result(ResultStatus.SUCCESS, [])
+        placeholders = ", ".join("?" * len(addresses))
+        if descending:
+            bound = after_id if after_id is not None else MAX_ID
+            comparison, order = "<", "DESC"
+        else:
+            bound = after_id if after_id is not None else -1
+            comparison, order = ">", "ASC"
+        sql_statement = f"""SELECT {COLUMNS} FROM transactions
+            WHERE sender IN ({placeholders}) AND id {comparison} ?
+            UNION SELECT {COLUMNS} FROM transactions
+            WHERE receiver IN ({placeholders}) AND id {comparison} ?
+            ORDER BY id {order} LIMIT ?"""
         try:
             query_result = self.connection.execute(
-                """SELECT * FROM transactions t WHERE t.sender = (?) OR t.receiver = (?)""",
-                (wallet_address, wallet_address),
+                sql_statement,
+                (
+                    *addresses,
+                    bound,
+                    *addresses,
+                    bound,
+                    limit if limit is not None else -1,
+                ),
             )
-            result: List[ITransaction] = []
-            for row in query_result:
-                result.append(SimpleTransaction(row[1], row[2], row[3], row[0]))
+            result = [row_transaction(row) for row in query_result]
             return Result(ResultStatus.SUCCESS, result)
         except Exception as e:
             return Result(ResultStatus.FAIL, exception=e)
 
+    def iter_wallet_transactions(
+        self,
+        wallet_address: int,
+        from_id: Optional[int] = None,
+        to_id: Optional[int] = None,
+    ) -> Iterator[ITransaction]:
+        bounds = (
+            from_id if from_id is not None else -1,
+            to_id if to_id is not None else MAX_ID,
+        )
+        with self.connections.reader() as con:
+            cursor = con.execute(
+                f"""SELECT {COLUMNS} FROM transactions
+                WHERE sender = ? AND id >= ? AND id <= ?
+                UNION SELECT {COLUMNS} FROM transactions
+                WHERE receiver = ? AND id >= ? AND id <= ?
+                ORDER BY id""",
+                (wallet_address, *bounds, wallet_address, *bounds),
+            )
+            try:
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield row_transaction(row)
+            finally:
+                cursor.close()
+
     def commit(self) -> None:
         self.connection.commit()
 
@@ -61,6 +141,12 @@ class SQLTransactionRepository:
 
     def get_transaction_count(self) -> Result[int]:
         result: int = self.connection.execute(
-            """SELECT COUNT(*) FROM transactions t"""
+            """SELECT transaction_count FROM statistics WHERE id = 1"""
+        ).fetchone()[0]
+        return Result(ResultStatus.SUCCESS, result)
+
+    def get_total_fees(self) -> Result[float]:
+        result: float = self.connection.execute(
+            """SELECT total_fees FROM statistics WHERE id = 1"""
         ).fetchone()[0]
         return Result(ResultStatus.SUCCESS, result)
@@ -0,0 +1,62 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    Pragmas applied to every new connection. cache_size follows SQLite's
+    convention: negative values are KiB, positive values are pages.
+    busy_timeout is in milliseconds.
+    """
+
+    name: str
+    journal_mode: str
+    synchronous: str
+    mmap_size: int
+    cache_size: int
+    temp_store: str
+    busy_timeout: int
+
+    def apply(self, con: sqlite3.Connection) -> None:
+        con.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+        con.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        con.execute(f"PRAGMA synchronous = {self.synchronous}")
+        con.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        con.execute(f"PRAGMA cache_size = {self.cache_size}")
+        con.execute(f"PRAGMA temp_store = {self.temp_store}")
+
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {
+    # every commit is synced before it returns
+    "durable": StorageProfile(
+        name="durable",
+        journal_mode="WAL",
+        synchronous="FULL",
+        mmap_size=0,
+        cache_size=-2_000,
+        temp_store="DEFAULT",
+        busy_timeout=5_000,
+    ),
+    # survives process crashes, a power loss may drop the last commits
+    "balanced": StorageProfile(
+        name="balanced",
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64_000,
+        temp_store="MEMORY",
+        busy_timeout=5_000,
+    ),
+    # leaves syncing to the OS; an OS crash can corrupt the database
+    "throughput": StorageProfile(
+        name="throughput",
+        journal_mode="WAL",
+        synchronous="OFF",
+        mmap_size=1024 * 1024 * 1024,
+        cache_size=-256_000,
+        temp_store="MEMORY",
+        busy_timeout=10_000,
+    ),
+}
@@ -0,0 +1,96 @@
+import sqlite3
+import time
+from typing import Callable, Optional
+
+from app.core.exceptions import TransactionError
+from app.core.transaction.transaction import ITransaction, TransferContext
+from app.infra.sql_base.connection import IConnectionProvider, connection_provider
+from app.utils.result import Result, ResultStatus
+
+
+class SQLTransferRepository:
+    """
+    Transfer path for the SQL tables: one read of both wallets, a guarded
+    debit, a credit and a single insert, which carries the kind and fee.
+    Must share its connection with the other repositories so they see the
+    same data and transaction.
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.connections = connection_provider(db_name, connection, connections)
+        self.clock = clock
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        return self.connections.connection()
+
+    def load_transfer_context(self, sender: int, receiver: int) -> TransferContext:
+        rows = self.con.execute(
+            """SELECT wallet_address, user_id, amount FROM wallet
+            WHERE wallet_address IN (?, ?)""",
+            (sender, receiver),
+        ).fetchall()
+        wallets = {row[0]: row for row in rows}
+        sender_row = wallets.get(sender)
+        receiver_row = wallets.get(receiver)
+        return TransferContext(
+            sender_owner=sender_row[1] if sender_row is not None else None,
+            sender_amount=sender_row[2] if sender_row is not None else None,
+            receiver_owner=receiver_row[1] if receiver_row is not None else None,
+        )
+
+    def apply_transfer(
+        self, transaction: ITransaction, system_profit: float
+    ) -> Result[int]:
+        sender = transaction.get_sender_address()
+        receiver = transaction.get_receiver_address()
+        balance = transaction.get_balance()
+        try:
+            cursor = self.con.cursor()
+            # the balance may have changed since load_transfer_context
+            cursor.execute(
+                """UPDATE wallet SET amount = amount - ?
+                WHERE wallet_address = ? AND amount >= ?""",
+                (balance, sender, balance),
+            )
+            if cursor.rowcount != 1:
+                return Result(
+                    ResultStatus.FAIL,
+                    exception=TransactionError("Not enough money in account"),
+                )
+            cursor.execute(
+                """UPDATE wallet SET amount = amount + ? WHERE wallet_address = ?""",
+                (balance, receiver),
+            )
+            if cursor.rowcount != 1:
+                return Result(
+                    ResultStatus.FAIL, exception=TransactionError("Wrong wallet address")
+                )
+            cursor.execute(
+                """INSERT INTO transactions
+                (sender, receiver, balance, created_at, kind, system_fee)
+                values (?, ?, ?, ?, ?, ?)""",
+                (
+                    sender,
+                    receiver,
+                    balance,
+                    self.clock(),
+                    transaction.get_kind(),
+                    system_profit,
+                ),
+            )
+            return Result(ResultStatus.SUCCESS, cursor.lastrowid)
+        except sqlite3.Error as e:
+            return Result(ResultStatus.FAIL, exception=e)
+
+    def commit(self) -> None:
+        self.con.commit()
+
+    def rollback(self) -> None:
+        self.con.rollback()
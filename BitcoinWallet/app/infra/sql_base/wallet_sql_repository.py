@@ -3,7 +3,8 @@ from abc import abstractmethod
 from typing import List, Optional, Tuple
 
 from app.core.auth.interactor import IUserRepository
-from app.core.wallet.wallet import BitcoinWallet, IWallet
+from app.core.wallet.wallet import BitcoinWallet, IWallet, select_wallets
+from app.infra.sql_base.connection import IConnectionProvider, connection_provider
 
 
 class AbstractWalletRepository:
@@ -12,27 +13,20 @@ class AbstractWalletRepository:
         db_name: str,
         user_repository: IUserRepository,
         max_number_of_wallets: int = 3,
+        connection: Optional[sqlite3.Connection] = None,
+        connections: Optional[IConnectionProvider] = None,
     ):
         self.new_wallet_address = 0
-        self.con = sqlite3.connect(db_name, check_same_thread=False)
+        # repositories sharing a connection also share its transaction
+        self.connections = connection_provider(db_name, connection, connections)
 
         self.user_repository = user_repository
 
         self.max_number_of_users = max_number_of_wallets
 
-        cursor = self.con.cursor()
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS wallet 
-            (wallet_address integer primary key autoincrement unique, 
-            amount real, 
-            user_id integer)"""
-        )
-
-        self.con.commit()
-        cursor.close()
-
-    def __del__(self) -> None:
-        self.con.close()
+    @property
+    def con(self) -> sqlite3.Connection:
+        return self.connections.connection()
 
     def create_wallet(self, api_key: str) -> Tuple[Optional[IWallet], Optional[str]]:
         uid = self.user_repository.get_user_id(api_key)
@@ -73,6 +67,15 @@ class AbstractWalletRepository:
             return None, "Access to wallet denied"
         return result_wallet, error_str
 
+    def get_wallets(
+        self, api_key: str, addresses: List[int]
+    ) -> Tuple[List[IWallet], Optional[str]]:
+        uid = self.user_repository.get_user_id(api_key=api_key)
+
+        if uid is None:
+            return [], "Can't verify user"
+        return select_wallets(self.get_user_wallets(uid), addresses)
+
     def _get_wallet_with_address(
         self, address: int
     ) -> Tuple[Optional[IWallet], Optional[str]]:
@@ -108,16 +111,16 @@ class AbstractWalletRepository:
         if amount <= 0:
             return False, "Can't deposit non-positive amount"
 
-        old_wallet, error_str = self._get_wallet_with_address(wallet_address)
-
+        updated, error_str = self._update_amount_in_wallet(
+            sql_statement="""UPDATE wallet SET amount = amount + ?
+            WHERE wallet_address = ?""",
+            parameters=(amount, wallet_address),
+        )
         if error_str is not None:
             return False, error_str
-
-        new_amount = old_wallet.get_amount() + amount
-
-        return self._update_amount_in_wallet(
-            address=wallet_address, new_amount=new_amount
-        )
+        if not updated:
+            return False, "Wrong wallet address"
+        return True, None
 
     def withdraw(
         self, wallet_address: int, amount: float
@@ -125,43 +128,33 @@ class AbstractWalletRepository:
         if amount <= 0:
             return False, "Can't withdraw non-positive amount"
 
-        old_wallet, error_str = self._get_wallet_with_address(wallet_address)
-
+        # the funds check is part of the update, so concurrent withdrawals
+        # can neither lose an update nor overdraw the wallet
+        updated, error_str = self._update_amount_in_wallet(
+            sql_statement="""UPDATE wallet SET amount = amount - ?
+            WHERE wallet_address = ? AND amount >= ?""",
+            parameters=(amount, wallet_address, amount),
+        )
         if error_str is not None:
             return False, error_str
+        if updated:
+            return True, None
 
-        if amount > old_wallet.get_amount():
-            return False, "Not enough money in account"
-
-        new_amount = old_wallet.get_amount() - amount
-
-        return self._update_amount_in_wallet(
-            address=wallet_address, new_amount=new_amount
-        )
+        # nothing updated: only now find out why
+        _, error_str = self._get_wallet_with_address(wallet_address)
+        if error_str is not None:
+            return False, error_str
+        return False, "Not enough money in account"
 
     def _update_amount_in_wallet(
-        self, address: int, new_amount: float
+        self, sql_statement: str, parameters: Tuple[object, ...]
     ) -> Tuple[bool, Optional[str]]:
         try:
             cursor = self.con.cursor()
-            sql_statement = """UPDATE wallet set amount = ? WHERE wallet_address = ?"""
-
-            cursor.execute(sql_statement, (new_amount, address))
-
-            records = cursor.fetchall()
-
-            result = list()
-
-            for wallet_record in records:
-                result.append(
-                    BitcoinWallet(
-                        wallet_address=wallet_record[0],
-                        amount_BTC=wallet_record[1],
-                        user_id=wallet_record[2],
-                    )
-                )
+            cursor.execute(sql_statement, parameters)
+            updated = cursor.rowcount == 1
             cursor.close()
-            return True, None
+            return updated, None
         except sqlite3.Error as error:
             self.respond_to_sql_error(error)
 
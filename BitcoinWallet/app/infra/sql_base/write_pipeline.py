@@ -0,0 +1,185 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from app.infra.sql_base.connection import SQLiteConnectionPool
+from app.utils.histogram import Histogram
+from app.utils.result import Result, ResultStatus
+
+T = TypeVar("T")
+
+BATCH_SIZE_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_LATENCY_BOUNDS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class UnitConnection(sqlite3.Connection):
+    """
+    While a unit runs, its commit() is left to the batch and its rollback()
+    only undoes the unit, so repositories need not know they are batched.
+    """
+
+    unit_open = False
+
+    def commit(self) -> None:
+        if not self.unit_open:
+            super().commit()
+
+    def rollback(self) -> None:
+        if self.unit_open:
+            self.execute("ROLLBACK TO unit")
+        else:
+            super().rollback()
+
+
+@dataclass
+class _Submission:
+    unit: Callable[[], Result[Any]]
+    future: "Future[Result[Any]]"
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class SQLiteWritePipeline:
+    """
+    Runs write units on a single writer thread. Whatever is queued, up to
+    max_batch_size units and waiting at most max_delay seconds after the
+    first one, goes into one transaction and one commit. Each unit runs in
+    its own savepoint: its rollback(), or an exception escaping it, undoes
+    that unit alone. Futures are resolved only after the commit. A unit
+    whose future is cancelled before the writer gets to it is never run;
+    once it runs, it can no longer be cancelled.
+
+    Units call repositories as usual; on the writer thread the pool hands
+    them the writer's connection. Each batch runs inside batch_scopes, left
+    after the commit and before any future is resolved.
+    """
+
+    def __init__(
+        self,
+        pool: SQLiteConnectionPool,
+        max_batch_size: int = 64,
+        max_delay: float = 0.002,
+        batch_scopes: Sequence[Callable[[], ContextManager[None]]] = (),
+    ) -> None:
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batch_scopes = batch_scopes
+        self.batch_sizes = Histogram(BATCH_SIZE_BOUNDS)
+        self.queue_latency_ms = Histogram(QUEUE_LATENCY_BOUNDS_MS)
+        self._queue: "queue.Queue[Optional[_Submission]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, unit: Callable[[], Result[T]]) -> "Future[Result[T]]":
+        if self._thread is None:
+            raise RuntimeError("write pipeline is not running")
+        future: "Future[Result[T]]" = Future()
+        self._queue.put(_Submission(unit, future))
+        return future
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        con = cast(UnitConnection, self.pool.open_connection(factory=UnitConnection))
+        with self.pool.bind(con):
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                if batch:
+                    self._write(con, batch)
+        con.close()
+
+    def _next_batch(self) -> Tuple[List[_Submission], bool]:
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                submission = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if submission is None:
+                return batch, True
+            batch.append(submission)
+        return batch, False
+
+    def _write(self, con: UnitConnection, batch: List[_Submission]) -> None:
+        started = time.perf_counter()
+        for submission in batch:
+            self.queue_latency_ms.observe((started - submission.submitted_at) * 1000)
+        self.batch_sizes.observe(len(batch))
+
+        running: List[_Submission] = []
+        results: List[Result[Any]] = []
+        unclaimed = list(batch)
+        with ExitStack() as scopes:
+            for scope in self.batch_scopes:
+                scopes.enter_context(scope())
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                while unclaimed:
+                    submission = unclaimed.pop(0)
+                    # a unit whose caller stopped waiting is cancelled, skip it
+                    if submission.future.set_running_or_notify_cancel():
+                        running.append(submission)
+                        results.append(self._run_unit(con, submission.unit))
+                con.commit()
+            except sqlite3.Error as e:
+                if con.in_transaction:
+                    con.rollback()
+                running += [
+                    s for s in unclaimed if s.future.set_running_or_notify_cancel()
+                ]
+                results = [Result(ResultStatus.FAIL, exception=e) for _ in running]
+
+        for submission, result in zip(running, results):
+            submission.future.set_result(result)
+
+    def _run_unit(
+        self, con: UnitConnection, unit: Callable[[], Result[Any]]
+    ) -> Result[Any]:
+        con.execute("SAVEPOINT unit")
+        con.unit_open = True
+        try:
+            result = unit()
+        except Exception as e:
+            con.execute("ROLLBACK TO unit")
+            result = Result(ResultStatus.INTERNAL_ERROR, exception=e)
+        finally:
+            con.unit_open = False
+        con.execute("RELEASE unit")
+        return result
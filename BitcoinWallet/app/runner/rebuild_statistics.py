@@ -0,0 +1,24 @@
+"""
+Recomputes the statistics aggregates from the transactions and profits
+tables.
+
+    python -m app.runner.rebuild_statistics [wallets.db]
+"""
+import sqlite3
+import sys
+
+from app.infra.sql_base.migrations import migrate, rebuild_statistics
+
+
+def main(db_name: str = "wallets.db") -> None:
+    con = sqlite3.connect(db_name)
+    try:
+        migrate(con)
+        transaction_count, total_profit = rebuild_statistics(con)
+    finally:
+        con.close()
+    print(f"{transaction_count} transactions, total profit {total_profit}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -1,56 +1,134 @@
-from fastapi import FastAPI
+import threading
+from typing import Optional
+
+from fastapi import Depends, FastAPI
 
 from app.core.facade import WalletService
 from app.core.auth.interactor import IUserRepository
 from app.core.transaction.transaction import ITransactionRepository
+from app.core.wallet.Converter import APIConverter
+from app.core.wallet.circuit_breaker import CircuitBreakerConverter
+from app.core.wallet.rate_publisher import RatePublisher
 from app.core.wallet.wallet import IWalletRepository
 from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.cache.read_cache import (
+    CachedProfitsRepository,
+    CachedStatisticsRollupsRepository,
+    CachedTransactionRepository,
+    CachedWalletRepository,
+    ReadCache,
+    ReadCacheInvalidator,
+)
+from app.infra.cache.user_cache import CachedUserRepository
 from app.infra.fastapi.auth import auth_api
+from app.infra.fastapi.dependables import request_scope
 from app.infra.fastapi.transactions import transactions_api
 
 from app.infra.fastapi.wallet_api import wallet_api
+from app.infra.notifications.dispatcher import Backpressure, ObserverDispatcher
+from app.infra.notifications.webhook import WebhookObserver
 
+from app.infra.sql_base.connection import SQLiteConnectionPool
 from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.storage_profile import STORAGE_PROFILES
+from app.infra.sql_base.rollups_sql_repository import StatisticsRollupsRepository
 from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
 from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.infra.sql_base.write_pipeline import SQLiteWritePipeline
 from app.core.statistics.interactor import IProfitsRepository
 from app.infra.fastapi.statistics import statistics_api
 from app.infra.sql_base.profits_sql_repository import ProfitsRepository
 
 
-def setup() -> FastAPI:
-    app = FastAPI()
+def setup(storage_profile: str = "balanced", batch_writes: bool = False,
+          webhook_url: Optional[str] = None,
+          secondary_ticker_url: Optional[str] = None) -> FastAPI:
+    app = FastAPI(dependencies=[Depends(request_scope)])
     app.include_router(auth_api)
     app.include_router(wallet_api)
     app.include_router(transactions_api)
     app.include_router(statistics_api)
 
-    user_repository = setup_user_repository()
-    wallet_repository = setup_wallet_repository(user_repository=user_repository)
-    transaction_repository = setup_transactions_repository()
-    profits_repository = setup_profits_repository()
+    # every request checks out one connection, so a transfer is a single
+    # SQLite transaction and requests never share one
+    connections = SQLiteConnectionPool("wallets.db", pool_size=16,
+                                       profile=STORAGE_PROFILES[storage_profile])
+    app.add_event_handler("shutdown", connections.close)
+    user_repository = setup_user_repository(connections)
+    app.state.request_scopes = [connections.request_scope, user_repository.request_scope]
+    # dropped by address after every committed transfer
+    read_cache = ReadCache(capacity=100_000)
+    wallet_repository = setup_wallet_repository(user_repository, connections, read_cache)
+    transaction_repository = setup_transactions_repository(connections, read_cache)
+    profits_repository = setup_profits_repository(connections, read_cache)
+    write_pipeline = None
+    if batch_writes:
+        # cached reads racing a batch are dropped again once it commits
+        write_pipeline = SQLiteWritePipeline(connections,
+                                             batch_scopes=[read_cache.deferred])
+        app.add_event_handler("startup", write_pipeline.start)
+        app.add_event_handler("shutdown", write_pipeline.stop)
+    ticker = setup_ticker(secondary_ticker_url)
+    rate_publisher = RatePublisher(ticker, interval=15, max_staleness=120)
+    app.add_event_handler("startup", rate_publisher.start)
+    app.add_event_handler("shutdown", rate_publisher.stop)
+    app.add_event_handler("shutdown", ticker.shutdown)
     app.state.core = WalletService.create(user_repository=user_repository,
                                           wallet_repository=wallet_repository,
                                           transaction_repository=transaction_repository,
-                                          profits_repository=profits_repository)
+                                          profits_repository=profits_repository,
+                                          converter=rate_publisher,
+                                          transfer_repository=SQLTransferRepository(
+                                              "wallets.db", connections=connections),
+                                          write_pipeline=write_pipeline,
+                                          transfer_lock=threading.Lock()
+                                          if connections.shares_connection else None,
+                                          rollups_repository=CachedStatisticsRollupsRepository(
+                                              StatisticsRollupsRepository(
+                                                  "wallets.db", connections=connections),
+                                              read_cache))
+    app.state.core.transactions_interactor.attach(ReadCacheInvalidator(read_cache))
+    if webhook_url is not None:
+        # notifications leave the request thread
+        dispatcher = ObserverDispatcher(backpressure=Backpressure.SPILL,
+                                        spill_path="notifications.spill")
+        dispatcher.subscribe(WebhookObserver(webhook_url))
+        app.add_event_handler("startup", dispatcher.start)
+        app.add_event_handler("shutdown", dispatcher.stop)
+        app.state.core.transactions_interactor.attach(dispatcher)
 
     return app
 
 
-def setup_user_repository() -> IUserRepository:
-    repository = SQLBaseRepository.create("wallets.db", DummyApiKeyGenerator())
-    return repository
+def setup_user_repository(connections: SQLiteConnectionPool) -> CachedUserRepository:
+    repository = SQLBaseRepository.create("wallets.db", DummyApiKeyGenerator(),
+                                          connections=connections)
+    return CachedUserRepository(repository, capacity=100_000)
+
+
+def setup_wallet_repository(user_repository: IUserRepository,
+                            connections: SQLiteConnectionPool,
+                            read_cache: ReadCache) -> IWalletRepository:
+    repository = WalletSQLRepository(db_name="wallets.db", user_repository=user_repository,
+                                     connections=connections)
+    return CachedWalletRepository(repository, read_cache)
 
 
-def setup_wallet_repository(user_repository: IUserRepository) -> IWalletRepository:
-    repository = WalletSQLRepository(db_name="wallets.db", user_repository=user_repository)
-    return repository
+def setup_transactions_repository(connections: SQLiteConnectionPool,
+                                  read_cache: ReadCache) -> ITransactionRepository:
+    repository = SQLTransactionRepository(db_name="wallets.db", connections=connections)
+    return CachedTransactionRepository(repository, read_cache)
 
 
-def setup_transactions_repository() -> ITransactionRepository:
-    return SQLTransactionRepository(db_name="wallets.db")
+def setup_profits_repository(connections: SQLiteConnectionPool,
+                             read_cache: ReadCache) -> IProfitsRepository:
+    repository = ProfitsRepository(db_name="wallets.db", connections=connections)
+    return CachedProfitsRepository(repository, read_cache)
 
 
-def setup_profits_repository() -> IProfitsRepository:
-    repository = ProfitsRepository(db_name="wallets.db")
-    return repository
+# the publisher polls through the breaker: a failing ticker is left alone for
+# a while and slow or failed fetches are hedged to the secondary, if any
+def setup_ticker(secondary_url: Optional[str] = None) -> CircuitBreakerConverter:
+    secondary = APIConverter(secondary_url) if secondary_url is not None else None
+    return CircuitBreakerConverter(APIConverter(), secondary=secondary)
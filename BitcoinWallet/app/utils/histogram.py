@@ -0,0 +1,36 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence
+
+
+class Histogram:
+    """
+    Counts observations per bucket. bounds are inclusive upper limits in
+    increasing order; anything above the last bound lands in "+inf".
+    """
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds: List[float] = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def mean(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            counts = list(self.counts)
+        labels = [f"<={bound:g}" for bound in self.bounds] + ["+inf"]
+        return dict(zip(labels, counts))
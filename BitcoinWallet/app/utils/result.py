@@ -2,6 +2,8 @@ import enum
 from dataclasses import dataclass
 from typing import Generic, Optional, TypeVar
 
+from app.utils.slots import slotted
+
 T = TypeVar("T")
 
 
@@ -11,6 +13,7 @@ class ResultStatus(enum.IntEnum):
     INTERNAL_ERROR = 500
 
 
+@slotted
 @dataclass
 class Result(Generic[T]):
     status: ResultStatus = ResultStatus.SUCCESS
@@ -0,0 +1,31 @@
+import dataclasses
+from typing import Any, Dict, Type, TypeVar
+
+C = TypeVar("C", bound=Type[Any])
+
+
+def slotted(cls: C) -> C:
+    """
+    Rebuilds a dataclass with __slots__ for its own fields and no instance
+    __dict__, like dataclass(slots=True) does on Python 3.10+. Apply it on
+    top of @dataclass. Subclasses must be slotted too, or they get a
+    __dict__ back.
+    """
+    inherited = {
+        name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())
+    }
+    own = tuple(
+        field.name
+        for field in dataclasses.fields(cls)
+        if field.name not in inherited
+    )
+    namespace: Dict[str, Any] = dict(cls.__dict__)
+    # defaults live on in __init__; class attributes would shadow the slots
+    for name in own:
+        namespace.pop(name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = own
+    rebuilt = type(cls)(cls.__name__, cls.__bases__, namespace)
+    rebuilt.__qualname__ = cls.__qualname__
+    return rebuilt  # type: ignore
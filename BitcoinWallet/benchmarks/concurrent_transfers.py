@@ -0,0 +1,73 @@
+"""
+Transfers per second between two wallets of a file database when several
+threads, each with its own connection, withdraw and deposit concurrently.
+With lock=True every transfer runs under one process-wide lock, which is what
+the read-modify-write balance updates needed to stay correct.
+
+    python -m benchmarks.concurrent_transfers
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from typing import ContextManager
+
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+
+THREAD_COUNTS = [1, 2, 4, 8]
+TRANSFERS_PER_THREAD = 300
+
+
+def run(threads: int, lock: bool) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        db_name = os.path.join(directory, "wallets.db")
+        con = sqlite3.connect(db_name)
+        users = SQLBaseRepository(db_name, DummyApiKeyGenerator(), connection=con)
+        repository = WalletSQLRepository(db_name, user_repository=users, connection=con)
+        api_key = users.register_user("user").data
+        sender, _ = repository.create_wallet(api_key)
+        receiver, _ = repository.create_wallet(api_key)
+        repository.deposit(sender.get_address(), 1e9)
+        repository.commit()
+
+        guard = threading.Lock()
+        start = threading.Barrier(threads + 1)
+
+        def transfer() -> None:
+            own = WalletSQLRepository(db_name, user_repository=users)
+            start.wait()
+            for _ in range(TRANSFERS_PER_THREAD):
+                context: ContextManager = guard if lock else nullcontext()
+                with context:
+                    own.withdraw(sender.get_address(), 1)
+                    own.deposit(receiver.get_address(), 1)
+                    own.commit()
+
+        workers = [threading.Thread(target=transfer) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        start.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        con.close()
+        return threads * TRANSFERS_PER_THREAD / elapsed
+
+
+def main() -> None:
+    for threads in THREAD_COUNTS:
+        atomic = run(threads, lock=False)
+        locked = run(threads, lock=True)
+        print(
+            f"{threads} threads: {atomic:7.0f} transfers/s atomic, "
+            f"{locked:7.0f} transfers/s under a global lock"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Repricing stored fees under a FeePolicy: the compiled evaluator called per
+row, the NumPy path over the same columns, and reprice_fees over a SQLite
+table of a tenth as many rows.
+
+    python -m benchmarks.fee_repricing [rows]
+"""
+import random
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from app.core.transaction.fees import FeePolicy, FeeRule, FeeTier
+from app.core.transaction.transaction import TransactionKind
+from app.infra.fees.vectorized import vectorized_fees
+from app.infra.sql_base.fee_repricing import reprice_fees
+from app.infra.sql_base.migrations import migrate
+
+ROWS = 5_000_000
+USERS = 10_000
+
+POLICY = FeePolicy(
+    rules={
+        TransactionKind.SIMPLE: FeeRule(),
+        TransactionKind.BETWEEN_USERS: FeeRule(
+            rate=0.15, tiers=(FeeTier(1, 0.1), FeeTier(10, 0.05)), minimum=0.01
+        ),
+    },
+    overrides={
+        user_id: {TransactionKind.BETWEEN_USERS: FeeRule(rate=0.02)}
+        for user_id in range(0, USERS, 1000)
+    },
+)
+
+
+def main(rows: int = ROWS) -> None:
+    rng = np.random.default_rng(0)
+    balances = rng.exponential(2.0, rows)
+    kinds = rng.integers(0, 2, rows, dtype=np.int8)
+    users = rng.integers(0, USERS, rows)
+    print(f"{rows} transactions")
+
+    fee = POLICY.compile()
+    started = time.perf_counter()
+    scalar = [
+        fee(balance, kind, user_id)  # type: ignore
+        for balance, kind, user_id in zip(
+            balances.tolist(), kinds.tolist(), users.tolist()
+        )
+    ]
+    print(f"  compiled, per row: {time.perf_counter() - started:6.2f} s")
+
+    started = time.perf_counter()
+    vectorized = vectorized_fees(POLICY, balances, kinds, users)
+    print(f"  numpy:             {time.perf_counter() - started:6.2f} s")
+    assert vectorized.tolist() == scalar
+
+    con = sqlite3.connect(":memory:")
+    migrate(con)
+    table_rows = rows // 10
+    pyrng = random.Random(0)
+    con.executemany(
+        "INSERT INTO wallet (wallet_address, user_id, amount) VALUES (?, ?, 0)",
+        ((address, pyrng.randrange(USERS)) for address in range(USERS)),
+    )
+    con.executemany(
+        """INSERT INTO transactions
+        (sender, receiver, balance, kind, system_fee) VALUES (?, ?, ?, ?, 0)""",
+        (
+            (pyrng.randrange(USERS), pyrng.randrange(USERS), balance, kind)
+            for balance, kind in zip(
+                balances[:table_rows].tolist(), kinds[:table_rows].tolist()
+            )
+        ),
+    )
+    con.commit()
+    started = time.perf_counter()
+    changed = reprice_fees(con, POLICY)
+    print(
+        f"  sqlite, {table_rows} rows: {time.perf_counter() - started:6.2f} s, "
+        f"{changed} changed"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
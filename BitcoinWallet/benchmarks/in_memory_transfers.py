@@ -0,0 +1,52 @@
+"""
+Measures withdraw + deposit + same-user check on InMemoryWalletRepository as
+the number of stored wallets grows.
+
+    python -m benchmarks.in_memory_transfers
+"""
+import random
+import time
+
+from app.core.wallet.wallet import BitcoinWallet
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.in_memory.wallet_in_memory_repository import InMemoryWalletRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TRANSFERS = 20_000
+
+
+def build_repository(size: int) -> InMemoryWalletRepository:
+    repository = InMemoryWalletRepository(
+        user_repository=SQLBaseRepository(":memory:", DummyApiKeyGenerator())
+    )
+    for address in range(size):
+        uid = address // 3
+        repository._add_wallet(
+            uid, BitcoinWallet(wallet_address=address, user_id=uid, amount_BTC=1e9)
+        )
+    return repository
+
+
+def transfer_latency(repository: InMemoryWalletRepository, size: int) -> float:
+    pairs = [
+        (random.randrange(size), random.randrange(size)) for _ in range(TRANSFERS)
+    ]
+    started = time.perf_counter()
+    for sender, receiver in pairs:
+        repository.withdraw(sender, 1)
+        repository.deposit(receiver, 1)
+        repository.wallets_belong_to_the_same_user(sender, receiver)
+    return (time.perf_counter() - started) / TRANSFERS
+
+
+def main() -> None:
+    random.seed(0)
+    for size in SIZES:
+        repository = build_repository(size)
+        latency = transfer_latency(repository, size)
+        print(f"{size:>9} wallets: {latency * 1e6:6.2f} us/transfer")
+
+
+if __name__ == "__main__":
+    main()
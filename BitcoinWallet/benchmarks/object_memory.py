@@ -0,0 +1,182 @@
+"""
+Bytes per domain object, and what a 100-row wallet listing keeps alive,
+for the slotted classes versus plain dataclasses shaped like the ones they
+replaced. Measured with tracemalloc; field values are shared so only the
+objects themselves are counted.
+
+    python -m benchmarks.object_memory
+"""
+import gc
+import random
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from app.core.transaction.interactor import (
+    TransactionInteractor,
+    WalletTransactionsRequest,
+)
+from app.core.transaction.transaction import (
+    SimpleTransaction,
+    TransactionBetweenUsers,
+    TransactionKind,
+)
+from app.core.wallet.wallet import BitcoinWallet
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.in_memory.profits_in_memory_repository import ProfitsInMemoryRepository
+from app.infra.in_memory.wallet_in_memory_repository import InMemoryWalletRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.utils.result import Result, ResultStatus
+
+T = TypeVar("T")
+OBJECTS = 100_000
+PAGE = 100
+
+
+@dataclass
+class LegacySimpleTransaction:
+    sender_address: int
+    receiver_address: int
+    balance: float
+    transaction_id: int = 0
+
+
+@dataclass
+class LegacyTransactionBetweenUsers:
+    inner: LegacySimpleTransaction
+
+
+@dataclass
+class LegacyBitcoinWallet:
+    wallet_address: int
+    user_id: int
+    amount_BTC: float
+
+
+@dataclass
+class LegacyResult(Generic[T]):
+    status: ResultStatus = ResultStatus.SUCCESS
+    data: Optional[T] = None
+    exception: Optional[Exception] = None
+
+
+def retained(build: Callable[[], Any]) -> Tuple[int, int]:
+    """Bytes and blocks still allocated for what build() returns."""
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    kept = build()  # noqa: F841
+    after = tracemalloc.take_snapshot()
+    stats = after.compare_to(before, "filename")
+    return sum(s.size_diff for s in stats), sum(s.count_diff for s in stats)
+
+
+def per_object(
+    name: str, legacy: Callable[[], Any], slotted: Callable[[], Any]
+) -> None:
+    old, _ = retained(lambda: [legacy() for _ in range(OBJECTS)])
+    new, _ = retained(lambda: [slotted() for _ in range(OBJECTS)])
+    # the list holding them is the same size in both
+    print(f"{name:>24}: {old / OBJECTS:6.1f} -> {new / OBJECTS:6.1f} B/object")
+
+
+def listing_interactor() -> Tuple[TransactionInteractor, str]:
+    users = SQLBaseRepository(":memory:", DummyApiKeyGenerator())
+    api_key = users.register_user("user").data
+    assert api_key is not None
+    transactions = SQLTransactionRepository(":memory:")
+    rng = random.Random(0)
+    for _ in range(PAGE):
+        transactions.create(SimpleTransaction(1, rng.randrange(2, 100), rng.random()))
+    transactions.commit()
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=transactions,
+        wallets_repository=InMemoryWalletRepository(user_repository=users),
+        user_repository=users,
+        profits_repository=ProfitsInMemoryRepository(),
+    )
+    return interactor, api_key
+
+
+def legacy_listing(rows: List[Tuple[int, int, int, float]]) -> Any:
+    # rows as the repository used to return them, a third between users
+    transactions: List[Any] = []
+    for index, (transaction_id, sender, receiver, balance) in enumerate(rows):
+        transaction = LegacySimpleTransaction(sender, receiver, balance, transaction_id)
+        if index % 3 == 0:
+            transactions.append(LegacyTransactionBetweenUsers(transaction))
+        else:
+            transactions.append(transaction)
+    return LegacyResult(ResultStatus.SUCCESS, transactions)
+
+
+def current_listing(rows: List[Tuple[int, int, int, float]]) -> Any:
+    transactions = [
+        SimpleTransaction(
+            sender,
+            receiver,
+            balance,
+            transaction_id,
+            TransactionKind.BETWEEN_USERS if index % 3 == 0 else TransactionKind.SIMPLE,
+        )
+        for index, (transaction_id, sender, receiver, balance) in enumerate(rows)
+    ]
+    return Result(ResultStatus.SUCCESS, transactions)
+
+
+def main() -> None:
+    tracemalloc.start()
+    print(f"per object, {OBJECTS} of each")
+    per_object(
+        "SimpleTransaction",
+        lambda: LegacySimpleTransaction(1, 2, 0.5, 3),
+        lambda: SimpleTransaction(1, 2, 0.5, 3),
+    )
+    inner = SimpleTransaction(1, 2, 0.5, 3)
+    per_object(
+        "between users",
+        lambda: LegacyTransactionBetweenUsers(LegacySimpleTransaction(1, 2, 0.5, 3)),
+        lambda: SimpleTransaction(1, 2, 0.5, 3, TransactionKind.BETWEEN_USERS),
+    )
+    per_object(
+        "TransactionBetweenUsers",
+        lambda: LegacyTransactionBetweenUsers(inner),  # type: ignore
+        lambda: TransactionBetweenUsers(inner),
+    )
+    per_object(
+        "BitcoinWallet",
+        lambda: LegacyBitcoinWallet(1, 2, 0.5),
+        lambda: BitcoinWallet(1, 2, 0.5),
+    )
+    per_object(
+        "Result",
+        lambda: LegacyResult(ResultStatus.SUCCESS, 1),
+        lambda: Result(ResultStatus.SUCCESS, 1),
+    )
+
+    interactor, api_key = listing_interactor()
+    request = WalletTransactionsRequest(api_key, 1)
+    bytes_, blocks = retained(lambda: interactor.get_wallet_transactions(request))
+    print(f"\n{PAGE}-row listing request keeps {bytes_} B in {blocks} blocks")
+    listed = interactor.get_wallet_transactions(request).data
+    assert listed is not None
+    rows = [
+        (
+            t.get_transaction_id(),
+            t.get_sender_address(),
+            t.get_receiver_address(),
+            t.get_balance(),
+        )
+        for t in listed.transactions
+    ]
+    old_bytes, old_blocks = retained(lambda: legacy_listing(rows))
+    new_bytes, new_blocks = retained(lambda: current_listing(rows))
+    print(
+        f"{PAGE} rows as objects: {old_bytes} B in {old_blocks} blocks -> "
+        f"{new_bytes} B in {new_blocks} blocks"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Mixed read/write throughput of the SQL repositories on a file database for
+each storage profile, and for SQLite's defaults. Every thread runs
+"requests" through the connection pool; one in WRITE_EVERY is a transfer and
+the rest read a wallet's transactions.
+
+    python -m benchmarks.storage_profiles
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from app.core.transaction.interactor import (
+    MakeTransactionRequest,
+    TransactionInteractor,
+    WalletTransactionsRequest,
+)
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.connection import SQLiteConnectionPool
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.storage_profile import STORAGE_PROFILES, StorageProfile
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+
+THREADS = 8
+REQUESTS_PER_THREAD = 500
+WRITE_EVERY = 5
+USERS = 50
+
+
+def run(profile: Optional[StorageProfile]) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        pool = SQLiteConnectionPool(
+            os.path.join(directory, "wallets.db"), pool_size=THREADS, profile=profile
+        )
+        users = SQLBaseRepository("", DummyApiKeyGenerator(), connections=pool)
+        interactor = TransactionInteractor(
+            set(),
+            transactions_repository=SQLTransactionRepository("", connections=pool),
+            wallets_repository=WalletSQLRepository(
+                "", user_repository=users, connections=pool
+            ),
+            user_repository=users,
+            profits_repository=ProfitsRepository("", connections=pool),
+            transfer_repository=SQLTransferRepository("", connections=pool),
+        )
+        accounts = []
+        for user in range(USERS):
+            api_key = users.register_user(f"user{user}").data
+            wallet, _ = interactor.wallets_repository.create_wallet(api_key)
+            interactor.wallets_repository.deposit(wallet.get_address(), 1e6)
+            interactor.wallets_repository.commit()
+            accounts.append((api_key, wallet.get_address()))
+
+        start = threading.Barrier(THREADS + 1)
+
+        def work(seed: int) -> None:
+            rng = random.Random(seed)
+            start.wait()
+            for request in range(REQUESTS_PER_THREAD):
+                api_key, address = rng.choice(accounts)
+                with pool.request_scope():
+                    if request % WRITE_EVERY == 0:
+                        _, receiver = rng.choice(accounts)
+                        interactor.fire_transaction(
+                            MakeTransactionRequest(api_key, address, receiver, 0.01)
+                        )
+                    else:
+                        interactor.get_wallet_transactions(
+                            WalletTransactionsRequest(api_key, address)
+                        )
+
+        workers = [threading.Thread(target=work, args=(i,)) for i in range(THREADS)]
+        for worker in workers:
+            worker.start()
+        start.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        pool.close()
+        return THREADS * REQUESTS_PER_THREAD / elapsed
+
+
+def main() -> None:
+    print(f"{'sqlite defaults':>16}: {run(None):7.0f} requests/s")
+    for name, profile in STORAGE_PROFILES.items():
+        print(f"{name:>16}: {run(profile):7.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Compares the cost of decoding a captured blockchain.info ticker payload.
+
+    python -m benchmarks.ticker_parsing
+"""
+import ast
+import json
+import timeit
+from pathlib import Path
+
+from app.core.wallet.Converter import parse_ticker_symbol
+
+PAYLOAD = (Path(__file__).parent / "data" / "ticker.json").read_bytes()
+NUMBER = 20000
+
+
+def literal_eval_full() -> float:
+    return ast.literal_eval(PAYLOAD.decode("UTF-8"))["USD"]["last"]
+
+
+def json_full() -> float:
+    return json.loads(PAYLOAD)["USD"]["last"]
+
+
+def json_symbol() -> float:
+    return parse_ticker_symbol(PAYLOAD.decode("UTF-8"), "USD")["last"]
+
+
+def main() -> None:
+    print(f"payload: {len(PAYLOAD)} bytes, {NUMBER} iterations")
+    for parse in (literal_eval_full, json_full, json_symbol):
+        seconds = timeit.timeit(parse, number=NUMBER)
+        print(f"{parse.__name__:>18}: {seconds / NUMBER * 1e6:8.2f} us/parse")
+
+
+if __name__ == "__main__":
+    main()
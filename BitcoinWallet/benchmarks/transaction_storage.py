@@ -0,0 +1,101 @@
+"""
+Memory per stored transaction and wallet query latency of the list-backed
+InMemoryTransactionRepository versus ColumnarTransactionRepository. Each
+repository is filled in a process of its own; memory is the growth of the
+peak resident set while filling (Linux reports ru_maxrss in KiB).
+
+    python -m benchmarks.transaction_storage [rows]
+"""
+import multiprocessing
+import random
+import resource
+import sys
+import time
+from typing import Callable, Dict, List
+
+from app.core.transaction.transaction import (
+    ITransactionRepository,
+    SimpleTransaction,
+    TransactionKind,
+)
+from app.infra.in_memory.columnar_transaction_repository import (
+    ColumnarTransactionRepository,
+)
+from app.infra.in_memory.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+
+ROWS = 10_000_000
+WALLETS = 100_000
+QUERIES = 1_000
+PAGE = 100
+
+BACKENDS: Dict[str, Callable[[], ITransactionRepository]] = {
+    "list": InMemoryTransactionRepository,
+    "columnar": ColumnarTransactionRepository,
+}
+
+
+def peak_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def fill(repository: ITransactionRepository, rows: int) -> None:
+    rng = random.Random(0)
+    for _ in range(rows):
+        transaction = SimpleTransaction(
+            rng.randrange(WALLETS), rng.randrange(WALLETS), rng.random()
+        )
+        # a third of the transfers are between different users
+        if rng.random() < 1 / 3:
+            transaction.kind = TransactionKind.BETWEEN_USERS
+        repository.create(transaction)
+
+
+def query_latency(
+    repository: ITransactionRepository, query: Callable[[int], object]
+) -> float:
+    rng = random.Random(1)
+    addresses = [rng.randrange(WALLETS) for _ in range(QUERIES)]
+    started = time.perf_counter()
+    for address in addresses:
+        query(address)
+    return (time.perf_counter() - started) / QUERIES
+
+
+def measure(name: str, rows: int, results: "multiprocessing.Queue[str]") -> None:
+    before = peak_rss()
+    started = time.perf_counter()
+    repository = BACKENDS[name]()
+    fill(repository, rows)
+    fill_seconds = time.perf_counter() - started
+    per_row = (peak_rss() - before) / rows
+
+    page = query_latency(
+        repository, lambda a: repository.get_wallet_transactions(a, limit=PAGE)
+    )
+    listing = query_latency(repository, repository.get_wallet_transactions)
+    three = query_latency(
+        repository,
+        lambda a: repository.get_transactions_for_wallets([a, a + 1, a + 2]),
+    )
+    results.put(
+        f"{name:>9}: {per_row:6.1f} B/transaction, fill {fill_seconds:6.1f} s, "
+        f"page of {PAGE} {page * 1e6:7.1f} us, wallet {listing * 1e6:7.1f} us, "
+        f"three wallets {three * 1e6:7.1f} us"
+    )
+
+
+def main(rows: int = ROWS) -> None:
+    context = multiprocessing.get_context("fork")
+    results: "multiprocessing.Queue[str]" = context.Queue()
+    print(f"{rows} transactions over {WALLETS} wallets")
+    for name in BACKENDS:
+        process = context.Process(target=measure, args=(name, rows, results))
+        process.start()
+        print(results.get())
+        process.join()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
@@ -0,0 +1,91 @@
+"""
+Compares transfer throughput on a file database when every step commits on its
+own connection (the old path), with one commit per transfer on a shared
+connection, and with the fused transfer repository on top of that.
+
+    python -m benchmarks.transfer_commits
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Optional
+
+from app.core.transaction.interactor import MakeTransactionRequest, TransactionInteractor
+from app.core.transaction.transaction import SimpleTransaction
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+
+TRANSFERS = 500
+
+
+def build_interactor(
+    db_name: str, connection: Optional[sqlite3.Connection], fused: bool = False
+) -> TransactionInteractor:
+    users = SQLBaseRepository(db_name, DummyApiKeyGenerator(), connection=connection)
+    return TransactionInteractor(
+        set(),
+        transactions_repository=SQLTransactionRepository(db_name, connection),
+        wallets_repository=WalletSQLRepository(
+            db_name, user_repository=users, connection=connection
+        ),
+        user_repository=users,
+        profits_repository=ProfitsRepository(db_name, connection),
+        transfer_repository=SQLTransferRepository(db_name, connection) if fused else None,
+    )
+
+
+def legacy_transfer(
+    interactor: TransactionInteractor, sender: int, receiver: int
+) -> None:
+    interactor.wallets_repository.withdraw(sender, 0.001)
+    interactor.wallets_repository.commit()
+    interactor.wallets_repository.deposit(receiver, 0.001)
+    interactor.wallets_repository.commit()
+    transaction = SimpleTransaction(sender, receiver, 0.001)
+    result = interactor.transactions_repository.create(transaction)
+    interactor.transactions_repository.commit()
+    interactor.profits_repository.add_system_profit(
+        result.data, transaction.calculate_system_profit()
+    )
+    interactor.profits_repository.commit()
+
+
+def run(shared: bool, fused: bool = False) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        db_name = os.path.join(directory, "wallets.db")
+        connection = sqlite3.connect(db_name) if shared else None
+        interactor = build_interactor(db_name, connection, fused)
+        api_key = interactor.user_repository.register_user("sender").data
+        other_key = interactor.user_repository.register_user("receiver").data
+        sender, _ = interactor.wallets_repository.create_wallet(api_key)
+        receiver, _ = interactor.wallets_repository.create_wallet(other_key)
+        request = MakeTransactionRequest(
+            api_key, sender.get_address(), receiver.get_address(), 0.001
+        )
+
+        started = time.perf_counter()
+        for _ in range(TRANSFERS):
+            if shared:
+                interactor.fire_transaction(request)
+            else:
+                legacy_transfer(interactor, sender.get_address(), receiver.get_address())
+        elapsed = time.perf_counter() - started
+        del interactor
+        if connection is not None:
+            connection.close()
+        return TRANSFERS / elapsed
+
+
+def main() -> None:
+    print(f"per-step commits:     {run(shared=False):8.0f} transfers/s")
+    print(f"one commit, shared:   {run(shared=True):8.0f} transfers/s")
+    print(f"fused transfer:       {run(shared=True, fused=True):8.0f} transfers/s")
+
+
+if __name__ == "__main__":
+    main()
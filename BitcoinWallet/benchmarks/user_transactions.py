@@ -0,0 +1,83 @@
+"""
+Time to list every transaction of a user with three wallets: the old
+per-wallet queries with a list-membership dedupe versus one
+get_transactions_for_wallets call, for both transaction repositories.
+
+    python -m benchmarks.user_transactions
+"""
+import random
+import time
+from typing import Callable, List, Tuple
+
+from app.core.transaction.transaction import (
+    ITransaction,
+    ITransactionRepository,
+    SimpleTransaction,
+)
+from app.infra.in_memory.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+
+TRANSACTIONS_PER_USER = [10_000, 100_000]
+USER_WALLETS = [1, 2, 3]
+OTHER_WALLETS = list(range(4, 1_000))
+# the legacy merge is quadratic: ~20 s at 10k already
+LEGACY_LIMIT = 10_000
+
+
+def fill(repository: ITransactionRepository, per_user: int) -> None:
+    rng = random.Random(0)
+    for _ in range(per_user):
+        # the user's transactions, a third of them between own wallets
+        sender = rng.choice(USER_WALLETS)
+        receiver = rng.choice(USER_WALLETS + OTHER_WALLETS[:2])
+        repository.create(SimpleTransaction(sender, receiver, 1))
+        # and as many between other wallets
+        repository.create(
+            SimpleTransaction(rng.choice(OTHER_WALLETS), rng.choice(OTHER_WALLETS), 1)
+        )
+    repository.commit()
+
+
+def legacy(repository: ITransactionRepository) -> List[ITransaction]:
+    user_transactions: List[ITransaction] = []
+    for address in USER_WALLETS:
+        for transaction in repository.get_wallet_transactions(address).data:
+            if transaction not in user_transactions:
+                user_transactions.append(transaction)
+    return user_transactions
+
+
+def set_based(repository: ITransactionRepository) -> List[ITransaction]:
+    return repository.get_transactions_for_wallets(USER_WALLETS).data
+
+
+def timed(
+    run: Callable[[ITransactionRepository], List[ITransaction]],
+    repository: ITransactionRepository,
+) -> Tuple[float, int]:
+    started = time.perf_counter()
+    count = len(run(repository))
+    return time.perf_counter() - started, count
+
+
+def main() -> None:
+    for per_user in TRANSACTIONS_PER_USER:
+        repositories = {
+            "sql": SQLTransactionRepository(":memory:"),
+            "in-memory": InMemoryTransactionRepository(),
+        }
+        for name, repository in repositories.items():
+            fill(repository, per_user)
+            new, count = timed(set_based, repository)
+            line = f"{per_user:>7} per user, {name:>9}: {new * 1000:7.1f} ms set-based"
+            if per_user <= LEGACY_LIMIT:
+                old, legacy_count = timed(legacy, repository)
+                assert legacy_count == count
+                line += f", {old * 1000:9.1f} ms legacy"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
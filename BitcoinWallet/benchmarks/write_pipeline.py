@@ -0,0 +1,94 @@
+"""
+Concurrent transfers through WalletService on a file database, with each
+request committing on its own pooled connection versus all writes batched
+by SQLiteWritePipeline. Uses the "durable" profile, where every commit is
+synced.
+
+    python -m benchmarks.write_pipeline
+"""
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from app.core.auth.interactor import RegisterUserRequest
+from app.core.facade import WalletService
+from app.core.transaction.interactor import MakeTransactionRequest
+from app.core.wallet.Converter import WrongConverter
+from app.core.wallet.interactor import CreateWalletRequest
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.connection import SQLiteConnectionPool
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.storage_profile import STORAGE_PROFILES
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.infra.sql_base.write_pipeline import SQLiteWritePipeline
+
+THREADS = 16
+TRANSFERS_PER_THREAD = 100
+
+
+def run(batched: bool) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        pool = SQLiteConnectionPool(
+            os.path.join(directory, "wallets.db"),
+            pool_size=THREADS,
+            profile=STORAGE_PROFILES["durable"],
+        )
+        pipeline: Optional[SQLiteWritePipeline] = None
+        if batched:
+            pipeline = SQLiteWritePipeline(pool)
+            pipeline.start()
+        users = SQLBaseRepository("", DummyApiKeyGenerator(), connections=pool)
+        service = WalletService.create(
+            user_repository=users,
+            transaction_repository=SQLTransactionRepository("", connections=pool),
+            wallet_repository=WalletSQLRepository(
+                "", user_repository=users, connections=pool
+            ),
+            profits_repository=ProfitsRepository("", connections=pool),
+            converter=WrongConverter(),
+            transfer_repository=SQLTransferRepository("", connections=pool),
+            write_pipeline=pipeline,
+        )
+        api_key = service.register_user(RegisterUserRequest("user")).data.api_key
+        sender = service.create_wallet(CreateWalletRequest(api_key)).data.wallet_address
+        receiver = service.create_wallet(CreateWalletRequest(api_key)).data.wallet_address
+        request = MakeTransactionRequest(api_key, sender, receiver, 0.0001)
+        start = threading.Barrier(THREADS + 1)
+
+        def work() -> None:
+            start.wait()
+            for _ in range(TRANSFERS_PER_THREAD):
+                with pool.request_scope():
+                    service.make_transaction(request)
+
+        workers = [threading.Thread(target=work) for _ in range(THREADS)]
+        for worker in workers:
+            worker.start()
+        start.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        label = "write pipeline" if batched else "commit per request"
+        print(f"{label}: {THREADS * TRANSFERS_PER_THREAD / elapsed:7.0f} transfers/s")
+        if pipeline is not None:
+            pipeline.stop()
+            print(f"  mean batch size: {pipeline.batch_sizes.mean():.1f}")
+            print(f"  batch sizes:     {pipeline.batch_sizes.snapshot()}")
+            print(f"  queue ms:        {pipeline.queue_latency_ms.snapshot()}")
+        pool.close()
+
+
+def main() -> None:
+    run(batched=False)
+    run(batched=True)
+
+
+if __name__ == "__main__":
+    main()
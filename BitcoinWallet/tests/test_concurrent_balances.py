@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+
+THREADS = 8
+ATTEMPTS = 200
+FUNDS = 1000
+
+
+def balance(con: sqlite3.Connection, address: int) -> float:
+    amount: float = con.execute(
+        "SELECT amount FROM wallet WHERE wallet_address = ?", (address,)
+    ).fetchone()[0]
+    return amount
+
+
+def test_concurrent_transfers_lose_no_updates(tmp_path: Path) -> None:
+    db_name = str(tmp_path / "wallets.db")
+    con = sqlite3.connect(db_name)
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connection=con)
+    repository = WalletSQLRepository("", user_repository=users, connection=con)
+    api_key = users.register_user("user").data
+    sender, _ = repository.create_wallet(api_key)
+    receiver, _ = repository.create_wallet(api_key)
+    repository.deposit(sender.get_address(), FUNDS - 1)
+    repository.commit()
+
+    succeeded: List[int] = []
+    start = threading.Barrier(THREADS)
+
+    def transfer() -> None:
+        # one connection per thread, all writing the same two rows
+        repository = WalletSQLRepository(db_name, user_repository=users)
+        start.wait()
+        count = 0
+        for _ in range(ATTEMPTS):
+            withdrawn, _ = repository.withdraw(sender.get_address(), 1)
+            if withdrawn:
+                repository.deposit(receiver.get_address(), 1)
+                count += 1
+            repository.commit()
+        succeeded.append(count)
+
+    threads = [threading.Thread(target=transfer) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(succeeded) == FUNDS
+    assert balance(con, sender.get_address()) == 0
+    assert balance(con, receiver.get_address()) == FUNDS + 1
+
+
+def test_withdraw_reports_why_nothing_changed() -> None:
+    con = sqlite3.connect(":memory:")
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connection=con)
+    repository = WalletSQLRepository("", user_repository=users, connection=con)
+    wallet, _ = repository.create_wallet(users.register_user("user").data)
+
+    assert repository.withdraw(wallet.get_address(), 2) == (
+        False,
+        "Not enough money in account",
+    )
+    assert repository.withdraw(1000, 1) == (False, "Wrong wallet address")
+    assert repository.deposit(1000, 1) == (False, "Wrong wallet address")
+    assert repository.withdraw(wallet.get_address(), 1) == (True, None)
+    assert balance(con, wallet.get_address()) == 0
@@ -0,0 +1,144 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.core.transaction.interactor import MakeTransactionRequest, TransactionInteractor
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.connection import PoolTimeoutError, SQLiteConnectionPool
+from app.infra.sql_base.migrations import MIGRATIONS, schema_version
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.storage_profile import STORAGE_PROFILES
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.utils.result import ResultStatus
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> SQLiteConnectionPool:
+    pool = SQLiteConnectionPool(str(tmp_path / "wallets.db"), pool_size=2)
+    yield pool
+    pool.close()
+
+
+def test_scope_reuses_one_connection(pool: SQLiteConnectionPool) -> None:
+    with pool.request_scope():
+        first = pool.connection()
+        assert pool.connection() is first
+    assert schema_version(first) == MIGRATIONS[-1].version
+
+    with pool.request_scope():
+        assert pool.connection() is first
+
+
+def test_threads_get_own_connections(pool: SQLiteConnectionPool) -> None:
+    seen: List[sqlite3.Connection] = []
+    outside = pool.connection()
+
+    def work() -> None:
+        seen.append(pool.connection())
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+
+    assert pool.connection() is outside
+    assert seen[0] is not outside
+
+
+def test_checkout_times_out_when_exhausted(tmp_path: Path) -> None:
+    pool = SQLiteConnectionPool(str(tmp_path / "wallets.db"), pool_size=1,
+                                checkout_timeout=0.05)
+    held = threading.Event()
+    done = threading.Event()
+
+    def hold() -> None:
+        with pool.request_scope():
+            pool.connection()
+            held.set()
+            done.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    with pool.request_scope():
+        with pytest.raises(PoolTimeoutError):
+            pool.connection()
+    done.set()
+    thread.join()
+
+    with pool.request_scope():
+        assert pool.connection() is not None
+
+
+def test_release_rolls_back_unfinished_work(pool: SQLiteConnectionPool) -> None:
+    with pool.request_scope():
+        pool.connection().execute("INSERT INTO users (username) VALUES ('lost')")
+
+    with pool.request_scope():
+        count = pool.connection().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    assert count == 0
+
+
+def test_memory_database_is_shared() -> None:
+    pool = SQLiteConnectionPool(":memory:")
+    with pool.request_scope():
+        first = pool.connection()
+    assert pool.connection() is first
+
+
+def test_requests_on_threads_transfer_in_their_own_transactions(
+    pool: SQLiteConnectionPool,
+) -> None:
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connections=pool)
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=SQLTransactionRepository("", connections=pool),
+        wallets_repository=WalletSQLRepository(
+            "", user_repository=users, connections=pool
+        ),
+        user_repository=users,
+        profits_repository=ProfitsRepository("", connections=pool),
+    )
+    api_key = users.register_user("user").data
+    sender, _ = interactor.wallets_repository.create_wallet(api_key)
+    receiver, _ = interactor.wallets_repository.create_wallet(api_key)
+    request = MakeTransactionRequest(
+        api_key, sender.get_address(), receiver.get_address(), 0.001
+    )
+    statuses: List[ResultStatus] = []
+
+    def transfer() -> None:
+        for _ in range(25):
+            with pool.request_scope():
+                statuses.append(interactor.fire_transaction(request).status)
+
+    threads = [threading.Thread(target=transfer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [ResultStatus.SUCCESS] * 100
+    assert interactor.transactions_repository.get_transaction_count().data == 100
+
+
+@pytest.mark.parametrize("name", sorted(STORAGE_PROFILES))
+def test_profile_is_applied_to_every_connection(tmp_path: Path, name: str) -> None:
+    profile = STORAGE_PROFILES[name]
+    pool = SQLiteConnectionPool(str(tmp_path / "wallets.db"), profile=profile)
+    connections = [pool.connection()]
+    with pool.request_scope():
+        connections.append(pool.connection())
+
+    for con in connections:
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert con.execute("PRAGMA synchronous").fetchone()[0] == {
+            "OFF": 0, "NORMAL": 1, "FULL": 2
+        }[profile.synchronous]
+        assert con.execute("PRAGMA cache_size").fetchone()[0] == profile.cache_size
+        assert con.execute("PRAGMA busy_timeout").fetchone()[0] == profile.busy_timeout
+    pool.close()
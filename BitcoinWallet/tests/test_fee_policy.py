@@ -0,0 +1,185 @@
+import random
+import sqlite3
+
+import pytest
+
+from app.core.transaction.fees import (
+    DEFAULT_FEE_POLICY,
+    FeePolicy,
+    FeeRule,
+    FeeTier,
+)
+from app.core.transaction.interactor import MakeTransactionRequest, TransactionInteractor
+from app.core.transaction.transaction import (
+    SYSTEM_FEE_RATES,
+    SimpleTransaction,
+    TransactionKind,
+)
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.in_memory.columnar_transaction_repository import (
+    ColumnarTransactionRepository,
+)
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.utils.result import ResultStatus
+
+SIMPLE, BETWEEN_USERS = TransactionKind.SIMPLE, TransactionKind.BETWEEN_USERS
+
+POLICY = FeePolicy(
+    rules={
+        SIMPLE: FeeRule(minimum=0.001),
+        BETWEEN_USERS: FeeRule(
+            rate=0.15,
+            tiers=(FeeTier(1, 0.1), FeeTier(10, 0.05)),
+            minimum=0.01,
+        ),
+    },
+    overrides={7: {BETWEEN_USERS: FeeRule(rate=0.02)}, 8: {SIMPLE: FeeRule()}},
+)
+
+
+def test_default_policy_charges_the_fee_rates() -> None:
+    fee = DEFAULT_FEE_POLICY.compile()
+    for kind, rate in SYSTEM_FEE_RATES.items():
+        assert fee(2.0, kind, None) == 2.0 * rate
+
+
+@pytest.mark.parametrize(
+    "balance, kind, user_id, expected",
+    [
+        (0.5, BETWEEN_USERS, 1, 0.075),
+        # the tier's rate applies from its threshold up, to the whole balance
+        (1, BETWEEN_USERS, 1, 0.1),
+        (20, BETWEEN_USERS, 1, 1),
+        (0.02, BETWEEN_USERS, 1, 0.01),
+        # a minimum is never more than the balance
+        (0.005, BETWEEN_USERS, 1, 0.005),
+        (3, SIMPLE, None, 0.001),
+        (20, BETWEEN_USERS, 7, 0.4),
+        (3, SIMPLE, 7, 0.001),
+        (3, SIMPLE, 8, 0),
+    ],
+)
+def test_compiled_policy(
+    balance: float, kind: TransactionKind, user_id: int, expected: float
+) -> None:
+    assert POLICY.compile()(balance, kind, user_id) == pytest.approx(expected)
+
+
+def test_tiers_must_be_ordered() -> None:
+    with pytest.raises(ValueError):
+        FeeRule(tiers=(FeeTier(10, 0.05), FeeTier(1, 0.1)))
+
+
+def test_transfers_are_priced_by_the_policy() -> None:
+    for fused in (False, True):
+        con = sqlite3.connect(":memory:")
+        users = SQLBaseRepository("", DummyApiKeyGenerator(), connection=con)
+        wallets = WalletSQLRepository("", user_repository=users, connection=con)
+        interactor = TransactionInteractor(
+            set(),
+            transactions_repository=SQLTransactionRepository("", con),
+            wallets_repository=wallets,
+            user_repository=users,
+            profits_repository=ProfitsRepository("", con),
+            transfer_repository=SQLTransferRepository("", con) if fused else None,
+            fees=POLICY.compile(),
+        )
+        api_key = users.register_user("user").data
+        sender, _ = wallets.create_wallet(api_key)
+        receiver, _ = wallets.create_wallet(users.register_user("other").data)
+
+        result = interactor.fire_transaction(
+            MakeTransactionRequest(
+                api_key, sender.get_address(), receiver.get_address(), 0.5
+            )
+        )
+
+        assert result.status == ResultStatus.SUCCESS
+        (transaction,) = interactor.transactions_repository.get_wallet_transactions(
+            receiver.get_address()
+        ).data
+        assert transaction.calculate_system_profit() == pytest.approx(0.075)
+        assert interactor.transactions_repository.get_total_fees().data == (
+            pytest.approx(0.075)
+        )
+
+
+def random_rows(count: int) -> list:
+    rng = random.Random(0)
+    return [
+        (
+            rng.choice((rng.random(), rng.uniform(0, 30), rng.choice((1.0, 10.0)))),
+            rng.choice((SIMPLE, BETWEEN_USERS)),
+            rng.choice((-1, 1, 7, 8)),
+        )
+        for _ in range(count)
+    ]
+
+
+def test_scalar_and_vectorized_fees_agree() -> None:
+    np = pytest.importorskip("numpy")
+    from app.infra.fees.vectorized import vectorized_fees
+
+    rows = random_rows(5000)
+    balances, kinds, users = zip(*rows)
+    fee = POLICY.compile()
+
+    fees = vectorized_fees(
+        POLICY, np.array(balances), np.array(kinds, dtype=np.int8), np.array(users)
+    )
+
+    assert fees.tolist() == [fee(*row) for row in rows]
+    assert vectorized_fees(POLICY, np.array(balances), np.array(kinds)).tolist() == [
+        fee(balance, kind, None) for balance, kind, _ in rows
+    ]
+
+
+def test_columnar_repository_is_repriced() -> None:
+    pytest.importorskip("numpy")
+    from app.infra.fees.vectorized import reprice_columnar
+
+    repository = ColumnarTransactionRepository()
+    rows = random_rows(1000)
+    for sender, (balance, kind, _) in enumerate(rows):
+        repository.create(SimpleTransaction(sender, 0, balance, kind=kind))
+    owners = {sender: user_id for sender, (_, _, user_id) in enumerate(rows)}
+
+    reprice_columnar(repository, POLICY, owners)
+
+    fee = POLICY.compile()
+    transactions = repository.transactions(range(len(rows)))
+    assert [t.calculate_system_profit() for t in transactions] == [
+        fee(balance, kind, owners[sender])
+        for sender, (balance, kind, _) in enumerate(rows)
+    ]
+
+
+def test_stored_fees_are_repriced() -> None:
+    pytest.importorskip("numpy")
+    from app.infra.sql_base.fee_repricing import reprice_fees
+
+    con = sqlite3.connect(":memory:")
+    transactions = SQLTransactionRepository("", con)
+    con.execute("INSERT INTO wallet (wallet_address, user_id, amount) VALUES (1, 7, 0)")
+    con.execute("INSERT INTO wallet (wallet_address, user_id, amount) VALUES (2, 1, 0)")
+    rows = random_rows(300)
+    for index, (balance, kind, _) in enumerate(rows):
+        transactions.create(SimpleTransaction(1 + index % 3, 2, balance, kind=kind))
+    transactions.commit()
+
+    assert reprice_fees(con, POLICY, batch_size=64) > 0
+    assert reprice_fees(con, POLICY, batch_size=64) == 0
+
+    fee = POLICY.compile()
+    owners = {1: 7, 2: 1}
+    expected = [
+        fee(balance, kind, owners.get(1 + index % 3))
+        for index, (balance, kind, _) in enumerate(rows)
+    ]
+    stored = con.execute("SELECT system_fee FROM transactions ORDER BY id").fetchall()
+    assert [row[0] for row in stored] == expected
+    assert transactions.get_total_fees().data == pytest.approx(sum(expected))
@@ -0,0 +1,144 @@
+import sqlite3
+from typing import List, Optional, Tuple
+
+import pytest
+
+from app.core.exceptions import (
+    TransactionError,
+    UserNotFoundError,
+    WalletNotAccessibleError,
+)
+from app.core.transaction.interactor import MakeTransactionRequest, TransactionInteractor
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.query_plan import QueryPlanChecker
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.utils.result import ResultStatus
+
+# user lookup, wallet read, debit, credit, one insert
+STATEMENT_BUDGET = 5
+# both paths stamp rows with the same time so their tables compare equal
+NOW = 1_700_000_000.0
+
+
+def clock() -> float:
+    return NOW
+
+
+def build_interactor(
+    con: sqlite3.Connection, fused: bool
+) -> TransactionInteractor:
+    users = SQLBaseRepository(":memory:", DummyApiKeyGenerator(), connection=con)
+    return TransactionInteractor(
+        set(),
+        transactions_repository=SQLTransactionRepository(":memory:", con, clock=clock),
+        wallets_repository=WalletSQLRepository(
+            ":memory:", user_repository=users, connection=con
+        ),
+        user_repository=users,
+        profits_repository=ProfitsRepository(":memory:", con, clock=clock),
+        transfer_repository=(
+            SQLTransferRepository(":memory:", con, clock=clock) if fused else None
+        ),
+    )
+
+
+def create_wallets(interactor: TransactionInteractor) -> Tuple[str, int, int, int]:
+    api_key = interactor.user_repository.register_user("user").data
+    other_key = interactor.user_repository.register_user("other").data
+    first, _ = interactor.wallets_repository.create_wallet(api_key)
+    second, _ = interactor.wallets_repository.create_wallet(api_key)
+    foreign, _ = interactor.wallets_repository.create_wallet(other_key)
+    return api_key, first.get_address(), second.get_address(), foreign.get_address()
+
+
+def table(con: sqlite3.Connection, name: str) -> List[tuple]:
+    return con.execute(f"SELECT * FROM {name} ORDER BY 1").fetchall()
+
+
+def test_transfer_statement_budget() -> None:
+    con = sqlite3.connect(":memory:")
+    interactor = build_interactor(con, fused=True)
+    api_key, first, _, foreign = create_wallets(interactor)
+    statements: List[str] = []
+    con.set_trace_callback(statements.append)
+
+    result = interactor.fire_transaction(
+        MakeTransactionRequest(api_key, first, foreign, 0.5)
+    )
+
+    con.set_trace_callback(None)
+    assert result.status == ResultStatus.SUCCESS
+    # trigger steps are traced again under the statement that fired them
+    issued = [s for i, s in enumerate(statements) if i == 0 or s != statements[i - 1]]
+    work = [s for s in issued if s not in ("BEGIN ", "COMMIT")]
+    assert len(work) <= STATEMENT_BUDGET
+    assert statements.count("COMMIT") == 1
+
+
+def test_transfer_statements_use_indexes() -> None:
+    con = sqlite3.connect(":memory:")
+    interactor = build_interactor(con, fused=True)
+    api_key, first, second, foreign = create_wallets(interactor)
+
+    with QueryPlanChecker(con) as checker:
+        interactor.fire_transaction(MakeTransactionRequest(api_key, first, second, 0.1))
+        interactor.fire_transaction(MakeTransactionRequest(api_key, first, foreign, 0.1))
+
+    assert checker.full_scans() == []
+
+
+@pytest.mark.parametrize(
+    "sender, receiver, amount, key, error",
+    [
+        ("first", "second", 0.5, "user", None),
+        ("first", "foreign", 0.5, "user", None),
+        ("first", "first", 0.5, "user", None),
+        ("first", "foreign", 1.0, "user", None),
+        ("first", "foreign", 2.0, "user", TransactionError),
+        ("first", "foreign", 0.0, "user", TransactionError),
+        ("first", None, 0.5, "user", TransactionError),
+        ("foreign", "first", 0.5, "user", WalletNotAccessibleError),
+        (None, "first", 0.5, "user", WalletNotAccessibleError),
+        ("first", "foreign", 0.5, "bad key", UserNotFoundError),
+    ],
+)
+def test_fused_path_matches_step_by_step_path(
+    sender: Optional[str],
+    receiver: Optional[str],
+    amount: float,
+    key: str,
+    error: Optional[type],
+) -> None:
+    outcomes = []
+    for fused in (False, True):
+        con = sqlite3.connect(":memory:")
+        interactor = build_interactor(con, fused)
+        api_key, first, second, foreign = create_wallets(interactor)
+        addresses = {"first": first, "second": second, "foreign": foreign, None: 1000}
+        result = interactor.fire_transaction(
+            MakeTransactionRequest(
+                api_key if key == "user" else key,
+                addresses[sender],
+                addresses[receiver],
+                amount,
+            )
+        )
+        if error is None:
+            assert result.status == ResultStatus.SUCCESS
+        else:
+            assert isinstance(result.exception, error)
+        outcomes.append(
+            (
+                result.data,
+                getattr(result.exception, "message", None),
+                table(con, "wallet"),
+                table(con, "transactions"),
+                table(con, "profits"),
+            )
+        )
+
+    assert outcomes[0] == outcomes[1]
@@ -0,0 +1,127 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.core.transaction.interactor import (
+    MakeTransactionRequest,
+    TransactionInteractor,
+    UserTransactionsRequest,
+    WalletTransactionsRequest,
+)
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base import migrations
+from app.infra.sql_base.migrations import MIGRATIONS, migrate, schema_version
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.query_plan import FullScanError, QueryPlanChecker
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.utils.result import ResultStatus
+
+LATEST = MIGRATIONS[-1].version
+
+
+def index_names(con: sqlite3.Connection) -> set:
+    rows = con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {row[0] for row in rows}
+
+
+def test_migrate_empty_database() -> None:
+    con = sqlite3.connect(":memory:")
+    assert migrate(con) == LATEST
+    assert schema_version(con) == LATEST
+    assert {
+        "users_api_key",
+        "wallet_user_id",
+        "transactions_sender",
+        "transactions_receiver",
+    } <= index_names(con)
+
+
+def test_migrate_is_idempotent() -> None:
+    con = sqlite3.connect(":memory:")
+    migrate(con)
+    assert migrate(con) == LATEST
+
+
+def test_concurrent_migrations_apply_each_step_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_name = str(tmp_path / "wallets.db")
+    first, second = sqlite3.connect(db_name), sqlite3.connect(db_name)
+    migrate(first, MIGRATIONS[:3])
+    real_schema_version = migrations.schema_version
+    reads = []
+
+    # the other process migrates right after this one read the version
+    def racing_schema_version(con: sqlite3.Connection) -> int:
+        reads.append(real_schema_version(con))
+        if len(reads) == 1:
+            migrate(second)
+        return reads[-1]
+
+    monkeypatch.setattr(migrations, "schema_version", racing_schema_version)
+    assert migrate(first) == LATEST
+    assert reads[0] == 3
+    assert real_schema_version(first) == LATEST
+
+
+def test_migrate_existing_unversioned_database() -> None:
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE users (id integer primary key, username text, api_key text)")
+    con.execute("INSERT INTO users (username, api_key) VALUES ('user', 'key')")
+    con.commit()
+
+    migrate(con)
+
+    assert "users_api_key" in index_names(con)
+    assert con.execute("SELECT api_key FROM users").fetchall() == [("key",)]
+
+
+def test_checker_reports_full_scan() -> None:
+    con = sqlite3.connect(":memory:")
+    migrate(con)
+    with QueryPlanChecker(con) as checker:
+        con.execute("SELECT * FROM users WHERE username = ?", ("user",))
+    with pytest.raises(FullScanError):
+        checker.check()
+
+
+def test_repository_queries_use_indexes(tmp_path: Path) -> None:
+    db_name = str(tmp_path / "wallets.db")
+    con = sqlite3.connect(db_name)
+    users = SQLBaseRepository(db_name, DummyApiKeyGenerator(), connection=con)
+    wallets = WalletSQLRepository(
+        db_name=db_name, user_repository=users, connection=con
+    )
+    transactions = SQLTransactionRepository(db_name, connection=con)
+    profits = ProfitsRepository(db_name, connection=con)
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=transactions,
+        wallets_repository=wallets,
+        user_repository=users,
+        profits_repository=profits,
+    )
+    with QueryPlanChecker(con) as checker:
+        first_key = users.register_user("first").data
+        second_key = users.register_user("second").data
+        sender, _ = wallets.create_wallet(first_key)
+        receiver, _ = wallets.create_wallet(second_key)
+        wallets.get_wallet(first_key, sender.get_address())
+        wallets.get_wallets(first_key, [])
+        result = interactor.fire_transaction(
+            MakeTransactionRequest(
+                first_key, sender.get_address(), receiver.get_address(), 0.5
+            )
+        )
+        assert result.status == ResultStatus.SUCCESS
+        interactor.get_wallet_transactions(
+            WalletTransactionsRequest(first_key, sender.get_address())
+        )
+        interactor.get_user_transactions(UserTransactionsRequest(second_key))
+        transactions.get_transaction_count()
+        profits.get_total_profit()
+
+    checker.check()
@@ -0,0 +1,326 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+
+from app.core.transaction.transaction import (
+    SimpleTransaction,
+    TransactionBetweenUsers,
+    TransactionKind,
+)
+from app.infra.notifications.dispatcher import (
+    Backpressure,
+    ObserverDispatcher,
+    TransactionEvent,
+)
+from app.infra.notifications.webhook import WebhookObserver
+
+
+class RecordingObserver:
+    def __init__(self) -> None:
+        self.ids: List[int] = []
+        self.lock = threading.Lock()
+
+    def on_transaction_succeeded(self, transaction: Any) -> None:
+        with self.lock:
+            self.ids.append(transaction.get_transaction_id())
+
+
+class BatchObserver:
+    def __init__(self) -> None:
+        self.events: List[TransactionEvent] = []
+        self.batches: List[List[int]] = []
+
+    def on_transactions_succeeded(self, transactions: List[TransactionEvent]) -> None:
+        self.events.extend(transactions)
+        self.batches.append([t.transaction_id for t in transactions])
+
+
+class GatedObserver(RecordingObserver):
+    """Holds every delivery until the gate opens."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def on_transaction_succeeded(self, transaction: Any) -> None:
+        self.entered.set()
+        self.gate.wait(5)
+        super().on_transaction_succeeded(transaction)
+
+
+class FailingObserver:
+    def on_transaction_succeeded(self, transaction: Any) -> None:
+        raise RuntimeError("notifier down")
+
+
+def transaction(transaction_id: int) -> SimpleTransaction:
+    return SimpleTransaction(1, 2, 1.0, transaction_id)
+
+
+@pytest.fixture
+def sink() -> Iterator[Any]:
+    received: List[Any] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            length = int(self.headers["Content-Length"])
+            received.append(json.loads(self.rfile.read(length)))
+            self.send_response(204 if self.path == "/hook" else 500)
+            self.end_headers()
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.received = received  # type: ignore
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_notify_does_not_wait_for_observers() -> None:
+    dispatcher = ObserverDispatcher(workers=1)
+    slow = GatedObserver()
+    dispatcher.subscribe(slow)
+    dispatcher.start()
+
+    started = time.perf_counter()
+    for transaction_id in range(10):
+        dispatcher.on_transaction_succeeded(transaction(transaction_id))
+    assert time.perf_counter() - started < 1
+
+    slow.gate.set()
+    dispatcher.stop()
+    assert slow.ids == list(range(10))
+
+
+def test_failing_observer_does_not_affect_others() -> None:
+    dispatcher = ObserverDispatcher()
+    failing = dispatcher.subscribe(FailingObserver())
+    recorder = RecordingObserver()
+    recording = dispatcher.subscribe(recorder)
+    dispatcher.start()
+    for transaction_id in range(5):
+        dispatcher.on_transaction_succeeded(transaction(transaction_id))
+    dispatcher.stop()
+
+    assert sorted(recorder.ids) == list(range(5))
+    assert recording.delivered == 5
+    assert failing.delivered == 0 and failing.failures >= 1
+    assert isinstance(failing.last_error, RuntimeError)
+
+
+def test_batch_observer_receives_queued_events_together() -> None:
+    dispatcher = ObserverDispatcher(workers=1, max_batch_size=4)
+    gated = GatedObserver()
+    batches = BatchObserver()
+    dispatcher.subscribe(gated)
+    dispatcher.subscribe(batches)
+    dispatcher.start()
+
+    dispatcher.on_transaction_succeeded(transaction(0))
+    assert gated.entered.wait(5)
+    for transaction_id in range(1, 10):
+        dispatcher.on_transaction_succeeded(transaction(transaction_id))
+    gated.gate.set()
+    dispatcher.stop()
+
+    assert batches.batches == [[0], [1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+
+def test_events_are_snapshots() -> None:
+    dispatcher = ObserverDispatcher()
+    batches = BatchObserver()
+    dispatcher.subscribe(batches)
+    dispatcher.start()
+    dispatcher.on_transaction_succeeded(TransactionBetweenUsers(transaction(7)))
+    dispatcher.stop()
+
+    assert batches.events == [
+        TransactionEvent(7, 1, 2, 1.0, 0.15, TransactionKind.BETWEEN_USERS)
+    ]
+
+
+def test_spilled_event_keeps_its_kind() -> None:
+    event = TransactionEvent.of(TransactionBetweenUsers(transaction(7)))
+    assert TransactionEvent.loads(event.dumps()) == event
+    assert TransactionEvent.loads(event.dumps()).kind is TransactionKind.BETWEEN_USERS
+
+
+def test_full_queue_drops() -> None:
+    dispatcher = ObserverDispatcher(capacity=2, workers=1)
+    gated = GatedObserver()
+    dispatcher.subscribe(gated)
+    dispatcher.start()
+    dispatcher.on_transaction_succeeded(transaction(0))
+    assert gated.entered.wait(5)
+
+    for transaction_id in range(1, 6):
+        dispatcher.on_transaction_succeeded(transaction(transaction_id))
+    gated.gate.set()
+    dispatcher.stop()
+
+    assert dispatcher.dropped == 3
+    assert gated.ids == [0, 1, 2]
+
+
+def test_full_queue_blocks() -> None:
+    dispatcher = ObserverDispatcher(capacity=1, workers=1, backpressure=Backpressure.BLOCK)
+    gated = GatedObserver()
+    dispatcher.subscribe(gated)
+    dispatcher.start()
+    dispatcher.on_transaction_succeeded(transaction(0))
+    assert gated.entered.wait(5)
+    dispatcher.on_transaction_succeeded(transaction(1))
+
+    blocked = threading.Thread(
+        target=dispatcher.on_transaction_succeeded, args=(transaction(2),)
+    )
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    gated.gate.set()
+    blocked.join(5)
+    dispatcher.stop()
+    assert gated.ids == [0, 1, 2]
+
+
+def test_full_queue_spills_to_disk(tmp_path: Path) -> None:
+    spill_path = str(tmp_path / "events.spill")
+    dispatcher = ObserverDispatcher(
+        capacity=1,
+        workers=1,
+        backpressure=Backpressure.SPILL,
+        spill_path=spill_path,
+        idle_interval=0.01,
+    )
+    gated = GatedObserver()
+    dispatcher.subscribe(gated)
+    dispatcher.start()
+    dispatcher.on_transaction_succeeded(transaction(0))
+    assert gated.entered.wait(5)
+
+    for transaction_id in range(1, 6):
+        dispatcher.on_transaction_succeeded(transaction(transaction_id))
+    assert dispatcher.spilled == 4
+    gated.gate.set()
+    deadline = time.monotonic() + 5
+    while len(gated.ids) < 6 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dispatcher.stop()
+
+    assert sorted(gated.ids) == list(range(6))
+    assert not Path(spill_path).exists()
+
+
+def test_spilled_events_survive_a_restart(tmp_path: Path) -> None:
+    spill_path = str(tmp_path / "events.spill")
+    dispatcher = ObserverDispatcher(
+        capacity=1, backpressure=Backpressure.SPILL, spill_path=spill_path
+    )
+    for transaction_id in range(3):
+        dispatcher.on_transaction_succeeded(transaction(transaction_id))
+
+    restarted = ObserverDispatcher(spill_path=spill_path, idle_interval=0.01)
+    batches = BatchObserver()
+    restarted.subscribe(batches)
+    restarted.start()
+    deadline = time.monotonic() + 5
+    while not batches.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    restarted.stop()
+
+    assert batches.batches == [[1, 2]]
+
+
+def test_unreadable_spilled_lines_are_skipped(tmp_path: Path) -> None:
+    spill = tmp_path / "events.spill"
+    good = [TransactionEvent.of(transaction(t)).dumps() for t in (1, 2)]
+    # garbage, a bad kind and a line cut short by a crash mid-append
+    spill.write_text(
+        "\n".join([good[0], "not json", good[1][:-1] + ', "kind": 9}'])
+        + "\n"
+        + good[1][:20],
+        encoding="utf-8",
+    )
+    dispatcher = ObserverDispatcher(
+        workers=1, spill_path=str(spill), idle_interval=0.01
+    )
+    recorder = RecordingObserver()
+    dispatcher.subscribe(recorder)
+    dispatcher.start()
+    deadline = time.monotonic() + 5
+    while dispatcher.unreadable < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    dispatcher.on_transaction_succeeded(transaction(3))
+    dispatcher.stop()
+
+    assert dispatcher.unreadable == 3
+    assert recorder.ids == [1, 3]
+    assert not spill.exists()
+
+
+def test_worker_survives_delivery_errors(tmp_path: Path) -> None:
+    # a directory where the spill file should be cannot be read
+    dispatcher = ObserverDispatcher(
+        workers=1, spill_path=str(tmp_path), idle_interval=0.01
+    )
+    recorder = RecordingObserver()
+    dispatcher.subscribe(recorder)
+    dispatcher.start()
+    deadline = time.monotonic() + 5
+    while not dispatcher.worker_errors and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    dispatcher.on_transaction_succeeded(transaction(1))
+    dispatcher.stop()
+
+    assert dispatcher.worker_errors >= 1
+    assert isinstance(dispatcher.last_error, OSError)
+    assert recorder.ids == [1]
+
+
+def test_webhook_posts_batches_to_sink(sink: Any) -> None:
+    url = f"http://127.0.0.1:{sink.server_port}/hook"
+    dispatcher = ObserverDispatcher(workers=1)
+    subscription = dispatcher.subscribe(WebhookObserver(url))
+    dispatcher.start()
+    dispatcher.on_transaction_succeeded(TransactionBetweenUsers(transaction(3)))
+    dispatcher.stop()
+
+    assert subscription.delivered == 1
+    assert sink.received == [
+        {
+            "transactions": [
+                {
+                    "transaction_id": 3,
+                    "sender_address": 1,
+                    "receiver_address": 2,
+                    "balance": 1.0,
+                    "system_profit": 0.15,
+                    "kind": 1,
+                }
+            ]
+        }
+    ]
+
+
+def test_webhook_errors_are_counted(sink: Any) -> None:
+    url = f"http://127.0.0.1:{sink.server_port}/broken"
+    dispatcher = ObserverDispatcher(workers=1)
+    subscription = dispatcher.subscribe(WebhookObserver(url))
+    dispatcher.start()
+    dispatcher.on_transaction_succeeded(transaction(1))
+    dispatcher.stop()
+
+    assert (subscription.delivered, subscription.failures) == (0, 1)
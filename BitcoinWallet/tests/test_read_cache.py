@@ -0,0 +1,228 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pytest
+
+from app.core.statistics.interactor import StatisticsInteractor, StatisticsRequest
+from app.core.transaction.interactor import (
+    MakeTransactionRequest,
+    TransactionInteractor,
+    WalletTransactionsRequest,
+)
+from app.core.transaction.transaction import ITransaction
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.cache.read_cache import (
+    STATISTICS,
+    CachedProfitsRepository,
+    CachedTransactionRepository,
+    CachedWalletRepository,
+    ReadCache,
+    ReadCacheInvalidator,
+    wallet_tag,
+)
+from app.infra.sql_base.connection import SQLiteConnectionPool
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.infra.sql_base.write_pipeline import SQLiteWritePipeline
+from app.utils.result import Result, ResultStatus
+
+
+class RecordingObserver:
+    def __init__(self) -> None:
+        self.transactions: List[ITransaction] = []
+
+    def on_transaction_succeeded(self, transaction: ITransaction) -> None:
+        self.transactions.append(transaction)
+
+
+@pytest.fixture
+def connection() -> sqlite3.Connection:
+    return sqlite3.connect(":memory:")
+
+
+@pytest.fixture
+def cache() -> ReadCache:
+    return ReadCache()
+
+
+def build_interactor(
+    connection: sqlite3.Connection, cache: ReadCache, fused: bool = False
+) -> TransactionInteractor:
+    users = SQLBaseRepository(":memory:", DummyApiKeyGenerator(), connection=connection)
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=CachedTransactionRepository(
+            SQLTransactionRepository(":memory:", connection), cache
+        ),
+        wallets_repository=CachedWalletRepository(
+            WalletSQLRepository(":memory:", user_repository=users, connection=connection),
+            cache,
+        ),
+        user_repository=users,
+        profits_repository=CachedProfitsRepository(
+            ProfitsRepository(":memory:", connection), cache
+        ),
+        transfer_repository=SQLTransferRepository(":memory:", connection) if fused else None,
+    )
+    interactor.attach(ReadCacheInvalidator(cache))
+    return interactor
+
+
+def create_wallets(
+    interactor: TransactionInteractor,
+) -> Tuple[str, str, int, int, int]:
+    api_key = interactor.user_repository.register_user("user").data
+    other_key = interactor.user_repository.register_user("other").data
+    first, _ = interactor.wallets_repository.create_wallet(api_key)
+    second, _ = interactor.wallets_repository.create_wallet(other_key)
+    third, _ = interactor.wallets_repository.create_wallet(other_key)
+    return (
+        api_key,
+        other_key,
+        first.get_address(),
+        second.get_address(),
+        third.get_address(),
+    )
+
+
+def count_statements(connection: sqlite3.Connection, read: Callable[[], object]) -> int:
+    statements: List[str] = []
+    connection.set_trace_callback(statements.append)
+    read()
+    connection.set_trace_callback(None)
+    return len(statements)
+
+
+def test_invalidate_drops_only_tagged_entries() -> None:
+    cache = ReadCache()
+    cache.load("a", lambda: 1, lambda _: [wallet_tag(1)])
+    cache.load("b", lambda: 2, lambda _: [wallet_tag(1), wallet_tag(2)])
+    cache.load("c", lambda: 3, lambda _: [wallet_tag(3)])
+
+    cache.invalidate(wallet_tag(1))
+
+    assert len(cache) == 1
+    assert cache.load("c", lambda: 30, lambda _: []) == 3
+    assert cache.load("b", lambda: 20, lambda _: []) == 20
+
+
+def test_value_loaded_across_an_invalidation_is_not_stored() -> None:
+    cache = ReadCache()
+
+    def racing_load() -> int:
+        cache.invalidate(STATISTICS)
+        return 1
+
+    assert cache.load("a", racing_load, lambda _: [STATISTICS]) == 1
+    assert len(cache) == 0
+
+
+def test_capacity_evicts_least_recently_used() -> None:
+    cache = ReadCache(capacity=2)
+    for key in ("a", "b", "c"):
+        cache.load(key, lambda: key, lambda _: [wallet_tag(1)])
+    assert len(cache) == 2
+    assert cache.load("a", lambda: "reloaded", lambda _: None) == "reloaded"
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_observers_hear_about_committed_transfers(
+    connection: sqlite3.Connection, cache: ReadCache, fused: bool
+) -> None:
+    interactor = build_interactor(connection, cache, fused)
+    observer = RecordingObserver()
+    interactor.attach(observer)
+    api_key, _, first, second, _ = create_wallets(interactor)
+
+    result = interactor.fire_transaction(MakeTransactionRequest(api_key, first, second, 0.5))
+    interactor.fire_transaction(MakeTransactionRequest(api_key, first, second, 5))
+
+    (transaction,) = observer.transactions
+    assert transaction.get_transaction_id() == result.data
+    assert (transaction.get_sender_address(), transaction.get_receiver_address()) == (
+        first,
+        second,
+    )
+    assert transaction.calculate_system_profit() == pytest.approx(0.075)
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_transfer_invalidates_only_its_wallets(
+    connection: sqlite3.Connection, cache: ReadCache, fused: bool
+) -> None:
+    interactor = build_interactor(connection, cache, fused)
+    api_key, other_key, first, second, third = create_wallets(interactor)
+    wallets = interactor.wallets_repository
+
+    def read_all() -> None:
+        wallets.get_wallet(api_key, first)
+        wallets.get_wallet(other_key, second)
+        wallets.get_wallet(other_key, third)
+        interactor.get_wallet_transactions(WalletTransactionsRequest(api_key, third))
+
+    read_all()
+    assert count_statements(connection, read_all) == 1  # the api key lookup
+
+    interactor.fire_transaction(MakeTransactionRequest(api_key, first, second, 0.5))
+
+    assert wallets.get_wallet(api_key, first)[0].get_amount() == pytest.approx(0.5)
+    assert wallets.get_wallet(other_key, second)[0].get_amount() == pytest.approx(1.5)
+    assert count_statements(
+        connection, lambda: wallets.get_wallet(other_key, third)
+    ) == 0
+
+
+def test_statistics_are_cached_until_a_transfer(
+    connection: sqlite3.Connection, cache: ReadCache
+) -> None:
+    interactor = build_interactor(connection, cache)
+    statistics = StatisticsInteractor(
+        profits_repository=interactor.profits_repository,
+        transactions_repository=interactor.transactions_repository,
+        admin_keys=["admin"],
+    )
+    api_key, _, first, second, _ = create_wallets(interactor)
+
+    def read() -> None:
+        statistics.get_statistics(StatisticsRequest("admin"))
+
+    read()
+    assert count_statements(connection, read) == 0
+
+    interactor.fire_transaction(MakeTransactionRequest(api_key, first, second, 0.5))
+    response = statistics.get_statistics(StatisticsRequest("admin"))
+    assert response.status == ResultStatus.SUCCESS
+    assert response.data.transaction_count == 1
+    assert response.data.total_profit == pytest.approx(0.075)
+
+
+def test_read_between_write_and_commit_is_dropped(tmp_path: Path) -> None:
+    cache = ReadCache()
+    pool = SQLiteConnectionPool(str(tmp_path / "wallets.db"))
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connections=pool)
+    wallets = CachedWalletRepository(
+        WalletSQLRepository("", user_repository=users, connections=pool), cache
+    )
+    api_key = users.register_user("user").data
+    user_id = users.get_user_id(api_key)
+    pipeline = SQLiteWritePipeline(pool, batch_scopes=[cache.deferred])
+    pipeline.start()
+
+    def create_then_read() -> Result[int]:
+        wallet, _ = wallets.create_wallet(api_key)
+        # another request reads before the batch commits
+        reader = threading.Thread(target=wallets.get_user_wallets, args=(user_id,))
+        reader.start()
+        reader.join()
+        return Result(ResultStatus.SUCCESS, wallet.get_address())
+
+    address = pipeline.submit(create_then_read).result(5).data
+    pipeline.stop()
+
+    assert [w.get_address() for w in wallets.get_user_wallets(user_id)] == [address]
+    pool.close()
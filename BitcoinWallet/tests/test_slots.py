@@ -0,0 +1,66 @@
+import dataclasses
+
+import pytest
+
+from app.core.transaction.transaction import (
+    SimpleTransaction,
+    TransactionBetweenUsers,
+    TransactionKind,
+)
+from app.core.wallet.wallet import BitcoinWallet
+from app.utils.result import Result, ResultStatus
+from app.utils.slots import slotted
+
+
+@slotted
+@dataclasses.dataclass(frozen=True)
+class Point:
+    x: int
+    y: int = 0
+
+
+@slotted
+@dataclasses.dataclass(frozen=True)
+class LabelledPoint(Point):
+    label: str = ""
+
+
+def test_slotted_dataclass_has_no_instance_dict() -> None:
+    point = LabelledPoint(1, label="a")
+
+    assert point == LabelledPoint(1, 0, "a")
+    assert LabelledPoint.__slots__ == ("label",)
+    assert not hasattr(point, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        point.x = 2  # type: ignore
+    assert dataclasses.replace(point, y=3) == LabelledPoint(1, 3, "a")
+
+
+@pytest.mark.parametrize(
+    "instance",
+    [
+        SimpleTransaction(1, 2, 3),
+        TransactionBetweenUsers(SimpleTransaction(1, 2, 3)),
+        BitcoinWallet(1, 1, 1.0),
+        Result(ResultStatus.SUCCESS, 1),
+    ],
+)
+def test_domain_objects_are_slotted(instance: object) -> None:
+    assert not hasattr(instance, "__dict__")
+
+
+def test_kind_replaces_the_decorator() -> None:
+    decorated = TransactionBetweenUsers(SimpleTransaction(1, 2, 10))
+    plain = SimpleTransaction(1, 2, 10, kind=TransactionKind.BETWEEN_USERS)
+
+    assert plain.calculate_system_profit() == decorated.calculate_system_profit()
+    assert plain.get_kind() == decorated.get_kind() == TransactionKind.BETWEEN_USERS
+    assert SimpleTransaction(1, 2, 10).calculate_system_profit() == 0
+
+
+def test_decorator_forwards_transaction_id() -> None:
+    inner = SimpleTransaction(1, 2, 10)
+    decorated = TransactionBetweenUsers(inner)
+    decorated.transaction_id = 4
+
+    assert inner.transaction_id == decorated.get_transaction_id() == 4
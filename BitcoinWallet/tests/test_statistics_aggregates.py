@@ -0,0 +1,148 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.core.statistics.interactor import StatisticsInteractor, StatisticsRequest
+from app.core.transaction.transaction import SimpleTransaction, TransactionKind
+from app.infra.in_memory.profits_in_memory_repository import ProfitsInMemoryRepository
+from app.infra.sql_base.migrations import MIGRATIONS, migrate, rebuild_statistics
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.runner.rebuild_statistics import main as rebuild_main
+
+
+@pytest.fixture
+def con() -> sqlite3.Connection:
+    return sqlite3.connect(":memory:")
+
+
+def statistics(con: sqlite3.Connection) -> StatisticsInteractor:
+    return StatisticsInteractor(
+        profits_repository=ProfitsRepository("", con),
+        transactions_repository=SQLTransactionRepository("", con),
+        admin_keys=["admin"],
+    )
+
+
+def test_aggregates_follow_writes(con: sqlite3.Connection) -> None:
+    interactor = statistics(con)
+    transactions = interactor.transactions_repository
+    profits = interactor.profits_repository
+    for balance in (1, 2, 3):
+        transaction_id = transactions.create(SimpleTransaction(1, 2, balance)).data
+        profits.add_system_profit(transaction_id, balance * 0.15)
+    transactions.commit()
+
+    response = interactor.get_statistics(StatisticsRequest("admin")).data
+    assert response.transaction_count == 3
+    assert response.total_profit == pytest.approx(0.9)
+
+    con.execute("UPDATE profits SET system_profit = 1 WHERE transaction_id = 1")
+    con.execute("DELETE FROM transactions WHERE id = 3")
+    con.execute("DELETE FROM profits WHERE transaction_id = 3")
+    con.commit()
+    response = interactor.get_statistics(StatisticsRequest("admin")).data
+    assert response.transaction_count == 2
+    assert response.total_profit == pytest.approx(1.3)
+
+
+def test_rolled_back_writes_leave_aggregates_alone(con: sqlite3.Connection) -> None:
+    transactions = SQLTransactionRepository("", con)
+    profits = ProfitsRepository("", con)
+    transaction_id = transactions.create(SimpleTransaction(1, 2, 5)).data
+    profits.add_system_profit(transaction_id, 0.75)
+    transactions.rollback()
+
+    assert transactions.get_transaction_count().data == 0
+    assert profits.get_total_profit().data == 0
+
+
+def test_migration_seeds_aggregates_from_existing_rows(con: sqlite3.Connection) -> None:
+    migrate(con, MIGRATIONS[:2])
+    con.execute("INSERT INTO transactions (sender, receiver, balance) VALUES (1, 2, 4)")
+    con.execute("INSERT INTO profits (transaction_id, system_profit) VALUES (1, 0.6)")
+    con.commit()
+
+    migrate(con)
+
+    response = statistics(con).get_statistics(StatisticsRequest("admin")).data
+    assert (response.transaction_count, response.total_profit) == (1, 0.6)
+
+
+def test_migration_moves_fees_onto_transactions(con: sqlite3.Connection) -> None:
+    migrate(con, MIGRATIONS[:4])
+    con.executemany(
+        """INSERT INTO transactions (sender, receiver, balance, created_at)
+        VALUES (?, ?, ?, ?)""",
+        [(1, 2, 4, 60), (1, 3, 2, 120)],
+    )
+    # a fee for each transfer, one charged late, and a profit of its own
+    con.executemany(
+        """INSERT INTO profits (transaction_id, system_profit, created_at)
+        VALUES (?, ?, ?)""",
+        [(1, 0.6, 60), (2, 0, 120), (7, 0.5, 200)],
+    )
+    con.commit()
+
+    migrate(con)
+
+    assert con.execute("SELECT id, kind, system_fee FROM transactions").fetchall() == [
+        (1, 1, 0.6),
+        (2, 0, 0),
+    ]
+    assert con.execute("SELECT transaction_id FROM profits").fetchall() == [(7,)]
+    transactions = SQLTransactionRepository("", con)
+    (between_users,) = transactions.get_wallet_transactions(2).data
+    assert between_users.calculate_system_profit() == pytest.approx(0.6)
+    assert transactions.get_total_fees().data == pytest.approx(0.6)
+    assert ProfitsRepository("", con).get_total_profit().data == pytest.approx(0.5)
+    assert con.execute(
+        "SELECT bucket, transaction_count, volume, profit FROM statistics_rollups "
+        "WHERE granularity = 60"
+    ).fetchall() == [(60, 1, 4, 0.6), (120, 1, 2, 0), (180, 0, 0, 0.5)]
+
+
+def test_fee_changes_follow_into_aggregates(con: sqlite3.Connection) -> None:
+    interactor = statistics(con)
+    transactions = interactor.transactions_repository
+    for balance in (1, 2):
+        transactions.create(
+            SimpleTransaction(1, 2, balance, kind=TransactionKind.BETWEEN_USERS)
+        )
+    transactions.commit()
+    assert interactor.get_statistics(StatisticsRequest("admin")).data.total_profit == (
+        pytest.approx(0.45)
+    )
+
+    con.execute("UPDATE transactions SET system_fee = 1 WHERE id = 1")
+    con.execute("DELETE FROM transactions WHERE id = 2")
+    con.commit()
+    response = interactor.get_statistics(StatisticsRequest("admin")).data
+    assert response.transaction_count == 1
+    assert response.total_profit == pytest.approx(1)
+
+
+def test_rebuild_repairs_drifted_aggregates(tmp_path: Path) -> None:
+    db_name = str(tmp_path / "wallets.db")
+    con = sqlite3.connect(db_name)
+    transactions = SQLTransactionRepository("", con)
+    transactions.create(SimpleTransaction(1, 2, 4))
+    ProfitsRepository("", con).add_system_profit(1, 0.6)
+    con.execute("UPDATE statistics SET transaction_count = 42, total_profit = -1")
+    con.commit()
+
+    assert rebuild_statistics(con) == (1, 0.6)
+    con.execute("UPDATE statistics SET transaction_count = 42")
+    con.commit()
+    rebuild_main(db_name)
+    assert transactions.get_transaction_count().data == 1
+
+
+def test_in_memory_total_is_kept_running() -> None:
+    repository = ProfitsInMemoryRepository()
+    repository.add_system_profit(1, 0.5)
+    repository.add_system_profit(2, 0.25)
+
+    assert repository.get_total_profit().data == 0.75
+    assert ProfitsInMemoryRepository().get_total_profit().data == 0
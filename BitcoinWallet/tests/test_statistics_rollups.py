@@ -0,0 +1,193 @@
+import sqlite3
+from typing import List
+
+import pytest
+
+from app.core.statistics.interactor import (
+    StatisticsBucket,
+    StatisticsInteractor,
+    StatisticsRequest,
+)
+from app.core.transaction.transaction import SimpleTransaction, TransactionKind
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.rollups_sql_repository import StatisticsRollupsRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.transfer_sql_repository import SQLTransferRepository
+from app.utils.result import ResultStatus
+
+DAY = 86400
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def con() -> sqlite3.Connection:
+    return sqlite3.connect(":memory:")
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(10 * DAY)
+
+
+def statistics(con: sqlite3.Connection, clock: FakeClock) -> StatisticsInteractor:
+    return StatisticsInteractor(
+        profits_repository=ProfitsRepository("", con, clock=clock),
+        transactions_repository=SQLTransactionRepository("", con, clock=clock),
+        admin_keys=["admin"],
+        rollups_repository=StatisticsRollupsRepository("", con),
+    )
+
+
+def transfer(interactor: StatisticsInteractor, balance: float) -> None:
+    transaction_id = interactor.transactions_repository.create(
+        SimpleTransaction(1, 2, balance)
+    ).data
+    interactor.profits_repository.add_system_profit(transaction_id, balance * 0.015)
+    interactor.transactions_repository.commit()
+
+
+def windowed(
+    interactor: StatisticsInteractor, **window: object
+) -> List[StatisticsBucket]:
+    result = interactor.get_statistics(StatisticsRequest("admin", **window))
+    assert result.status == ResultStatus.SUCCESS
+    return result.data.buckets
+
+
+def test_rows_are_rolled_up_per_bucket(
+    con: sqlite3.Connection, clock: FakeClock
+) -> None:
+    interactor = statistics(con, clock)
+    transfer(interactor, 1)
+    clock.now += 30
+    transfer(interactor, 2)
+    clock.now += 60
+    transfer(interactor, 4)
+    clock.now += DAY
+    transfer(interactor, 8)
+
+    minutes = windowed(interactor, granularity="minute")
+    assert [(b.start, b.transaction_count, b.volume) for b in minutes] == [
+        (10 * DAY, 2, 3),
+        (10 * DAY + 60, 1, 4),
+        (11 * DAY + 60, 1, 8),
+    ]
+    days = windowed(interactor, granularity="day")
+    assert [(b.start, b.transaction_count, b.volume) for b in days] == [
+        (10 * DAY, 3, 7),
+        (11 * DAY, 1, 8),
+    ]
+    assert days[0].profit == pytest.approx(7 * 0.015)
+
+
+def test_window_is_half_open_and_summed(
+    con: sqlite3.Connection, clock: FakeClock
+) -> None:
+    interactor = statistics(con, clock)
+    for hour in range(4):
+        clock.now = 10 * DAY + hour * 3600
+        transfer(interactor, hour + 1)
+
+    result = interactor.get_statistics(
+        StatisticsRequest(
+            "admin",
+            from_time=10 * DAY + 3600,
+            to_time=10 * DAY + 3 * 3600,
+            granularity="hour",
+        )
+    ).data
+    assert [b.start for b in result.buckets] == [10 * DAY + 3600, 10 * DAY + 7200]
+    assert result.transaction_count == 2
+    assert result.total_profit == pytest.approx(5 * 0.015)
+
+
+def test_unaligned_window_snaps_to_whole_buckets(
+    con: sqlite3.Connection, clock: FakeClock
+) -> None:
+    interactor = statistics(con, clock)
+    for hour in range(4):
+        clock.now = 10 * DAY + hour * 3600 + 1800
+        transfer(interactor, hour + 1)
+
+    result = interactor.get_statistics(
+        StatisticsRequest(
+            "admin",
+            from_time=10 * DAY + 3600 + 2700,
+            to_time=10 * DAY + 2 * 3600 + 900,
+            granularity="hour",
+        )
+    ).data
+    assert [b.start for b in result.buckets] == [10 * DAY + 3600, 10 * DAY + 7200]
+    assert result.transaction_count == 2
+    assert result.total_profit == pytest.approx(5 * 0.015)
+
+
+def test_deletes_and_profit_updates_adjust_rollups(
+    con: sqlite3.Connection, clock: FakeClock
+) -> None:
+    interactor = statistics(con, clock)
+    transfer(interactor, 1)
+    transfer(interactor, 2)
+    con.execute("UPDATE profits SET system_profit = 1 WHERE transaction_id = 1")
+    con.execute("DELETE FROM transactions WHERE id = 2")
+    con.execute("DELETE FROM profits WHERE transaction_id = 2")
+    con.commit()
+
+    (bucket,) = windowed(interactor, granularity="day")
+    assert (bucket.transaction_count, bucket.volume) == (1, 1)
+    assert bucket.profit == pytest.approx(1)
+
+
+def test_transaction_fees_are_rolled_up(
+    con: sqlite3.Connection, clock: FakeClock
+) -> None:
+    interactor = statistics(con, clock)
+    transactions = interactor.transactions_repository
+    for balance in (1, 2):
+        transactions.create(
+            SimpleTransaction(1, 2, balance, kind=TransactionKind.BETWEEN_USERS)
+        )
+    con.execute("UPDATE transactions SET system_fee = 1 WHERE id = 1")
+    con.execute("DELETE FROM transactions WHERE id = 2")
+    con.commit()
+
+    (bucket,) = windowed(interactor, granularity="hour")
+    assert (bucket.transaction_count, bucket.volume) == (1, 1)
+    assert bucket.profit == pytest.approx(1)
+
+
+def test_fused_transfer_is_rolled_up(con: sqlite3.Connection, clock: FakeClock) -> None:
+    transfers = SQLTransferRepository("", con, clock=clock)
+    con.execute("INSERT INTO wallet (wallet_address, user_id, amount) VALUES (1, 1, 5)")
+    con.execute("INSERT INTO wallet (wallet_address, user_id, amount) VALUES (2, 2, 0)")
+    transfers.apply_transfer(SimpleTransaction(1, 2, 2), 0.03)
+    transfers.commit()
+
+    (bucket,) = windowed(statistics(con, clock), granularity="minute")
+    assert (bucket.start, bucket.transaction_count, bucket.volume) == (10 * DAY, 1, 2)
+    assert bucket.profit == pytest.approx(0.03)
+
+
+def test_rows_without_timestamp_are_left_out(
+    con: sqlite3.Connection, clock: FakeClock
+) -> None:
+    interactor = statistics(con, clock)
+    con.execute("INSERT INTO transactions (sender, receiver, balance) VALUES (1, 2, 3)")
+    con.commit()
+
+    assert windowed(interactor, granularity="day") == []
+    lifetime = interactor.get_statistics(StatisticsRequest("admin")).data
+    assert lifetime.transaction_count == 1
+
+
+def test_unknown_granularity_fails(con: sqlite3.Connection, clock: FakeClock) -> None:
+    interactor = statistics(con, clock)
+    result = interactor.get_statistics(StatisticsRequest("admin", granularity="week"))
+    assert result.status == ResultStatus.FAIL
@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.core.exceptions import WalletNotAccessibleError
+from app.core.transaction.interactor import (
+    ExportTransactionsRequest,
+    MakeTransactionRequest,
+    TransactionInteractor,
+)
+from app.core.transaction.transaction import (
+    ITransactionRepository,
+    SimpleTransaction,
+    TransactionKind,
+)
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.fastapi.transactions import ndjson_lines
+from app.infra.in_memory.columnar_transaction_repository import (
+    ColumnarTransactionRepository,
+)
+from app.infra.in_memory.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from app.infra.sql_base.connection import SQLiteConnectionPool
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.storage_profile import STORAGE_PROFILES
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.utils.result import ResultStatus
+
+
+def fill(repository: ITransactionRepository, count: int) -> None:
+    for index in range(count):
+        sender, receiver = (1, 2) if index % 2 == 0 else (3, 4)
+        repository.create(SimpleTransaction(sender, receiver, index))
+    repository.commit()
+
+
+BACKENDS = {
+    "sql": lambda: SQLTransactionRepository(":memory:"),
+    "in_memory": InMemoryTransactionRepository,
+    "columnar": ColumnarTransactionRepository,
+}
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_export_honours_id_range(backend: str) -> None:
+    repository: ITransactionRepository = BACKENDS[backend]()
+    fill(repository, 20)
+    everything = repository.get_wallet_transactions(2).data
+
+    assert list(repository.iter_wallet_transactions(2)) == everything
+    exported = list(repository.iter_wallet_transactions(2, from_id=4, to_id=12))
+    assert [t.get_transaction_id() for t in exported] == [
+        t.get_transaction_id() for t in everything if 4 <= t.get_transaction_id() <= 12
+    ]
+    assert list(repository.iter_wallet_transactions(2, from_id=13, to_id=12)) == []
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_exported_rows_carry_kind_and_fee(backend: str) -> None:
+    repository: ITransactionRepository = BACKENDS[backend]()
+    repository.create(SimpleTransaction(1, 2, 4))
+    repository.create(SimpleTransaction(3, 2, 2, kind=TransactionKind.BETWEEN_USERS))
+    repository.commit()
+
+    lines = ndjson_lines(repository.iter_wallet_transactions(2))
+    rows = [json.loads(line) for line in lines]
+    assert [(row["kind"], row["system_fee"]) for row in rows] == [
+        (TransactionKind.SIMPLE, 0),
+        (TransactionKind.BETWEEN_USERS, pytest.approx(0.3)),
+    ]
+    assert rows[1]["balance"] == 2
+
+
+def test_export_streams_on_its_own_connection(tmp_path: Path) -> None:
+    # without WAL an open export would block writers from committing
+    pool = SQLiteConnectionPool(
+        str(tmp_path / "wallets.db"), pool_size=1, profile=STORAGE_PROFILES["balanced"]
+    )
+    repository = SQLTransactionRepository("", connections=pool)
+    fill(repository, 2_000)
+
+    with pool.request_scope():
+        rows = repository.iter_wallet_transactions(1)
+        first = next(rows)
+    # the request is over and its connection is back in the pool
+    with pool.request_scope():
+        repository.create(SimpleTransaction(1, 2, 0))
+        repository.commit()
+    rest = list(rows)
+
+    assert first.get_transaction_id() == 1
+    assert len(rest) == 999
+    pool.close()
+
+
+def test_export_memory_does_not_grow_with_history(tmp_path: Path) -> None:
+    pool = SQLiteConnectionPool(str(tmp_path / "wallets.db"))
+    repository = SQLTransactionRepository("", connections=pool)
+    peaks: List[int] = []
+    for size in (5_000, 50_000):
+        fill(repository, size - repository.get_transaction_count().data)
+        tracemalloc.start()
+        lines = sum(1 for _ in ndjson_lines(repository.iter_wallet_transactions(2)))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert lines == size // 2
+
+    assert peaks[1] < 2 * peaks[0]
+    pool.close()
+
+
+def test_only_the_owner_can_export_a_wallet() -> None:
+    con = sqlite3.connect(":memory:")
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connection=con)
+    wallets = WalletSQLRepository("", user_repository=users, connection=con)
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=SQLTransactionRepository("", con),
+        wallets_repository=wallets,
+        user_repository=users,
+        profits_repository=ProfitsRepository("", con),
+    )
+    owner_key = users.register_user("owner").data
+    other_key = users.register_user("other").data
+    wallet, _ = wallets.create_wallet(owner_key)
+    other_wallet, _ = wallets.create_wallet(other_key)
+    interactor.fire_transaction(
+        MakeTransactionRequest(
+            owner_key, wallet.get_address(), other_wallet.get_address(), 0.5
+        )
+    )
+
+    denied = interactor.export_wallet_transactions(
+        ExportTransactionsRequest(other_key, wallet.get_address())
+    )
+    assert denied.status == ResultStatus.FAIL
+    assert isinstance(denied.exception, WalletNotAccessibleError)
+    assert denied.data is None
+
+    exported = interactor.export_wallet_transactions(
+        ExportTransactionsRequest(owner_key, wallet.get_address())
+    )
+    assert exported.status == ResultStatus.SUCCESS
+    assert [t.get_balance() for t in exported.data] == [0.5]
@@ -0,0 +1,174 @@
+import sqlite3
+from typing import Callable, List, Optional
+
+import pytest
+
+from app.core.transaction.interactor import (
+    TransactionInteractor,
+    UserTransactionsRequest,
+    WalletTransactionsRequest,
+)
+from app.core.transaction.transaction import (
+    ITransaction,
+    ITransactionRepository,
+    SimpleTransaction,
+)
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.in_memory.columnar_transaction_repository import (
+    ColumnarTransactionRepository,
+)
+from app.infra.in_memory.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from app.infra.in_memory.profits_in_memory_repository import ProfitsInMemoryRepository
+from app.infra.in_memory.wallet_in_memory_repository import InMemoryWalletRepository
+from app.infra.sql_base.query_plan import QueryPlanChecker
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.utils.result import ResultStatus
+
+
+def filled(repository: ITransactionRepository) -> ITransactionRepository:
+    # wallet 1 is in every third transaction, as sender or receiver
+    for index in range(30):
+        sender, receiver = (1, 2) if index % 3 == 0 else (2, 3)
+        if index % 6 == 3:
+            sender, receiver = 3, 1
+        repository.create(SimpleTransaction(sender, receiver, index))
+    return repository
+
+
+@pytest.fixture(params=["sql", "in_memory", "columnar"])
+def repository(request: pytest.FixtureRequest) -> ITransactionRepository:
+    if request.param == "sql":
+        return filled(SQLTransactionRepository(":memory:"))
+    if request.param == "columnar":
+        return filled(ColumnarTransactionRepository())
+    return filled(InMemoryTransactionRepository())
+
+
+def ids(transactions: List[ITransaction]) -> List[int]:
+    return [transaction.get_transaction_id() for transaction in transactions]
+
+
+def walk(
+    fetch: Callable[[Optional[int]], List[ITransaction]]
+) -> List[List[int]]:
+    pages = []
+    cursor: Optional[int] = None
+    while True:
+        page = fetch(cursor)
+        if not page:
+            return pages
+        pages.append(ids(page))
+        cursor = page[-1].get_transaction_id()
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_history_once(
+    repository: ITransactionRepository, descending: bool
+) -> None:
+    everything = ids(repository.get_wallet_transactions(1).data)
+    assert len(everything) == 10
+    assert everything == sorted(everything)
+
+    pages = walk(
+        lambda cursor: repository.get_wallet_transactions(
+            1, after_id=cursor, limit=4, descending=descending
+        ).data
+    )
+
+    assert [len(page) for page in pages] == [4, 4, 2]
+    flat = [transaction_id for page in pages for transaction_id in page]
+    assert flat == (everything[::-1] if descending else everything)
+
+
+def test_page_query_uses_index_ranges() -> None:
+    repository = filled(SQLTransactionRepository(":memory:"))
+    with QueryPlanChecker(repository.connection) as checker:
+        repository.get_wallet_transactions(1, after_id=5, limit=3)
+        repository.get_wallet_transactions(1, after_id=20, limit=3, descending=True)
+    assert checker.full_scans() == []
+
+
+def test_interactor_returns_next_cursor() -> None:
+    users = SQLBaseRepository(":memory:", DummyApiKeyGenerator())
+    wallets = InMemoryWalletRepository(user_repository=users)
+    api_key = users.register_user("user").data
+    first, _ = wallets.create_wallet(api_key)
+    second, _ = wallets.create_wallet(api_key)
+    transactions = InMemoryTransactionRepository()
+    for _ in range(3):
+        transactions.create(SimpleTransaction(first.get_address(), 99, 1))
+        transactions.create(SimpleTransaction(second.get_address(), 99, 1))
+        transactions.create(SimpleTransaction(first.get_address(), second.get_address(), 1))
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=transactions,
+        wallets_repository=wallets,
+        user_repository=users,
+        profits_repository=ProfitsInMemoryRepository(),
+    )
+
+    page = interactor.get_wallet_transactions(
+        WalletTransactionsRequest(api_key, first.get_address(), limit=4)
+    ).data
+    assert ids(page.transactions) == [0, 2, 3, 5]
+    assert page.next_cursor == 5
+    last = interactor.get_wallet_transactions(
+        WalletTransactionsRequest(api_key, first.get_address(), after_id=5, limit=4)
+    ).data
+    assert ids(last.transactions) == [6, 8]
+    assert last.next_cursor is None
+
+    seen: List[int] = []
+    cursor: Optional[int] = None
+    while True:
+        result = interactor.get_user_transactions(
+            UserTransactionsRequest(api_key, after_id=cursor, limit=4, descending=True)
+        )
+        assert result.status == ResultStatus.SUCCESS
+        seen += ids(result.data.user_transactions)
+        cursor = result.data.next_cursor
+        if cursor is None:
+            break
+    assert seen == list(range(8, -1, -1))
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("after_id", [None, 4, 17])
+def test_wallet_set_query_matches_per_wallet_listings(
+    repository: ITransactionRepository, descending: bool, after_id: Optional[int]
+) -> None:
+    expected = set()
+    for address in (1, 3):
+        expected |= set(
+            ids(
+                repository.get_wallet_transactions(
+                    address, after_id=after_id, descending=descending
+                ).data
+            )
+        )
+
+    result = repository.get_transactions_for_wallets(
+        [1, 3, 3, 404], after_id=after_id, descending=descending
+    )
+
+    assert result.status == ResultStatus.SUCCESS
+    assert ids(result.data) == sorted(expected, reverse=descending)
+    limited = repository.get_transactions_for_wallets(
+        [1, 3], after_id=after_id, limit=3, descending=descending
+    )
+    assert ids(limited.data) == ids(result.data)[:3]
+    assert repository.get_transactions_for_wallets([]).data == []
+
+
+def test_in_memory_index_covers_initial_transactions() -> None:
+    repository = InMemoryTransactionRepository(
+        transactions_db=[SimpleTransaction(1, 2, 1, 0), SimpleTransaction(2, 2, 1, 1)],
+        id_counter=2,
+    )
+    repository.create(SimpleTransaction(2, 1, 1))
+
+    assert ids(repository.get_wallet_transactions(2).data) == [0, 1, 2]
+    assert ids(repository.get_transactions_for_wallets([1, 2]).data) == [0, 1, 2]
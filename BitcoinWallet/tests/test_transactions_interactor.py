@@ -1,15 +1,27 @@
+from typing import Callable
+
 import pytest
 
 from app.core.auth.interactor import IUserRepository
-from app.core.statistics.interactor import IProfitsRepository
+from app.core.facade import WalletService
+from app.core.statistics.interactor import (
+    AddProfitRequest,
+    IProfitsRepository,
+    StatisticsRequest,
+)
 from app.core.transaction.interactor import (
     ITransactionRepository,
+    MakeTransactionRequest,
     TransactionInteractor,
     WalletTransactionsRequest,
 )
 from app.core.transaction.transaction import SimpleTransaction, TransactionBetweenUsers
+from app.core.wallet.Converter import APIConverter
 from app.core.wallet.wallet import IWalletRepository
 from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.in_memory.columnar_transaction_repository import (
+    ColumnarTransactionRepository,
+)
 from app.infra.in_memory.in_memory_transaction_repository import (
     InMemoryTransactionRepository,
 )
@@ -84,3 +96,37 @@ def test_wallet_transactions(
     assert len(wallet_transactions_result.data.transactions) == 2
     assert t1 in wallet_transactions_result.data.transactions
     assert t2 in wallet_transactions_result.data.transactions
+
+
+@pytest.mark.parametrize(
+    "transactions", [InMemoryTransactionRepository, ColumnarTransactionRepository]
+)
+def test_in_memory_transfer_fees_reach_statistics(
+    transactions: Callable[[], ITransactionRepository],
+    users_repository: IUserRepository,
+    in_memory_wallet_repository: IWalletRepository,
+) -> None:
+    service = WalletService.create(
+        user_repository=users_repository,
+        transaction_repository=transactions(),
+        wallet_repository=in_memory_wallet_repository,
+        profits_repository=ProfitsInMemoryRepository(),
+        converter=APIConverter(),
+    )
+    sender_key = users_repository.register_user("sender").data
+    receiver_key = users_repository.register_user("receiver").data
+    sender, _ = in_memory_wallet_repository.create_wallet(sender_key)
+    receiver, _ = in_memory_wallet_repository.create_wallet(receiver_key)
+    sender.deposit(10)
+
+    result = service.make_transaction(
+        MakeTransactionRequest(
+            sender_key, sender.get_address(), receiver.get_address(), 4
+        )
+    )
+    assert result.status == ResultStatus.SUCCESS
+    service.add_profit(AddProfitRequest(result.data, 0.25))
+
+    statistics = service.get_statistics(StatisticsRequest("admin_1")).data
+    assert statistics.transaction_count == 1
+    assert statistics.total_profit == pytest.approx(0.6 + 0.25)
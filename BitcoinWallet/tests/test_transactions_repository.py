@@ -1,4 +1,11 @@
-from app.core.transaction.transaction import SimpleTransaction
+from app.core.transaction.transaction import (
+    SimpleTransaction,
+    TransactionBetweenUsers,
+    TransactionKind,
+)
+from app.infra.in_memory.columnar_transaction_repository import (
+    ColumnarTransactionRepository,
+)
 from app.infra.in_memory.in_memory_transaction_repository import InMemoryTransactionRepository
 from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
 from app.utils.result import ResultStatus
@@ -47,4 +54,45 @@ def test_sql_transactions_repository() -> None:
     assert transaction2 in wallet_2_transactions_result.data
 
 
+def test_sql_transactions_repository_keeps_kind_and_fee() -> None:
+    repository = SQLTransactionRepository(":memory:")
+    repository.create(SimpleTransaction(1, 2, 5))
+    repository.create(TransactionBetweenUsers(SimpleTransaction(2, 3, 10)))
+
+    assert repository.connection.execute(
+        "SELECT kind, system_fee FROM transactions ORDER BY id"
+    ).fetchall() == [(0, 0), (1, 1.5)]
+    assert repository.get_wallet_transactions(2).data == [
+        SimpleTransaction(1, 2, 5, 1),
+        SimpleTransaction(2, 3, 10, 2, TransactionKind.BETWEEN_USERS),
+    ]
+    (between_users,) = list(repository.iter_wallet_transactions(3))
+    assert between_users.calculate_system_profit() == 1.5
+
+
+def test_columnar_transactions_repository() -> None:
+    repository = ColumnarTransactionRepository()
+    repository.create(SimpleTransaction(1, 2, 5))
+    repository.create(TransactionBetweenUsers(SimpleTransaction(2, 3, 10)))
+    repository.create(SimpleTransaction(2, 2, 1))
 
+    assert repository.get_transaction_count().data == 3
+    assert repository.get_wallet_transactions(1).data == [SimpleTransaction(1, 2, 5, 0)]
+    between_users = repository.get_wallet_transactions(3).data[0]
+    # read back with its kind, no decorator
+    assert between_users == SimpleTransaction(
+        2, 3, 10, 1, TransactionKind.BETWEEN_USERS
+    )
+    assert between_users.calculate_system_profit() == 1.5
+    # a transfer to the same wallet is posted once
+    assert list(repository.postings[2]) == [0, 1, 2]
+
+
+def test_columnar_failed_create_keeps_columns_aligned() -> None:
+    repository = ColumnarTransactionRepository()
+    result = repository.create(SimpleTransaction(1, 2, "five"))  # type: ignore
+
+    assert result.status == ResultStatus.FAIL
+    assert repository.get_transaction_count().data == 0
+    assert (len(repository.senders), len(repository.receivers)) == (0, 0)
+    assert repository.postings == {}
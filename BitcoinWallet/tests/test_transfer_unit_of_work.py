@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+from typing import Any, List, Tuple
+
+import pytest
+
+from app.core.transaction.interactor import MakeTransactionRequest, TransactionInteractor
+from app.core.transaction.transaction import ITransaction
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.utils.result import Result, ResultStatus
+
+
+@pytest.fixture
+def connection() -> sqlite3.Connection:
+    return sqlite3.connect(":memory:")
+
+
+@pytest.fixture
+def interactor(connection: sqlite3.Connection) -> TransactionInteractor:
+    users = SQLBaseRepository(":memory:", DummyApiKeyGenerator(), connection=connection)
+    return TransactionInteractor(
+        set(),
+        transactions_repository=SQLTransactionRepository(":memory:", connection),
+        wallets_repository=WalletSQLRepository(
+            ":memory:", user_repository=users, connection=connection
+        ),
+        user_repository=users,
+        profits_repository=ProfitsRepository(":memory:", connection),
+    )
+
+
+def create_wallets(interactor: TransactionInteractor) -> Tuple[str, int, int]:
+    api_key = interactor.user_repository.register_user("user").data
+    other_key = interactor.user_repository.register_user("other").data
+    sender, _ = interactor.wallets_repository.create_wallet(api_key)
+    receiver, _ = interactor.wallets_repository.create_wallet(other_key)
+    return api_key, sender.get_address(), receiver.get_address()
+
+
+def count_rows(connection: sqlite3.Connection, table: str) -> int:
+    count: int = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    return count
+
+
+def balance(connection: sqlite3.Connection, address: int) -> float:
+    amount: float = connection.execute(
+        "SELECT amount FROM wallet WHERE wallet_address = ?", (address,)
+    ).fetchone()[0]
+    return amount
+
+
+def test_transfer_commits_once(
+    interactor: TransactionInteractor, connection: sqlite3.Connection
+) -> None:
+    api_key, sender, receiver = create_wallets(interactor)
+    statements: List[str] = []
+    connection.set_trace_callback(statements.append)
+
+    result = interactor.fire_transaction(
+        MakeTransactionRequest(api_key, sender, receiver, 0.5)
+    )
+
+    connection.set_trace_callback(None)
+    assert result.status == ResultStatus.SUCCESS
+    assert statements.count("COMMIT") == 1
+    assert count_rows(connection, "transactions") == 1
+    # the fee is kept on the transaction row
+    assert count_rows(connection, "profits") == 0
+    assert connection.execute(
+        "SELECT kind, system_fee FROM transactions"
+    ).fetchall() == [(1, pytest.approx(0.075))]
+    assert balance(connection, sender) == 0.5
+    assert balance(connection, receiver) == 1.5
+
+
+def test_failed_deposit_rolls_back_withdrawal(
+    interactor: TransactionInteractor, connection: sqlite3.Connection
+) -> None:
+    api_key, sender, _ = create_wallets(interactor)
+
+    result = interactor.fire_transaction(
+        MakeTransactionRequest(api_key, sender, 1000, 0.5)
+    )
+
+    assert result.status == ResultStatus.FAIL
+    assert balance(connection, sender) == 1
+    assert count_rows(connection, "transactions") == 0
+
+
+def test_failed_transaction_insert_rolls_back_transfer(
+    interactor: TransactionInteractor, connection: sqlite3.Connection
+) -> None:
+    api_key, sender, receiver = create_wallets(interactor)
+
+    def failing_create(transaction: ITransaction) -> Result[int]:
+        return Result(ResultStatus.FAIL, exception=sqlite3.OperationalError())
+
+    interactor.transactions_repository.create = failing_create  # type: ignore
+
+    result = interactor.fire_transaction(
+        MakeTransactionRequest(api_key, sender, receiver, 0.5)
+    )
+
+    assert result.status == ResultStatus.FAIL
+    assert balance(connection, sender) == 1
+    assert balance(connection, receiver) == 1
+    assert count_rows(connection, "transactions") == 0
+
+
+def test_transfers_on_a_shared_connection_take_turns() -> None:
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    users = SQLBaseRepository(":memory:", DummyApiKeyGenerator(), connection=connection)
+    interactor = TransactionInteractor(
+        set(),
+        transactions_repository=SQLTransactionRepository(":memory:", connection),
+        wallets_repository=WalletSQLRepository(
+            ":memory:", user_repository=users, connection=connection
+        ),
+        user_repository=users,
+        profits_repository=ProfitsRepository(":memory:", connection),
+        transfer_lock=threading.Lock(),
+    )
+    api_key, sender, receiver = create_wallets(interactor)
+    create = interactor.transactions_repository.create
+    entered, gate = threading.Event(), threading.Event()
+
+    # the first transfer fails after withdraw and deposit, once the gate opens
+    def failing_once(transaction: ITransaction) -> Result[int]:
+        if not entered.is_set():
+            entered.set()
+            gate.wait(5)
+            return Result(ResultStatus.FAIL, exception=sqlite3.OperationalError())
+        return create(transaction)
+
+    interactor.transactions_repository.create = failing_once  # type: ignore
+    results: List[Result[Any]] = []
+
+    def transfer(amount: float) -> None:
+        request = MakeTransactionRequest(api_key, sender, receiver, amount)
+        results.append(interactor.fire_transaction(request))
+
+    failing = threading.Thread(target=transfer, args=(0.5,))
+    failing.start()
+    assert entered.wait(5)
+    other = threading.Thread(target=transfer, args=(0.25,))
+    other.start()
+    other.join(0.1)
+    gate.set()
+    failing.join(5)
+    other.join(5)
+
+    assert [r.status for r in results] == [ResultStatus.FAIL, ResultStatus.SUCCESS]
+    assert balance(connection, sender) == 0.75
+    assert balance(connection, receiver) == 1.25
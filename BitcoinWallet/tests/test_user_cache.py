@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional
+
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.cache.user_cache import CachedUserRepository, LRUCache
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.utils.result import Result, ResultStatus
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingUserRepository:
+    def __init__(self) -> None:
+        self.users: Dict[str, int] = {}
+        self.lookups: List[str] = []
+
+    def register_user(self, username: str) -> Result[str]:
+        self.users[username] = len(self.users) + 1
+        return Result(ResultStatus.SUCCESS, username)
+
+    def get_user_id(self, api_key: str) -> Optional[int]:
+        self.lookups.append(api_key)
+        return self.users.get(api_key)
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_known_keys_are_cached() -> None:
+    inner = CountingUserRepository()
+    repository = CachedUserRepository(inner)
+    repository.register_user("key")
+
+    assert repository.get_user_id("key") == 1
+    assert repository.get_user_id("key") == 1
+    assert inner.lookups == ["key"]
+
+
+def test_unknown_keys_are_cached_for_negative_ttl() -> None:
+    clock = FakeClock()
+    inner = CountingUserRepository()
+    repository = CachedUserRepository(inner, negative_ttl=5, clock=clock)
+
+    assert repository.get_user_id("missing") is None
+    assert repository.get_user_id("missing") is None
+    assert len(inner.lookups) == 1
+
+    clock.now = 5
+    assert repository.get_user_id("missing") is None
+    assert len(inner.lookups) == 2
+
+
+def test_registration_invalidates_negative_entry() -> None:
+    inner = CountingUserRepository()
+    repository = CachedUserRepository(inner, negative_ttl=60)
+
+    assert repository.get_user_id("key") is None
+    repository.register_user("key")
+    assert repository.get_user_id("key") == 1
+
+
+def test_request_scope_resolves_each_key_once() -> None:
+    inner = CountingUserRepository()
+    repository = CachedUserRepository(inner)
+    repository.register_user("key")
+
+    with repository.request_scope():
+        repository.clear()
+        assert repository.get_user_id("key") == 1
+        repository.clear()
+        assert repository.get_user_id("key") == 1
+    assert inner.lookups == ["key"]
+
+    repository.clear()
+    repository.get_user_id("key")
+    assert inner.lookups == ["key", "key"]
+
+
+def test_wraps_sql_repository() -> None:
+    repository = CachedUserRepository(
+        SQLBaseRepository(":memory:", DummyApiKeyGenerator())
+    )
+    api_key = repository.register_user("user").data
+
+    assert repository.get_user_id(api_key) == 1
+    assert repository.get_user_id(api_key + "x") is None
@@ -0,0 +1,217 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.core.auth.interactor import RegisterUserRequest
+from app.core.facade import WalletService
+from app.core.transaction.interactor import MakeTransactionRequest
+from app.core.wallet.Converter import WrongConverter
+from app.core.wallet.interactor import CreateWalletRequest
+from app.infra.api_key_generator.api_key_generator import DummyApiKeyGenerator
+from app.infra.sql_base.connection import SQLiteConnectionPool
+from app.infra.sql_base.profits_sql_repository import ProfitsRepository
+from app.infra.sql_base.sql_base_repository import SQLBaseRepository
+from app.infra.sql_base.sql_transaction_repository import SQLTransactionRepository
+from app.infra.sql_base.wallet_sql_repository import WalletSQLRepository
+from app.infra.sql_base.write_pipeline import SQLiteWritePipeline
+from app.utils.result import Result, ResultStatus
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> SQLiteConnectionPool:
+    pool = SQLiteConnectionPool(str(tmp_path / "wallets.db"))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pipeline(pool: SQLiteConnectionPool) -> SQLiteWritePipeline:
+    pipeline = SQLiteWritePipeline(pool, max_batch_size=16, max_delay=0.05)
+    pipeline.start()
+    yield pipeline
+    pipeline.stop()
+
+
+def insert_user(pool: SQLiteConnectionPool, name: str) -> Result[str]:
+    pool.connection().execute("INSERT INTO users (username) VALUES (?)", (name,))
+    pool.connection().commit()
+    return Result(ResultStatus.SUCCESS, name)
+
+
+def usernames(pool: SQLiteConnectionPool) -> List[str]:
+    with pool.request_scope():
+        rows = pool.connection().execute("SELECT username FROM users ORDER BY id")
+        return [row[0] for row in rows]
+
+
+def test_queued_units_share_one_commit(
+    pool: SQLiteConnectionPool, pipeline: SQLiteWritePipeline
+) -> None:
+    commits: List[str] = []
+    gate = threading.Event()
+
+    def blocker() -> Result[None]:
+        gate.wait()
+        pool.connection().set_trace_callback(commits.append)
+        return Result(ResultStatus.SUCCESS)
+
+    first = pipeline.submit(blocker)
+    futures = [pipeline.submit(lambda i=i: insert_user(pool, f"user{i}")) for i in range(10)]
+    gate.set()
+
+    assert first.result().status == ResultStatus.SUCCESS
+    assert [future.result().data for future in futures] == [f"user{i}" for i in range(10)]
+    assert usernames(pool) == [f"user{i}" for i in range(10)]
+    assert commits.count("COMMIT") <= 2
+    assert pipeline.batch_sizes.count >= 1
+    assert pipeline.queue_latency_ms.count == 11
+
+
+def test_failed_unit_is_undone_alone(
+    pool: SQLiteConnectionPool, pipeline: SQLiteWritePipeline
+) -> None:
+    def failing() -> Result[str]:
+        insert_user(pool, "lost")
+        pool.connection().execute("INSERT INTO users (username) VALUES ('lost too')")
+        raise ValueError("boom")
+
+    def rolled_back() -> Result[str]:
+        pool.connection().execute("INSERT INTO users (username) VALUES ('undone')")
+        pool.connection().rollback()
+        return Result(ResultStatus.FAIL)
+
+    futures = [
+        pipeline.submit(lambda: insert_user(pool, "kept")),
+        pipeline.submit(failing),
+        pipeline.submit(rolled_back),
+        pipeline.submit(lambda: insert_user(pool, "also kept")),
+    ]
+
+    statuses = [future.result().status for future in futures]
+    assert statuses == [
+        ResultStatus.SUCCESS,
+        ResultStatus.INTERNAL_ERROR,
+        ResultStatus.FAIL,
+        ResultStatus.SUCCESS,
+    ]
+    assert usernames(pool) == ["kept", "also kept"]
+
+
+def test_batch_size_is_capped(pool: SQLiteConnectionPool) -> None:
+    pipeline = SQLiteWritePipeline(pool, max_batch_size=4, max_delay=0.05)
+    pipeline.start()
+    futures = [pipeline.submit(lambda i=i: insert_user(pool, f"u{i}")) for i in range(12)]
+    for future in futures:
+        future.result()
+    pipeline.stop()
+
+    assert pipeline.batch_sizes.snapshot()["<=8"] == 0
+    assert pipeline.batch_sizes.count >= 3
+
+
+def test_facade_routes_writes_through_pipeline(
+    pool: SQLiteConnectionPool, pipeline: SQLiteWritePipeline
+) -> None:
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connections=pool)
+    service = WalletService.create(
+        user_repository=users,
+        transaction_repository=SQLTransactionRepository("", connections=pool),
+        wallet_repository=WalletSQLRepository("", user_repository=users, connections=pool),
+        profits_repository=ProfitsRepository("", connections=pool),
+        converter=WrongConverter(),
+        write_pipeline=pipeline,
+    )
+    api_key = service.register_user(RegisterUserRequest("user")).data.api_key
+    sender = service.create_wallet(CreateWalletRequest(api_key)).data.wallet_address
+    receiver = service.create_wallet(CreateWalletRequest(api_key)).data.wallet_address
+
+    statuses: List[ResultStatus] = []
+
+    def transfer() -> None:
+        for _ in range(10):
+            request = MakeTransactionRequest(api_key, sender, receiver, 0.01)
+            statuses.append(service.make_transaction(request).status)
+
+    threads = [threading.Thread(target=transfer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [ResultStatus.SUCCESS] * 40
+    with pool.request_scope():
+        assert users.get_user_id(api_key) is not None
+        assert service.transactions_interactor.transactions_repository \
+            .get_transaction_count().data == 40
+    assert pipeline.batch_sizes.count < pipeline.queue_latency_ms.count
+
+
+def test_submit_requires_running_pipeline(pool: SQLiteConnectionPool) -> None:
+    with pytest.raises(RuntimeError):
+        SQLiteWritePipeline(pool).submit(lambda: Result(ResultStatus.SUCCESS))
+
+
+def wallet_service(
+    pool: SQLiteConnectionPool, pipeline: SQLiteWritePipeline
+) -> WalletService:
+    users = SQLBaseRepository("", DummyApiKeyGenerator(), connections=pool)
+    return WalletService.create(
+        user_repository=users,
+        transaction_repository=SQLTransactionRepository("", connections=pool),
+        wallet_repository=WalletSQLRepository("", user_repository=users, connections=pool),
+        profits_repository=ProfitsRepository("", connections=pool),
+        converter=WrongConverter(),
+        write_pipeline=pipeline,
+    )
+
+
+def test_timed_out_unit_is_never_written(
+    pool: SQLiteConnectionPool, pipeline: SQLiteWritePipeline
+) -> None:
+    service = wallet_service(pool, pipeline)
+    service.write_timeout = 0.05
+    # the writer is alive but busy with a slow unit
+    gate = threading.Event()
+    slow = pipeline.submit(lambda: Result(ResultStatus.SUCCESS, gate.wait(5)))
+
+    result = service.register_user(RegisterUserRequest("late"))
+    gate.set()
+    assert slow.result(5).status == ResultStatus.SUCCESS
+    pipeline.stop()
+
+    assert result.status == ResultStatus.INTERNAL_ERROR
+    assert isinstance(result.exception, TimeoutError)
+    assert usernames(pool) == []
+
+
+def test_started_unit_is_awaited_past_the_timeout(
+    pool: SQLiteConnectionPool,
+) -> None:
+    pipeline = SQLiteWritePipeline(pool, max_delay=0)
+    pipeline.start()
+    service = wallet_service(pool, pipeline)
+    service.write_timeout = 0.05
+
+    def slow_insert() -> Result[str]:
+        time.sleep(0.2)
+        return insert_user(pool, "slow")
+
+    result = service._write(slow_insert)
+    pipeline.stop()
+
+    assert result.status == ResultStatus.SUCCESS
+    assert usernames(pool) == ["slow"]
+
+
+def test_facade_refuses_writes_to_stopped_pipeline(
+    pool: SQLiteConnectionPool,
+) -> None:
+    service = wallet_service(pool, SQLiteWritePipeline(pool))
+
+    result = service.register_user(RegisterUserRequest("user"))
+    assert result.status == ResultStatus.INTERNAL_ERROR
+    assert isinstance(result.exception, RuntimeError)
@@ -0,0 +1,167 @@
+import time
+from typing import List, Mapping, Optional, Union
+
+import pytest
+
+from app.core.wallet.circuit_breaker import (
+    CircuitBreakerConverter,
+    CircuitOpenError,
+    CircuitState,
+)
+from app.core.wallet.rate_publisher import RatePublisher
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeConverter:
+    """Replays a script of rates and errors, sleeping `latency` before each."""
+
+    def __init__(
+        self, script: List[Union[float, Exception, None]], latency: float = 0
+    ) -> None:
+        self.script = script
+        self.latency = latency
+        self.calls = 0
+
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        step = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        time.sleep(self.latency)
+        if isinstance(step, Exception):
+            raise step
+        return None if step is None else {"USD": step}
+
+    def fetch_data(self) -> dict:
+        rates = self.get_BTC_conversion_rates()
+        if rates is None:
+            raise ValueError("empty ticker")
+        return {symbol: {"last": rate} for symbol, rate in rates.items()}
+
+
+def test_opens_after_threshold_and_serves_last_known_good() -> None:
+    primary = FakeConverter([100.0, ConnectionError(), None, ConnectionError()])
+    breaker = CircuitBreakerConverter(
+        primary, failure_threshold=3, clock=FakeClock()
+    )
+
+    assert breaker.get_BTC_to_USD_conversion_rate() == 100.0
+    for _ in range(3):
+        assert breaker.get_BTC_to_USD_conversion_rate() == 100.0
+    assert breaker.state == CircuitState.OPEN
+
+    assert breaker.get_BTC_to_USD_conversion_rate() == 100.0
+    assert primary.calls == 4
+    metrics = breaker.metrics()
+    assert metrics.failures == 3
+    assert metrics.fallbacks == 4
+    assert metrics.transitions == {"closed->open": 1}
+
+
+def test_half_open_probe_closes_circuit() -> None:
+    clock = FakeClock()
+    primary = FakeConverter([ConnectionError(), 150.0])
+    breaker = CircuitBreakerConverter(
+        primary, failure_threshold=1, reset_timeout=10, clock=clock
+    )
+
+    assert breaker.get_BTC_to_USD_conversion_rate() is None
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now = 10
+    assert breaker.get_BTC_to_USD_conversion_rate() == 150.0
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.metrics().transitions == {
+        "closed->open": 1,
+        "open->half_open": 1,
+        "half_open->closed": 1,
+    }
+
+
+def test_failed_probe_reopens_circuit() -> None:
+    clock = FakeClock()
+    primary = FakeConverter([ConnectionError()])
+    breaker = CircuitBreakerConverter(
+        primary, failure_threshold=1, reset_timeout=10, clock=clock
+    )
+    breaker.get_BTC_to_USD_conversion_rate()
+
+    clock.now = 10
+    breaker.get_BTC_to_USD_conversion_rate()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now = 15
+    breaker.get_BTC_to_USD_conversion_rate()
+    assert primary.calls == 2
+    assert breaker.metrics().transitions["half_open->open"] == 1
+
+
+def test_slow_primary_times_out() -> None:
+    primary = FakeConverter([100.0], latency=0.5)
+    breaker = CircuitBreakerConverter(primary, failure_threshold=1, call_timeout=0.05)
+
+    started = time.monotonic()
+    assert breaker.get_BTC_to_USD_conversion_rate() is None
+    assert time.monotonic() - started < 0.4
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_hedged_request_to_secondary_wins() -> None:
+    primary = FakeConverter([100.0], latency=0.5)
+    secondary = FakeConverter([101.0])
+    breaker = CircuitBreakerConverter(
+        primary, secondary=secondary, hedge_after=0.01, call_timeout=1
+    )
+
+    assert breaker.get_BTC_to_USD_conversion_rate() == 101.0
+    metrics = breaker.metrics()
+    assert metrics.hedged_calls == 1
+    assert metrics.hedge_wins == 1
+
+
+def test_fast_primary_is_not_hedged() -> None:
+    primary = FakeConverter([100.0])
+    secondary = FakeConverter([101.0])
+    breaker = CircuitBreakerConverter(primary, secondary=secondary, hedge_after=0.5)
+
+    assert breaker.get_BTC_to_USD_conversion_rate() == 100.0
+    assert secondary.calls == 0
+    assert breaker.metrics().hedged_calls == 0
+
+
+def test_failed_primary_is_hedged_right_away() -> None:
+    primary = FakeConverter([ConnectionError()])
+    secondary = FakeConverter([101.0])
+    breaker = CircuitBreakerConverter(
+        primary, secondary=secondary, hedge_after=5, call_timeout=10
+    )
+
+    started = time.monotonic()
+    assert breaker.get_BTC_to_USD_conversion_rate() == 101.0
+    assert time.monotonic() - started < 1
+    metrics = breaker.metrics()
+    assert (metrics.hedged_calls, metrics.hedge_wins, metrics.failures) == (1, 1, 0)
+
+
+def test_rate_publisher_polls_through_the_breaker() -> None:
+    primary = FakeConverter([100.0, ConnectionError()])
+    breaker = CircuitBreakerConverter(
+        primary, failure_threshold=2, clock=FakeClock()
+    )
+    publisher = RatePublisher(breaker, clock=FakeClock())
+
+    assert publisher.refresh()
+    assert not publisher.refresh()
+    assert not publisher.refresh()
+    assert breaker.state == CircuitState.OPEN
+    # the open circuit refuses without calling the ticker
+    with pytest.raises(CircuitOpenError):
+        breaker.fetch_data()
+    assert primary.calls == 3
+    assert publisher.refresh_failures == 2
+    assert publisher.get_BTC_to_USD_conversion_rate() == 100.0
@@ -0,0 +1,47 @@
+from app.core.wallet.wallet import BitcoinWallet
+from app.infra.in_memory.wallet_in_memory_repository import InMemoryWalletRepository
+from tests.wallet.wallet_repositorry_tests import (
+    get_dummy_user_repo,
+    get_dummy_wallet_repository,
+)
+
+
+def test_transfers_keep_wallet_order() -> None:
+    user_repo, api_k1, _, _ = get_dummy_user_repo()
+    repo = get_dummy_wallet_repository(user_repo=user_repo)
+    first, _ = repo.create_wallet(api_k1.data)
+    second, _ = repo.create_wallet(api_k1.data)
+    uid = user_repo.get_user_id(api_k1.data)
+
+    assert repo.deposit(first.get_address(), 5) == (True, None)
+    assert repo.withdraw(first.get_address(), 2) == (True, None)
+    assert repo.withdraw(first.get_address(), 100) == (False, "Not enough money")
+
+    assert repo.get_user_wallets(uid) == [first, second]
+    assert first.get_amount() == 4
+
+
+def test_index_lookups() -> None:
+    user_repo, api_k1, api_k2, _ = get_dummy_user_repo()
+    repo = get_dummy_wallet_repository(user_repo=user_repo)
+    first, _ = repo.create_wallet(api_k1.data)
+    second, _ = repo.create_wallet(api_k1.data)
+    foreign, _ = repo.create_wallet(api_k2.data)
+
+    assert repo.get_wallet(api_k1.data, first.get_address()) == (first, None)
+    assert repo.get_wallet(api_k2.data, first.get_address())[0] is None
+    assert repo.wallets_belong_to_the_same_user(first.get_address(), second.get_address())
+    assert not repo.wallets_belong_to_the_same_user(
+        first.get_address(), foreign.get_address()
+    )
+    assert not repo.wallets_belong_to_the_same_user(first.get_address(), 1000)
+    assert repo.deposit(1000, 1) == (False, "Can't find wallet with that address")
+
+
+def test_index_is_built_from_initial_wallets() -> None:
+    user_repo, _, _, _ = get_dummy_user_repo()
+    wallet = BitcoinWallet(wallet_address=7, user_id=1, amount_BTC=3)
+    repo = InMemoryWalletRepository(user_repository=user_repo, wallet_dict={1: [wallet]})
+
+    assert repo.withdraw(7, 1) == (True, None)
+    assert wallet.get_amount() == 2
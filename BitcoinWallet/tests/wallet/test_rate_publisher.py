@@ -0,0 +1,143 @@
+import time
+from typing import List
+
+import pytest
+
+from app.core.wallet.interactor import CreateWalletRequest, WalletInteractor
+from app.core.wallet.rate_publisher import RatePublisher
+from app.utils.result import ResultStatus
+from tests.wallet.wallet_repositorry_tests import (
+    get_dummy_user_repo,
+    get_dummy_wallet_repository,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRetriever:
+    def __init__(self, prices: List[float]) -> None:
+        self.prices = prices
+        self.calls = 0
+
+    def fetch_data(self) -> dict:
+        if self.calls >= len(self.prices):
+            raise ConnectionError("ticker is down")
+        price = self.prices[self.calls]
+        self.calls += 1
+        return {"USD": {"last": price}, "EUR": {"last": price / 2}}
+
+
+def test_reads_fail_before_first_snapshot() -> None:
+    publisher = RatePublisher(FakeRetriever([100.0]), clock=FakeClock())
+    assert publisher.get_BTC_to_USD_conversion_rate() is None
+
+
+def test_refresh_swaps_snapshot() -> None:
+    publisher = RatePublisher(FakeRetriever([100.0, 200.0]), clock=FakeClock())
+
+    assert publisher.refresh()
+    first = publisher.get_snapshot()
+    assert publisher.refresh()
+    second = publisher.get_snapshot()
+
+    assert first is not None and second is not None
+    assert first.rate("USD") == 100.0
+    assert second.rate("USD") == 200.0
+    assert second.rate("EUR") == 100.0
+    with pytest.raises(TypeError):
+        second.ticker["USD"]["last"] = 1  # type: ignore
+
+
+def test_stale_snapshot_is_not_served() -> None:
+    clock = FakeClock()
+    publisher = RatePublisher(FakeRetriever([100.0]), max_staleness=60, clock=clock)
+    publisher.refresh()
+
+    clock.now = 60
+    assert publisher.get_BTC_to_USD_conversion_rate() == 100.0
+    assert not publisher.refresh()
+    clock.now = 61
+    assert publisher.get_BTC_to_USD_conversion_rate() is None
+    assert publisher.refresh_failures == 1
+
+
+class PayloadRetriever:
+    def __init__(self, payloads: List[dict]) -> None:
+        self.payloads = payloads
+
+    def fetch_data(self) -> dict:
+        if len(self.payloads) > 1:
+            return self.payloads.pop(0)
+        return self.payloads[0]
+
+
+MALFORMED = {"USD": {"buy": 100.0}}
+
+
+def test_malformed_payload_keeps_previous_snapshot() -> None:
+    retriever = PayloadRetriever(
+        [{"USD": {"last": 100.0}}, MALFORMED, {"USD": {"last": 300.0}}]
+    )
+    publisher = RatePublisher(retriever, clock=FakeClock())  # type: ignore
+
+    assert publisher.refresh()
+    assert not publisher.refresh()
+    assert publisher.refresh_failures == 1
+    assert publisher.get_BTC_to_USD_conversion_rate() == 100.0
+    assert publisher.refresh()
+    assert publisher.get_BTC_to_USD_conversion_rate() == 300.0
+
+
+def test_background_thread_survives_malformed_payload() -> None:
+    retriever = PayloadRetriever([MALFORMED, {"USD": {"last": 100.0}}])
+    publisher = RatePublisher(retriever, interval=0.01)  # type: ignore
+    publisher.start()
+    try:
+        for _ in range(100):
+            if publisher.get_snapshot() is not None:
+                break
+            time.sleep(0.01)
+        assert publisher._thread is not None and publisher._thread.is_alive()
+    finally:
+        publisher.stop(timeout=1)
+
+    assert publisher.refresh_failures == 1
+    assert publisher.get_BTC_to_USD_conversion_rate() == 100.0
+
+
+def test_background_thread_publishes_snapshot() -> None:
+    publisher = RatePublisher(FakeRetriever([100.0]), interval=0.01)
+    publisher.start()
+    try:
+        for _ in range(100):
+            if publisher.get_snapshot() is not None:
+                break
+            time.sleep(0.01)
+    finally:
+        publisher.stop(timeout=1)
+
+    assert publisher.get_BTC_to_USD_conversion_rate() == 100.0
+
+
+def test_interactor_fails_fast_on_stale_rate() -> None:
+    clock = FakeClock()
+    publisher = RatePublisher(FakeRetriever([100.0]), max_staleness=60, clock=clock)
+    publisher.refresh()
+    user_repo, api_k1, _, _ = get_dummy_user_repo()
+    interactor = WalletInteractor(
+        get_dummy_wallet_repository(user_repo=user_repo), converter=publisher
+    )
+
+    result = interactor.create_new_wallet(CreateWalletRequest(api_k1.data))
+    assert result.status == ResultStatus.SUCCESS
+    assert result.data.amount_USD == result.data.amount_BTC * 100.0
+
+    clock.now = 120
+    result = interactor.create_new_wallet(CreateWalletRequest(api_k1.data))
+    assert result.status == ResultStatus.INTERNAL_ERROR
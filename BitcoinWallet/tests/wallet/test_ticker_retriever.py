@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Set, Tuple
+
+import pytest
+import requests
+
+from app.core.wallet.Converter import (
+    APIConverter,
+    GeneralBTCConversionDataRetriever,
+    parse_ticker_symbol,
+)
+
+TICKER = {
+    "EUR": {"15m": 55792.52, "last": 55792.52, "symbol": "EUR"},
+    "USD": {"15m": 65249.38, "last": 65249.38, "symbol": "USD"},
+}
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: Set[Tuple[str, int]] = set()
+
+    def do_GET(self) -> None:
+        TickerHandler.connections.add(self.client_address)
+        if self.path == "/slow":
+            time.sleep(0.3)
+        body = json.dumps(TICKER).encode("UTF-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    block_on_close = False
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        pass
+
+
+@pytest.fixture
+def ticker_url() -> Iterator[str]:
+    TickerHandler.connections = set()
+    server = QuietServer(("127.0.0.1", 0), TickerHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_data(ticker_url: str) -> None:
+    retriever = GeneralBTCConversionDataRetriever(url=f"{ticker_url}/ticker")
+    assert retriever.fetch_data() == TICKER
+
+
+def test_api_converter_reads_symbol(ticker_url: str) -> None:
+    converter = APIConverter(url=f"{ticker_url}/ticker")
+    assert converter.get_BTC_to_USD_conversion_rate() == 65249.38
+
+
+def test_connection_is_kept_alive(ticker_url: str) -> None:
+    retriever = GeneralBTCConversionDataRetriever(url=f"{ticker_url}/ticker")
+    for _ in range(5):
+        retriever.fetch_symbol("USD")
+    assert len(TickerHandler.connections) == 1
+
+
+def test_read_timeout(ticker_url: str) -> None:
+    retriever = GeneralBTCConversionDataRetriever(
+        url=f"{ticker_url}/slow", read_timeout=0.1
+    )
+    with pytest.raises(requests.Timeout):
+        retriever.fetch_data()
+
+
+def test_parse_ticker_symbol() -> None:
+    payload = '{"USD" : {"last" : 1.5, "symbol" : "EUR"}, "EUR" : {"last" : 2.5}}'
+    assert parse_ticker_symbol(payload, "USD") == {"last": 1.5, "symbol": "EUR"}
+    assert parse_ticker_symbol(payload, "EUR") == {"last": 2.5}
+    with pytest.raises(KeyError):
+        parse_ticker_symbol(payload, "GEL")
@@ -0,0 +1,90 @@
+from typing import Mapping, Optional
+
+from app.core.wallet.interactor import (
+    CreateWalletRequest,
+    GetWalletRequest,
+    GetWalletsRequest,
+    WalletInteractor,
+)
+from app.utils.result import ResultStatus
+from tests.wallet.wallet_repositorry_tests import (
+    get_dummy_user_repo,
+    get_dummy_wallet_repository,
+)
+
+
+class TickerConverter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_BTC_to_USD_conversion_rate(self) -> float:
+        return 100.0
+
+    def get_BTC_conversion_rates(self) -> Optional[Mapping[str, float]]:
+        self.calls += 1
+        return {"USD": 100.0, "EUR": 90.0, "GBP": 80.0}
+
+
+def create_interactor():
+    user_repo, api_k1, api_k2, _ = get_dummy_user_repo()
+    converter = TickerConverter()
+    interactor = WalletInteractor(
+        get_dummy_wallet_repository(user_repo=user_repo), converter=converter
+    )
+    return interactor, converter, api_k1.data, api_k2.data
+
+
+def test_get_wallet_in_several_currencies() -> None:
+    interactor, converter, api_key, _ = create_interactor()
+    wallet = interactor.create_new_wallet(CreateWalletRequest(api_key)).data
+    converter.calls = 0
+
+    result = interactor.get_wallet(
+        GetWalletRequest(api_key, wallet.wallet_address, ["eur", "GBP"])
+    )
+
+    assert result.status == ResultStatus.SUCCESS
+    assert result.data.amount_USD == 100.0
+    assert result.data.amounts == {"USD": 100.0, "EUR": 90.0, "GBP": 80.0}
+    assert converter.calls == 1
+
+
+def test_unknown_currency_fails() -> None:
+    interactor, _, api_key, _ = create_interactor()
+    wallet = interactor.create_new_wallet(CreateWalletRequest(api_key)).data
+
+    result = interactor.get_wallet(
+        GetWalletRequest(api_key, wallet.wallet_address, ["XYZ"])
+    )
+
+    assert result.status == ResultStatus.FAIL
+
+
+def test_get_wallets_reads_ticker_once() -> None:
+    interactor, converter, api_key, other_key = create_interactor()
+    first = interactor.create_new_wallet(CreateWalletRequest(api_key)).data
+    second = interactor.create_new_wallet(CreateWalletRequest(api_key)).data
+    interactor.create_new_wallet(CreateWalletRequest(other_key))
+    converter.calls = 0
+
+    result = interactor.get_wallets(GetWalletsRequest(api_key, [], ["EUR"]))
+
+    assert result.status == ResultStatus.SUCCESS
+    assert [wallet.wallet_address for wallet in result.data.wallets] == [
+        first.wallet_address,
+        second.wallet_address,
+    ]
+    assert all(wallet.amounts["EUR"] == 90.0 for wallet in result.data.wallets)
+    assert converter.calls == 1
+
+
+def test_get_wallets_rejects_foreign_address() -> None:
+    interactor, _, api_key, other_key = create_interactor()
+    own = interactor.create_new_wallet(CreateWalletRequest(api_key)).data
+    foreign = interactor.create_new_wallet(CreateWalletRequest(other_key)).data
+
+    result = interactor.get_wallets(
+        GetWalletsRequest(api_key, [own.wallet_address, foreign.wallet_address])
+    )
+
+    assert result.status == ResultStatus.FAIL